@@ -0,0 +1,317 @@
+"""
+Event bus ข้าม uvicorn workers - ส่ง invalidation ของ cache และ event อื่น ๆ (pub/sub) ให้ทุก worker
+
+backend (EVENT_BUS_BACKEND):
+- postgres: LISTEN / NOTIFY บน connection แยกของแต่ละ worker (auto เมื่อ DATABASE_URL เป็น PostgreSQL)
+- unix: datagram Unix socket หนึ่งตัวต่อ worker ในไดเรกทอรีเดียวกัน (EVENT_BUS_SOCKET_DIR)
+        สำหรับหลาย worker บนเครื่องเดียว (SQLite) และ test
+- local: ภายใน process เดียว (worker เดียว หรือระบบที่ไม่มี AF_UNIX เช่น Windows)
+
+ข้อความ = JSON {"channel", "origin", "data"} - publish() เรียก subscriber ใน process ตัวเองทันที
+แล้วส่งให้ worker อื่น (ข้อความของตัวเองที่วนกลับมาจะถูกข้าม)
+callback ถูกเรียกจาก thread ของ listener ถ้า subscribe พร้อม loop จะถูกส่งเข้า event loop นั้นแทน
+start() = ส่ง + รับ (uvicorn worker), start_publisher() = ส่งอย่างเดียว (CLI / สคริปต์ที่เขียนผ่าน services.unit_of_work)
+
+ถ้าพลาดข้อความได้ (เชื่อมต่อ PostgreSQL ใหม่, ข้อความใหญ่เกิน) subscriber ของ RESYNC_CHANNEL
+จะถูกเรียกให้ล้าง state ที่อาจเก่า (เช่น cache ล้างทั้งหมด)
+"""
+
+import json
+import os
+import select
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .models import DATABASE_URL, database_instance_id, engine
+
+EVENT_BUS_BACKEND = os.getenv("EVENT_BUS_BACKEND", "auto")      # auto | postgres | unix | local
+# ค่าเริ่มต้นแยกตาม database - แอปอื่น / deployment อื่นบนเครื่องเดียวกันจะไม่ได้รับ invalidation ข้ามกัน
+EVENT_BUS_SOCKET_DIR = os.getenv(
+    "EVENT_BUS_SOCKET_DIR", os.path.join(tempfile.gettempdir(), f"xbet_bus_{database_instance_id()}")
+)
+EVENT_BUS_PG_CHANNEL = os.getenv("EVENT_BUS_PG_CHANNEL", "xbet_events")
+
+RESYNC_CHANNEL = "bus.resync"
+# NOTIFY payload ต้องไม่เกิน 8000 bytes
+PG_MAX_PAYLOAD = 7900
+UNIX_MAX_PAYLOAD = 60000
+
+
+class EventBus:
+    """in-process pub/sub - ใช้เป็น backend local และเป็นฐานของ backend ข้าม process"""
+
+    name = "local"
+    max_payload = None
+
+    def __init__(self):
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._subscribers: Dict[str, List[Tuple[Callable[[dict], None], object]]] = {}
+        self._lock = threading.Lock()
+        self.published = self.received = self.send_errors = 0
+
+    def subscribe(self, channel: str, callback: Callable[[dict], None], loop=None):
+        """callback(data) - ถ้าส่ง loop (asyncio) มา callback จะรันใน loop นั้นด้วย call_soon_threadsafe"""
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append((callback, loop))
+
+    def unsubscribe(self, channel: str, callback: Callable[[dict], None]):
+        with self._lock:
+            self._subscribers[channel] = [item for item in self._subscribers.get(channel, []) if item[0] is not callback]
+
+    def publish(self, channel: str, data: dict):
+        self._dispatch(channel, data)
+        self.published += 1
+        payload = json.dumps({"channel": channel, "origin": self.origin, "data": data}, separators=(",", ":"))
+        if self.max_payload is not None and len(payload.encode("utf-8")) > self.max_payload:
+            # ใหญ่เกินส่งได้ - ให้ worker อื่นล้าง state แทน
+            payload = json.dumps({"channel": RESYNC_CHANNEL, "origin": self.origin, "data": {"reason": "oversized"}})
+        try:
+            self._send(payload)
+        except Exception as e:
+            self.send_errors += 1
+            print(f"⚠️  event bus ({self.name}) publish failed: {e}")
+
+    def start(self):
+        pass
+
+    def start_publisher(self):
+        """ส่งข้อความให้ worker อื่นได้โดยไม่รับ (ไม่ bind socket / ไม่เปิด listener) - เรียกซ้ำได้"""
+        pass
+
+    def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "origin": self.origin, "published": self.published,
+                "received": self.received, "send_errors": self.send_errors}
+
+    # ---------- backend hooks ----------
+    def _send(self, payload: str):
+        pass
+
+    def _deliver(self, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == self.origin:
+            return
+        self.received += 1
+        self._dispatch(message.get("channel"), message.get("data") or {})
+
+    def _dispatch(self, channel: str, data: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for callback, loop in subscribers:
+            try:
+                if loop is not None:
+                    loop.call_soon_threadsafe(callback, data)
+                else:
+                    callback(data)
+            except Exception as e:
+                print(f"❌ event bus subscriber error on {channel}: {e}")
+
+
+class UnixSocketBus(EventBus):
+    """แต่ละ worker bind datagram socket <dir>/<origin>.sock แล้ว publish = ส่งให้ทุก socket ในไดเรกทอรี"""
+
+    name = "unix"
+    max_payload = UNIX_MAX_PAYLOAD
+
+    def __init__(self, directory: str = EVENT_BUS_SOCKET_DIR):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{self.origin}.sock")
+        self._socket: Optional[socket.socket] = None
+        self._sender: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def start(self):
+        if self._socket is not None:
+            return
+        self.start_publisher()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+        self._thread = threading.Thread(target=self._listen, name="event-bus-unix", daemon=True)
+        self._thread.start()
+
+    def start_publisher(self):
+        if self._sender is not None:
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        # ผู้รับที่คิวเต็มต้องไม่ทำให้ writer thread ค้าง - ทิ้งข้อความนั้นแทน (TTL ของ cache ยังเป็นเพดาน)
+        self._sender.setblocking(False)
+
+    def stop(self):
+        receiver, self._socket = self._socket, None
+        sender, self._sender = self._sender, None
+        if sender is not None:
+            sender.close()
+        if receiver is None:
+            return
+        receiver.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _listen(self):
+        receiver = self._socket
+        while self._socket is receiver:
+            try:
+                payload = receiver.recv(UNIX_MAX_PAYLOAD + 1024)
+            except OSError:
+                return
+            self._deliver(payload)
+
+    def _send(self, payload: str):
+        if self._sender is None:
+            return
+        data = payload.encode("utf-8")
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".sock") or path == self.path:
+                continue
+            try:
+                self._sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # worker ที่ตายไปแล้ว (ไม่มีใคร bind) - ลบไฟล์ทิ้ง
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        return dict(super().stats(), dropped=self.dropped)
+
+
+class PostgresBus(EventBus):
+    """LISTEN บน connection ของ listener thread, NOTIFY ผ่าน connection สำหรับส่งอีกตัว (autocommit ทั้งคู่)"""
+
+    name = "postgres"
+    max_payload = PG_MAX_PAYLOAD
+
+    def __init__(self, url=None, channel: str = EVENT_BUS_PG_CHANNEL):
+        super().__init__()
+        self.url = url or engine.url
+        self.channel = channel
+        self._running = False
+        self._publishing = False
+        self._thread: Optional[threading.Thread] = None
+        self._publisher = None
+        self._publish_lock = threading.Lock()
+        self.reconnects = 0
+
+    def _connect(self):
+        import psycopg2
+
+        # ใช้ค่าเชื่อมต่อชุดเดียวกับ engine (รวม ?host=... ใน query string) แต่เป็น connection แยกนอก pool
+        arguments = self.url.translate_connect_args(username="user", database="dbname")
+        arguments.update(self.url.query)
+        conn = psycopg2.connect(**arguments)
+        conn.autocommit = True
+        return conn
+
+    def start(self):
+        if self._running:
+            return
+        self._running = self._publishing = True
+        listener = self._connect()
+        self._thread = threading.Thread(target=self._listen, args=(listener,), name="event-bus-pg", daemon=True)
+        self._thread.start()
+
+    def start_publisher(self):
+        # NOTIFY ผ่าน connection ที่เปิดตอนส่งครั้งแรก
+        self._publishing = True
+
+    def stop(self):
+        self._running = self._publishing = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._publish_lock:
+            if self._publisher is not None:
+                self._publisher.close()
+                self._publisher = None
+
+    def _listen(self, conn):
+        delay = 0.5
+        while self._running:
+            try:
+                reconnected = conn is None
+                if reconnected:
+                    conn = self._connect()
+                    self.reconnects += 1
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                if reconnected:
+                    # ระหว่างหลุดอาจพลาด invalidation ไป (resync หลัง LISTEN แล้ว จะได้ไม่พลาดช่วงระหว่างนั้นอีก)
+                    self._dispatch(RESYNC_CHANNEL, {"reason": "reconnect"})
+                    print(f"🔌 event bus reconnected to PostgreSQL (LISTEN {self.channel})")
+                delay = 0.5
+                while self._running:
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            self._deliver(conn.notifies.pop(0).payload)
+            except Exception as e:
+                print(f"⚠️  event bus listener error: {e} - reconnecting in {delay:.1f}s")
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+                time.sleep(delay)
+                delay = min(delay * 2, 10.0)
+        if conn is not None:
+            conn.close()
+
+    def _send(self, payload: str):
+        if not self._publishing:
+            return
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None or self._publisher.closed:
+                        self._publisher = self._connect()
+                    with self._publisher.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+                    return
+                except Exception:
+                    # connection หลุด - ลองเปิดใหม่อีกครั้งเดียว
+                    if self._publisher is not None:
+                        self._publisher.close()
+                        self._publisher = None
+                    if attempt:
+                        raise
+
+    def stats(self) -> dict:
+        return dict(super().stats(), reconnects=self.reconnects)
+
+
+def make_bus(kind: str = EVENT_BUS_BACKEND) -> EventBus:
+    if kind == "auto":
+        if DATABASE_URL.startswith("postgresql"):
+            kind = "postgres"
+        elif hasattr(socket, "AF_UNIX") and os.name == "posix":
+            kind = "unix"
+        else:
+            kind = "local"
+    if kind == "postgres":
+        return PostgresBus()
+    if kind == "unix":
+        return UnixSocketBus()
+    if kind == "local":
+        return EventBus()
+    raise ValueError(f"Unknown EVENT_BUS_BACKEND: {kind!r} (expected auto, postgres, unix or local)")
+
+
+event_bus = make_bus()
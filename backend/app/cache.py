@@ -0,0 +1,288 @@
+"""
+Read-through cache สำหรับ endpoint อ่านข้อมูลของผู้ใช้ (/me, /balance, history, stats)
+
+- endpoint เลือกใช้เองด้วย @cached("name", current_email, params=(...)) - key = (name, email จาก cookie, ค่า params)
+  cache hit จึงไม่แตะ database เลย (ไม่ต้องหา user จาก email ด้วย)
+- ระหว่างโหลด handler ประกาศว่าผลขึ้นกับข้อมูลอะไรด้วย depends_on("credit:3", "game1:3")
+- การเขียนผ่าน ORM ถูกแปลงเป็น tag อัตโนมัติ (TAGGERS: Credit → credit:<uid>, Play → game1/game2:<uid>,
+  User → user:<uid>) แล้ว invalidate หลัง commit สำเร็จเท่านั้น (รวม commit ของ writer thread ใน writer.py)
+  การเขียนด้วย raw SQL ใช้ invalidate_after_commit(session, *tags)
+- กันค่าเก่าค้าง: จดลำดับการ invalidate ล่าสุดของแต่ละ tag ผลที่เริ่มโหลดก่อน tag ของมันถูก invalidate จะไม่ถูกเก็บ
+- LRU จำกัดทั้งจำนวน entry (CACHE_MAX_ENTRIES) และขนาดโดยประมาณ (CACHE_MAX_BYTES = ขนาด JSON ของผล)
+  + TTL (CACHE_TTL_S) เป็นเพดานความเก่าสำหรับการเขียนที่ไม่ผ่าน hook
+- invalidation ถูก publish ผ่าน event bus (bus.py) ทุก worker จึงล้าง entry ของ tag เดียวกันด้วย
+- สถิติ hit / miss / eviction ดูได้ที่ /api/admin/cache/stats
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from . import rules
+from .bus import RESYNC_CHANNEL, event_bus
+from .models import Credit, Play, User
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") == "1"
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CACHE_TTL_S = float(os.getenv("CACHE_TTL_S", "30"))
+# จำนวน tag ที่จำลำดับการ invalidate ไว้ (เก่ากว่านี้ถือว่าเพิ่ง invalidate - ไม่เก็บผลที่เริ่มโหลดก่อนหน้านั้น)
+CACHE_TAG_HISTORY = int(os.getenv("CACHE_TAG_HISTORY", "50000"))
+
+SESSION_TAGS_KEY = "cache_tags"
+CACHE_CHANNEL = "cache.invalidate"
+# จำนวน tag ต่อข้อความบน bus (NOTIFY payload จำกัด 8000 bytes)
+BUS_TAGS_PER_MESSAGE = 200
+GAME_NAMES = {code: name for name, code in rules.GAME_CODES.items()}
+
+# ORM object ที่ถูกเขียน → tag ที่ต้อง invalidate
+TAGGERS: Dict[type, Callable[[object], List[str]]] = {
+    User: lambda user: [f"user:{user.id}"],
+    Credit: lambda credit: [f"credit:{credit.user_id}"],
+    Play: lambda play: [f"{GAME_NAMES.get(play.game, 'game')}:{play.user_id}"],
+}
+
+_current_tags: contextvars.ContextVar[Optional[Set[str]]] = contextvars.ContextVar("cache_tags", default=None)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES,
+                 ttl_s: float = CACHE_TTL_S, enabled: bool = CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # key → (value, tags, size, expires_at)
+        self._entries: "OrderedDict[tuple, Tuple[object, Tuple[str, ...], int, float]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[tuple]] = {}
+        # ลำดับการ invalidate: tag → ค่า _clock ตอน invalidate ครั้งล่าสุด
+        self._clock = 0
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._history_floor = 0
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self.invalidations = self.skipped_stores = 0
+
+    # ---------- read ----------
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[3] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def begin_load(self) -> int:
+        """เรียกก่อนโหลดจาก database - คืนลำดับปัจจุบันไว้ส่งให้ store()"""
+        with self._lock:
+            return self._clock
+
+    def store(self, key: tuple, value, tags: Iterable[str], started: int, ttl_s: Optional[float] = None):
+        tags = tuple(sorted(set(tags)))
+        size = len(json.dumps(value, default=str)) + 64 * (len(tags) + 1)
+        with self._lock:
+            # tag ถูก invalidate ระหว่างโหลด → ผลอาจเป็นข้อมูลก่อน commit นั้น ไม่เก็บ
+            if started < self._history_floor or any(self._invalidated.get(tag, 0) > started for tag in tags):
+                self.skipped_stores += 1
+                return
+            if size > self.max_bytes:
+                self.skipped_stores += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, tags, size, time.monotonic() + (self.ttl_s if ttl_s is None else ttl_s))
+            self.bytes += size
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    # ---------- invalidate ----------
+    def invalidate(self, tags: Iterable[str]):
+        with self._lock:
+            self._clock += 1
+            for tag in set(tags):
+                self._invalidated.pop(tag, None)
+                self._invalidated[tag] = self._clock
+                for key in self._keys_by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+            while len(self._invalidated) > CACHE_TAG_HISTORY:
+                _, clock = self._invalidated.popitem(last=False)
+                self._history_floor = max(self._history_floor, clock)
+
+    def clear(self):
+        with self._lock:
+            self._clock += 1
+            self._history_floor = self._clock
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._invalidated.clear()
+            self.bytes = 0
+
+    def _remove(self, key: tuple):
+        value, tags, size, _ = self._entries.pop(key)
+        self.bytes -= size
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "skipped_stores": self.skipped_stores,
+                "tags": len(self._keys_by_tag),
+            }
+
+
+response_cache = ResponseCache()
+
+
+# ===============================
+# Endpoint helpers
+# ===============================
+def depends_on(*tags: str):
+    """ประกาศ tag ที่ผลของ request นี้ขึ้นอยู่ (ไม่มีผลถ้า endpoint ไม่ได้ใช้ @cached)"""
+    current = _current_tags.get()
+    if current is not None:
+        current.update(tags)
+
+
+def cached(name: str, owner: Callable[[Request], Optional[str]], params: Tuple[str, ...] = (),
+           cache: ResponseCache = response_cache):
+    """
+    cache ผลของ endpoint ต่อผู้ใช้ - endpoint ต้องรับ request: Request และเรียก depends_on(...) ระหว่างโหลด
+
+    owner: ฟังก์ชันรับ Request แล้วคืน email ของผู้ใช้ (None = ไม่ cache)
+    ผลที่ไม่มี tag หรือจบด้วย exception (401 / 404 / 500) จะไม่ถูกเก็บ
+    """
+    def decorator(handler):
+        def lookup(kwargs):
+            if not cache.enabled:
+                return None, None
+            email = owner(kwargs["request"])
+            if not email:
+                return None, None
+            key = (name, email) + tuple(kwargs.get(param) for param in params)
+            return key, cache.get(key)
+
+        def remember(key, value, tags, started):
+            if key is not None and tags:
+                cache.store(key, value, tags, started)
+            return value
+
+        if asyncio.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def wrapper(*args, **kwargs):
+                key, value = lookup(kwargs)
+                if value is not None:
+                    return value
+                started, tags = cache.begin_load(), set()
+                token = _current_tags.set(tags)
+                try:
+                    value = await handler(*args, **kwargs)
+                finally:
+                    _current_tags.reset(token)
+                return remember(key, value, tags, started)
+        else:
+            @functools.wraps(handler)
+            def wrapper(*args, **kwargs):
+                key, value = lookup(kwargs)
+                if value is not None:
+                    return value
+                started, tags = cache.begin_load(), set()
+                token = _current_tags.set(tags)
+                try:
+                    value = handler(*args, **kwargs)
+                finally:
+                    _current_tags.reset(token)
+                return remember(key, value, tags, started)
+        return wrapper
+    return decorator
+
+
+# ===============================
+# Invalidation hooks (SQLAlchemy session events)
+# ===============================
+def invalidate_after_commit(session: Session, *tags: str):
+    """สำหรับการเขียนด้วย raw SQL - invalidate tags เมื่อ transaction นี้ commit สำเร็จ"""
+    session.info.setdefault(SESSION_TAGS_KEY, set()).update(tags)
+
+
+def _collect_tags(session: Session, flush_context):
+    tags = session.info.setdefault(SESSION_TAGS_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tagger = TAGGERS.get(type(obj))
+        if tagger is not None:
+            tags.update(tagger(obj))
+
+
+def publish_invalidation(tags: Iterable[str]):
+    """invalidate ใน process นี้ทันที และส่งให้ worker อื่นผ่าน event bus"""
+    tags = sorted(set(tags))
+    for start in range(0, len(tags), BUS_TAGS_PER_MESSAGE):
+        event_bus.publish(CACHE_CHANNEL, {"tags": tags[start:start + BUS_TAGS_PER_MESSAGE]})
+
+
+def _invalidate_committed(session: Session):
+    tags = session.info.pop(SESSION_TAGS_KEY, None)
+    if tags:
+        publish_invalidation(tags)
+
+
+def _discard_tags(session: Session, previous_transaction):
+    # rollback ของ savepoint (งานหนึ่งใน group commit) ไม่ทิ้ง tag - งานอื่นใน transaction เดียวกันยังจะ commit
+    if previous_transaction.parent is None:
+        session.info.pop(SESSION_TAGS_KEY, None)
+
+
+_hooks_installed = False
+
+
+def install_invalidation_hooks():
+    """ผูก event กับทุก Session (request sessions และ writer thread) - เรียกครั้งเดียวตอน import main"""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "after_flush", _collect_tags)
+    event.listen(Session, "after_commit", _invalidate_committed)
+    event.listen(Session, "after_soft_rollback", _discard_tags)
+    event_bus.subscribe(CACHE_CHANNEL, lambda data: response_cache.invalidate(data.get("tags", ())))
+    # พลาดข้อความจาก worker อื่นไป (เชื่อมต่อใหม่ / ข้อความใหญ่เกิน) - ล้างทั้งหมด
+    event_bus.subscribe(RESYNC_CHANNEL, lambda data: response_cache.clear())
+    _hooks_installed = True
@@ -0,0 +1,69 @@
+"""
+Read/write routing - เลือกว่า request จะอ่านจาก primary หรือ read replica
+
+- dependency ที่อ่านอย่างเดียว (analytics / history / stats) ใช้ ReadSessionLocal
+- หลังจากผู้ใช้ทำรายการเขียน (เล่นเกม ฝาก ถอน ฯลฯ) จะได้ cookie DB_STICKY_COOKIE
+  ที่บังคับให้ request อ่านของผู้ใช้คนนั้นไปที่ primary ชั่วคราว (read-your-writes)
+  เพราะ replica อาจยังตามไม่ทัน - ใช้ cookie แทน state ใน process จึงใช้ได้ข้าม uvicorn workers
+"""
+
+import os
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+
+from .models import SessionLocal, ReadSessionLocal
+
+DB_STICKY_COOKIE = "db_primary_until"
+DB_STICKY_SECONDS = float(os.getenv("DB_STICKY_SECONDS", "5"))
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def replica_enabled() -> bool:
+    return ReadSessionLocal is not SessionLocal
+
+
+def wants_primary(request: Request) -> bool:
+    """True ถ้า request นี้ยังอยู่ในช่วง read-your-writes หลังการเขียนล่าสุด"""
+    value = request.cookies.get(DB_STICKY_COOKIE)
+    if not value:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+
+def read_session(request: Request):
+    """เปิด session สำหรับอ่าน: replica ปกติ, primary ถ้ายังอยู่ในช่วง sticky"""
+    if not replica_enabled() or wants_primary(request):
+        return SessionLocal()
+    return ReadSessionLocal()
+
+
+class ReadYourWritesMiddleware:
+    """ตั้ง cookie sticky หลัง request เขียนที่สำเร็จ (status < 400)"""
+
+    def __init__(self, app, sticky_seconds: float = DB_STICKY_SECONDS):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS or not replica_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_sticky(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.sticky_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{DB_STICKY_COOKIE}={until:.3f}; Max-Age={int(self.sticky_seconds) + 1}; "
+                    f"Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_sticky)
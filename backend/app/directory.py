@@ -0,0 +1,250 @@
+"""
+Admin user directory - ค้นหาผู้ใช้ด้วย email / เบอร์โทร / ชื่อ พร้อมยอดเงินและยอดรวมการเล่น
+
+- ค้นหา: prefix (ค่าเริ่มต้น) หรือ contains (substring) บน email, phone, full_name แบบไม่สนตัวพิมพ์
+  PostgreSQL: index lower(...) text_pattern_ops สำหรับ prefix (LIKE 'abc%') + pg_trgm GIN สำหรับ substring
+  SQLite: คอลัมน์ normalized email_key / name_key (generated VIRTUAL = lower(...)) + index
+          prefix เป็น range (key >= q AND key < q + U+10FFFF) ที่ใช้ index ได้, substring สแกนด้วย instr
+  prefix ที่ตรงไม่เกิน SEARCH_CANDIDATES คน: กรองจาก index ค้นหาก่อนแล้วค่อยเรียง ไม่อย่างนั้นเดินตามลำดับที่เรียงแล้วกรอง
+- ยอดรวมการเล่นอยู่ในตาราง user_totals (models.UserTotals) ที่ settle อัพเดททุกตาด้วย upsert
+  จึงเรียงตามยอดได้จาก index (ยอด, user_id) ไม่ต้อง GROUP BY plays ทั้งตาราง
+- เรียงตาม id / balance / plays / wagered / net และ keyset pagination ด้วย (ค่า, user_id) ของแถวสุดท้าย
+  ผู้ใช้ทุกคนมีแถว credit และ user_totals (สร้างตอนสมัคร / seed / recount_user_totals)
+"""
+
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .models import Play, UserTotals, dialect_insert
+from .search import cursor_values, encode_cursor
+
+DIRECTORY_MAX_LIMIT = 100
+# prefix ที่ตรงไม่เกินจำนวนนี้ถือว่าเจาะจง: กรองผู้ใช้ที่ตรงทั้งหมดก่อนแล้วค่อยเรียง (ดู list_users)
+SEARCH_CANDIDATES = 20000
+# ตัวอักษรสูงสุดของ Unicode - ขอบบนของ range สำหรับ prefix บน SQLite
+_MAX_CHAR = "\U0010ffff"
+
+# sort → (คอลัมน์, table alias ที่มี index (ค่า, user_id), แปลงค่าจาก cursor)
+SORTS = {
+    "id": ("u.id", "u", int),
+    "balance": ("c.balance", "c", Decimal),
+    "plays": ("t.plays", "t", int),
+    "wagered": ("t.wagered_cents", "t", int),
+    "net": ("t.net_cents", "t", int),
+}
+
+
+# ===============================
+# Schema (migration / create_db)
+# ===============================
+def create_user_search(conn, concurrently: bool = False):
+    """index ค้นหาผู้ใช้ (รันซ้ำได้) - concurrently=True ต้องรันแบบ autocommit (PostgreSQL)"""
+    if conn.dialect.name == "postgresql":
+        option = "CONCURRENTLY " if concurrently else ""
+        for name, expression in (("email", "lower(email)"), ("name", "lower(full_name)"), ("phone", "phone")):
+            conn.execute(text(
+                f"CREATE INDEX {option}IF NOT EXISTS idx_users_{name}_prefix ON users ({expression} text_pattern_ops)"
+            ))
+        if not _ensure_trigram(conn):
+            print("⚠️  pg_trgm is not available - user substring search will scan the users table")
+            return
+        for name, expression in (("email", "lower(email)"), ("name", "lower(full_name)"), ("phone", "phone")):
+            conn.execute(text(
+                f"CREATE INDEX {option}IF NOT EXISTS idx_users_{name}_trgm ON users USING GIN ({expression} gin_trgm_ops)"
+            ))
+        return
+
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_xinfo(users)"))}
+    for name, expression in (("email_key", "lower(email)"), ("name_key", "lower(full_name)")):
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE users ADD COLUMN {name} TEXT GENERATED ALWAYS AS ({expression}) VIRTUAL"))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_users_{name} ON users ({name})"))
+
+
+def _ensure_trigram(conn) -> bool:
+    if conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+        return True
+    try:
+        if conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT":
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        else:
+            # savepoint - ถ้าไม่มีสิทธิ์สร้าง extension transaction ของ create_db ยังใช้ต่อได้
+            with conn.begin_nested():
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        return True
+    except Exception as e:
+        print(f"⚠️  CREATE EXTENSION pg_trgm failed: {e}")
+        return False
+
+
+# ===============================
+# Totals
+# ===============================
+def record_play(db: Session, play: Play):
+    """บวกตาที่เพิ่งเล่นเข้า user_totals (เรียกใน settle - transaction เดียวกับการหักเงินและ INSERT plays)"""
+    table = UserTotals.__table__
+    statement = dialect_insert(db)(table).values(
+        user_id=play.user_id,
+        plays=1,
+        wagered_cents=play.bet_cents,
+        net_cents=play.balance_after_cents - play.balance_before_cents,
+        last_played_at=play.played_at,
+    )
+    db.execute(statement.on_conflict_do_update(index_elements=["user_id"], set_={
+        "plays": table.c.plays + statement.excluded.plays,
+        "wagered_cents": table.c.wagered_cents + statement.excluded.wagered_cents,
+        "net_cents": table.c.net_cents + statement.excluded.net_cents,
+        "last_played_at": statement.excluded.last_played_at,
+    }))
+
+
+def recount_user_totals(conn):
+    """คำนวณ user_totals ใหม่จาก plays (ทุกผู้ใช้ รวมคนที่ยังไม่เคยเล่น) - plays ที่ archive ออกไปแล้วจะไม่ถูกนับ"""
+    conn.execute(text("DELETE FROM user_totals"))
+    conn.execute(text("""
+        INSERT INTO user_totals (user_id, plays, wagered_cents, net_cents, last_played_at)
+        SELECT u.id, COUNT(p.user_id), COALESCE(SUM(p.bet_cents), 0),
+               COALESCE(SUM(p.balance_after_cents - p.balance_before_cents), 0), MAX(p.played_at)
+        FROM users u LEFT JOIN plays p ON p.user_id = u.id
+        GROUP BY u.id
+    """))
+
+
+# ===============================
+# Directory
+# ===============================
+def _decode(cursor: Optional[str], convert, sort: str, dialect: str) -> Optional[tuple]:
+    """cursor → (ค่าที่เรียง, user_id) ของแถวสุดท้ายในหน้าก่อน"""
+    if not cursor:
+        return None
+    values = cursor_values(cursor)
+    try:
+        value = convert(values["v"]) if sort != "id" else None
+        if isinstance(value, Decimal) and dialect != "postgresql":
+            value = float(value)  # sqlite3 bind Decimal ไม่ได้ (คอลัมน์ NUMERIC เก็บเป็น REAL อยู่แล้ว)
+        return value, int(values["id"])
+    except (KeyError, InvalidOperation, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def _search_filter(dialect: str, q: str, match: str, params: dict) -> Tuple[str, Optional[str]]:
+    """(เงื่อนไขใน WHERE, เงื่อนไขเดียวกันที่ใช้ index ค้นหาได้ - None = ไม่ต้องตรวจว่าเจาะจงแค่ไหน)"""
+    q = q.strip().lower()
+    phone = re.sub(r"[\s\-]", "", q)
+    if dialect == "postgresql":
+        escape = lambda value: value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")  # noqa: E731
+        wrap = (lambda value: f"%{escape(value)}%") if match == "contains" else (lambda value: f"{escape(value)}%")
+        params.update(pattern=wrap(q), phone_pattern=wrap(phone))
+        condition = ("(lower(u.email) LIKE :pattern OR lower(u.full_name) LIKE :pattern"
+                     " OR u.phone LIKE :phone_pattern)")
+        return condition, condition if match == "prefix" else None
+    if match == "contains":
+        params.update(q=q, phone=phone)
+        return "(instr(u.email_key, :q) > 0 OR instr(u.name_key, :q) > 0 OR instr(u.phone, :phone) > 0)", None
+
+    params.update(low=q, high=q + _MAX_CHAR, phone_low=phone, phone_high=phone + _MAX_CHAR)
+    ranges = (("u.email_key", "low", "high"), ("u.name_key", "low", "high"), ("u.phone", "phone_low", "phone_high"))
+    condition = lambda mark: "(" + " OR ".join(  # noqa: E731
+        f"({mark}{column} >= :{low} AND {mark}{column} < :{high})" for column, low, high in ranges) + ")"
+    # + หน้าคอลัมน์ = ห้ามใช้ index ของคอลัมน์นั้น (ผู้ใช้ที่ตรงมีมาก เจอครบหน้าได้เร็วจากการเดินตามลำดับที่เรียง)
+    return condition("+"), condition("")
+
+
+def _selective(db: Session, indexed: str, params: dict) -> bool:
+    """ผู้ใช้ที่ตรง prefix มีไม่เกิน SEARCH_CANDIDATES (นับจาก index ค้นหา หยุดที่ SEARCH_CANDIDATES + 1)"""
+    matches = db.execute(text(f"SELECT COUNT(*) FROM (SELECT 1 FROM users u WHERE {indexed} LIMIT :candidates) m"),
+                         dict(params, candidates=SEARCH_CANDIDATES + 1)).scalar()
+    return matches <= SEARCH_CANDIDATES
+
+
+def list_users(db: Session, q: str = "", match: str = "prefix", sort: str = "id", order: str = "desc",
+               limit: int = 50, cursor: Optional[str] = None) -> dict:
+    """หนึ่งหน้าของ directory {"users", "next_cursor", "count"} - ค่าที่ไม่ถูกต้อง → ValueError"""
+    if sort not in SORTS:
+        raise ValueError(f"Invalid sort: {sort} (expected {', '.join(SORTS)})")
+    if order not in ("asc", "desc"):
+        raise ValueError("Invalid order: expected asc or desc")
+    if match not in ("prefix", "contains"):
+        raise ValueError("Invalid match: expected prefix or contains")
+    column, alias, convert = SORTS[sort]
+    limit = max(1, min(limit, DIRECTORY_MAX_LIMIT))
+    dialect = db.get_bind().dialect.name
+    after = _decode(cursor, convert, sort, dialect)
+
+    params = {"limit": limit + 1}
+    filters, materialize = [], False
+    if q and q.strip():
+        condition, indexed = _search_filter(dialect, q, match, params)
+        # planner คิดว่าผู้ใช้ที่ตรงกระจายทั่วลำดับที่เรียง จึงชอบเดิน index ของลำดับแล้วกรอง
+        # ซึ่งช้ามากเมื่อผู้ใช้ที่ตรงมีน้อยหรือกระจุกอยู่ไกล - prefix ที่เจาะจงจึงกรองจาก index ค้นหาก่อน
+        materialize = indexed is not None and _selective(db, indexed, params)
+        filters.append(indexed if materialize else condition)
+
+    # tie-breaker เป็น user_id ของตารางเดียวกับค่าที่เรียง จะได้ใช้ index (ค่า, user_id) ได้ทั้งช่วง
+    key = f"{alias}.user_id" if alias != "u" else "u.id"
+    direction, compare = ("DESC", "<") if order == "desc" else ("ASC", ">")
+    if after is not None:
+        if sort == "id":
+            filters.append(f"u.id {compare} :after_id")
+        else:
+            filters.append(f"({column}, {key}) {compare} (:after_value, :after_id)")
+            params["after_value"] = after[0]
+        params["after_id"] = after[1]
+
+    joins = f"""
+        {"JOIN" if alias == "c" else "LEFT JOIN"} credit c ON c.user_id = u.id
+        {"JOIN" if alias == "t" else "LEFT JOIN"} user_totals t ON t.user_id = u.id
+    """
+    columns = """u.id, u.email, u.full_name, u.phone, u.role, u.created_at,
+                 c.balance, t.plays, t.wagered_cents, t.net_cents, t.last_played_at"""
+    where = " AND ".join(filters) if filters else "1 = 1"
+    if materialize:
+        # กรองเฉพาะ id + ค่าที่เรียงใน CTE (MATERIALIZED = ห้าม planner รวมเข้ากับ ORDER BY ... LIMIT ด้านนอก)
+        # เรียงตัดหน้าจากผลนั้น แล้วค่อย join คอลัมน์ที่แสดงเฉพาะแถวในหน้า
+        value = "u.id" if sort == "id" else column
+        sorted_join = "" if alias == "u" else joins.strip().splitlines()[0 if alias == "c" else 1]
+        order_by = f"f.value {direction}, f.id {direction}"
+        statement = text(f"""
+            WITH found AS MATERIALIZED (
+                SELECT u.id, {value} AS value FROM users u {sorted_join} WHERE {where}
+            )
+            SELECT {columns}
+            FROM (SELECT id, value FROM found ORDER BY value {direction}, id {direction} LIMIT :limit) f
+            JOIN users u ON u.id = f.id
+            {joins}
+            ORDER BY {order_by}
+        """)
+    else:
+        order_by = f"u.id {direction}" if sort == "id" else f"{column} {direction}, {key} {direction}"
+        statement = text(f"SELECT {columns} FROM users u {joins} WHERE {where} ORDER BY {order_by} LIMIT :limit")
+    rows = db.execute(statement, params).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    users = [{
+        "id": row.id,
+        "email": row.email,
+        "full_name": row.full_name,
+        "phone": row.phone,
+        "role": row.role,
+        "created_at": row.created_at.isoformat() if hasattr(row.created_at, "isoformat") else row.created_at,
+        "balance": float(row.balance or 0),
+        "plays": row.plays or 0,
+        "wagered": (row.wagered_cents or 0) / 100,
+        "net": (row.net_cents or 0) / 100,
+        "last_played_at": row.last_played_at.isoformat() if hasattr(row.last_played_at, "isoformat") else row.last_played_at,
+    } for row in rows]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        values = {"id": last.id}
+        if sort != "id":
+            value = getattr(last, column.split(".")[1])
+            values["v"] = str(value) if isinstance(value, (Decimal, float)) else value
+        next_cursor = encode_cursor(values)
+    return {"users": users, "next_cursor": next_cursor, "count": len(users)}
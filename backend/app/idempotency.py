@@ -0,0 +1,323 @@
+"""
+Idempotency-Key สำหรับ request การเงิน (เล่นเกม ฝาก ถอน)
+
+Frontend ส่ง header "Idempotency-Key: <uuid>" มากับ request ถ้า network หลุดแล้ว retry ด้วย key เดิม
+server จะตอบ response เดิมที่เก็บไว้โดยไม่รัน handler (ไม่แตะ Credit) ซ้ำ
+
+- key ผูกกับผู้ใช้ (email จาก cookie) และต้องมากับ endpoint + body เดิม ไม่งั้นตอบ 422
+- request ซ้ำที่มาพร้อมกันใน process เดียวกัน รอผลของ request แรกแทนที่จะรันแข่งกัน
+- เก็บ 2 ชั้น: LRU ในหน่วยความจำ (มี TTL) และตาราง idempotency_keys (อยู่รอดข้าม restart / workers)
+  แถว "processing" ถูกจองไว้ก่อนรัน handler ถ้า worker อื่นกำลังรัน key เดียวกันอยู่จะตอบ 409
+  การจองเป็น lease IDEMPOTENCY_PROCESSING_TIMEOUT_S วินาที - ถ้า worker ตาย / restart กลาง request
+  retry หลังหมด lease จะรับช่วง key ไปรันใหม่ ไม่ติด 409 จนหมด TTL
+- เก็บเฉพาะ response ที่ status < 500 - ถ้า handler error 5xx จะปล่อย key ให้ retry รันใหม่ได้
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from .models import SessionLocal, IdempotencyKey
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+IDEMPOTENCY_REPLAYED_HEADER = "idempotent-replayed"
+IDEMPOTENCY_TTL_S = float(os.getenv("IDEMPOTENCY_TTL_S", str(24 * 3600)))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_PURGE_EVERY = int(os.getenv("IDEMPOTENCY_PURGE_EVERY", "1000"))
+# ต้องนานกว่า request ที่ช้าที่สุด ไม่งั้น retry จะรับช่วง key ขณะที่ request แรกยังรันอยู่
+IDEMPOTENCY_PROCESSING_TIMEOUT_S = float(os.getenv("IDEMPOTENCY_PROCESSING_TIMEOUT_S", "60"))
+IDEMPOTENCY_MAX_KEY_LENGTH = 255
+
+IDEMPOTENT_ENDPOINTS = {
+    ("POST", "/api/game1/play"),
+    ("POST", "/api/game2/play"),
+    ("POST", "/api/wheel/bet"),
+    ("POST", "/deposit"),
+    ("POST", "/withdraw"),
+}
+
+# ผลของ reserve() เมื่อ worker อื่นจอง key ไว้แล้วแต่ยังไม่เสร็จ
+PROCESSING = "processing"
+
+
+class StoredResponse:
+    __slots__ = ("request_hash", "status_code", "content_type", "body", "expires_at")
+
+    def __init__(self, request_hash: str, status_code: int, content_type: Optional[str], body: bytes, expires_at: float):
+        self.request_hash = request_hash
+        self.status_code = status_code
+        self.content_type = content_type
+        self.body = body
+        self.expires_at = expires_at
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    return hashlib.sha256(f"{method} {path}\n".encode() + body).hexdigest()
+
+
+class IdempotencyStore:
+    """LRU + TTL ในหน่วยความจำ ซ้อนบนตาราง idempotency_keys"""
+
+    def __init__(self, session_factory=SessionLocal, ttl_s: float = IDEMPOTENCY_TTL_S,
+                 max_entries: int = IDEMPOTENCY_CACHE_SIZE,
+                 processing_timeout_s: float = IDEMPOTENCY_PROCESSING_TIMEOUT_S):
+        self.session_factory = session_factory
+        self.ttl_s = ttl_s
+        self.processing_timeout_s = processing_timeout_s
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, str], StoredResponse]" = OrderedDict()
+        # request แรกของแต่ละ key ที่กำลังรันอยู่ใน process นี้ (request ซ้ำจะ await ตัวนี้)
+        self.inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._completed = 0
+
+    # ---------- memory ----------
+    def cached(self, ident: Tuple[str, str]) -> Optional[StoredResponse]:
+        stored = self._cache.get(ident)
+        if stored is None:
+            return None
+        if stored.expires_at <= time.time():
+            del self._cache[ident]
+            return None
+        self._cache.move_to_end(ident)
+        return stored
+
+    def remember(self, ident: Tuple[str, str], stored: StoredResponse):
+        self._cache[ident] = stored
+        self._cache.move_to_end(ident)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    # ---------- database (sync - เรียกผ่าน threadpool) ----------
+    def _from_row(self, row: IdempotencyKey) -> StoredResponse:
+        expires_at = row.created_at + timedelta(seconds=self.ttl_s)
+        return StoredResponse(
+            row.request_hash, row.status_code, row.content_type,
+            (row.response_body or "").encode("utf-8"),
+            time.time() + max(0.0, (expires_at - datetime.utcnow()).total_seconds()),
+        )
+
+    def reserve(self, owner: str, key: str, endpoint: str, request_hash: str):
+        """
+        จอง key ก่อนรัน handler
+        คืน (True, None) ถ้าจองได้ (รวมการรับช่วงแถว processing ที่หมด lease), (False, StoredResponse)
+        ถ้ามีผลเก็บไว้แล้ว, หรือ (False, PROCESSING) ถ้ามีคนอื่นจองไว้และยังรันไม่เสร็จ
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.ttl_s)
+        with self.session_factory() as session:
+            row = session.query(IdempotencyKey).filter(
+                IdempotencyKey.owner == owner, IdempotencyKey.key == key
+            ).first()
+            if row is not None and row.created_at < cutoff:
+                session.delete(row)
+                session.flush()
+                row = None
+            if row is not None and row.status == "completed":
+                return False, self._from_row(row)
+            if row is not None:
+                # ผู้จองเดิมไม่ complete / release ภายใน lease (worker ตาย) - UPDATE แบบมีเงื่อนไข
+                # ให้ retry ที่มาพร้อมกันรับช่วงได้คนเดียว แล้วเริ่ม lease ใหม่
+                taken = session.query(IdempotencyKey).filter(
+                    IdempotencyKey.owner == owner, IdempotencyKey.key == key,
+                    IdempotencyKey.status == "processing",
+                    IdempotencyKey.created_at < now - timedelta(seconds=self.processing_timeout_s),
+                ).update({
+                    IdempotencyKey.endpoint: endpoint,
+                    IdempotencyKey.request_hash: request_hash,
+                    IdempotencyKey.created_at: now,
+                }, synchronize_session=False)
+                session.commit()
+                if taken:
+                    print(f"♻️  Idempotency-Key taken over after {self.processing_timeout_s:.0f}s lease: {endpoint}")
+                    return True, None
+                return False, PROCESSING
+
+            session.add(IdempotencyKey(owner=owner, key=key, endpoint=endpoint, request_hash=request_hash))
+            try:
+                session.commit()
+            except IntegrityError:
+                # worker อื่นจอง key เดียวกันไปก่อนเสี้ยววินาที
+                session.rollback()
+                row = session.query(IdempotencyKey).filter(
+                    IdempotencyKey.owner == owner, IdempotencyKey.key == key
+                ).first()
+                if row is None or row.status != "completed":
+                    return False, PROCESSING
+                return False, self._from_row(row)
+        return True, None
+
+    def complete(self, owner: str, key: str, stored: StoredResponse):
+        with self.session_factory() as session:
+            session.query(IdempotencyKey).filter(
+                IdempotencyKey.owner == owner, IdempotencyKey.key == key
+            ).update({
+                IdempotencyKey.status: "completed",
+                IdempotencyKey.status_code: stored.status_code,
+                IdempotencyKey.content_type: stored.content_type,
+                IdempotencyKey.response_body: stored.body.decode("utf-8", errors="replace"),
+                IdempotencyKey.completed_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            session.commit()
+        self._completed += 1
+        if self._completed % IDEMPOTENCY_PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def release(self, owner: str, key: str):
+        with self.session_factory() as session:
+            session.query(IdempotencyKey).filter(
+                IdempotencyKey.owner == owner, IdempotencyKey.key == key,
+                IdempotencyKey.status == "processing",
+            ).delete(synchronize_session=False)
+            session.commit()
+
+    def purge_expired(self) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_s)
+        with self.session_factory() as session:
+            deleted = session.query(IdempotencyKey).filter(
+                IdempotencyKey.created_at < cutoff
+            ).delete(synchronize_session=False)
+            session.commit()
+        return deleted
+
+
+idempotency_store = IdempotencyStore()
+
+
+async def _send_json(send, status_code: int, detail: str):
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _replay(send, stored: StoredResponse):
+    headers = [
+        (b"content-length", str(len(stored.body)).encode()),
+        (IDEMPOTENCY_REPLAYED_HEADER.encode(), b"true"),
+    ]
+    if stored.content_type:
+        headers.append((b"content-type", stored.content_type.encode()))
+    await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware ที่ทำให้ IDEMPOTENT_ENDPOINTS รันครั้งเดียวต่อ Idempotency-Key
+
+    owner: ฟังก์ชันรับ Request แล้วคืน email ของผู้ใช้ (None = ไม่ได้ login ปล่อยให้ handler ตอบ 401)
+    """
+
+    def __init__(self, app, owner: Callable[[Request], Optional[str]], store: IdempotencyStore = idempotency_store):
+        self.app = app
+        self.owner = owner
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in IDEMPOTENT_ENDPOINTS:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        owner = self.owner(request)
+        if not key or not owner:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > IDEMPOTENCY_MAX_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key must be at most {IDEMPOTENCY_MAX_KEY_LENGTH} characters")
+            return
+
+        body = await Request(scope, receive).body()
+        request_hash = request_fingerprint(scope["method"], scope["path"], body)
+        endpoint = f"{scope['method']} {scope['path']}"
+        ident = (owner, key)
+
+        while True:
+            stored = self.store.cached(ident)
+            if stored is None and ident in self.store.inflight:
+                # request ซ้ำที่มาพร้อมกัน - รอ request แรก (None = request แรกไม่ได้เก็บผล ลองใหม่)
+                stored = await asyncio.shield(self.store.inflight[ident])
+                if stored is None:
+                    continue
+            if stored is not None:
+                if stored.request_hash != request_hash:
+                    await _send_json(send, 422, "Idempotency-Key was already used with a different request")
+                else:
+                    await _replay(send, stored)
+                return
+            break
+
+        future = asyncio.get_running_loop().create_future()
+        self.store.inflight[ident] = future
+        try:
+            await self._execute(scope, send, body, owner, key, endpoint, request_hash, future)
+        finally:
+            if not future.done():
+                future.set_result(None)
+            del self.store.inflight[ident]
+
+    async def _execute(self, scope, send, body, owner, key, endpoint, request_hash, future):
+        reserved, existing = await run_in_threadpool(self.store.reserve, owner, key, endpoint, request_hash)
+        if not reserved:
+            if existing is PROCESSING:
+                await _send_json(send, 409, "A request with this Idempotency-Key is still being processed")
+            elif existing.request_hash != request_hash:
+                await _send_json(send, 422, "Idempotency-Key was already used with a different request")
+            else:
+                self.store.remember((owner, key), existing)
+                future.set_result(existing)
+                await _replay(send, existing)
+            return
+
+        # ส่ง body ที่อ่านไว้แล้วให้ handler และเก็บ response ที่ส่งออกไป
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if body_sent:
+                return {"type": "http.disconnect"}
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status_code = 500
+        content_type = None
+        chunks = []
+
+        async def send_and_capture(message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+        except BaseException:
+            await run_in_threadpool(self.store.release, owner, key)
+            raise
+
+        if status_code >= 500:
+            await run_in_threadpool(self.store.release, owner, key)
+            return
+
+        stored = StoredResponse(request_hash, status_code, content_type, b"".join(chunks), time.time() + self.store.ttl_s)
+        await run_in_threadpool(self.store.complete, owner, key, stored)
+        self.store.remember((owner, key), stored)
+        future.set_result(stored)
@@ -0,0 +1,166 @@
+"""
+Responsible gambling limits - ขาดทุนสุทธิใน 24 ชม. และยอดฝากใน 7 วัน แบบ rolling window
+
+ไม่ SUM ประวัติ game1 / game2 ทุกครั้งที่เดิมพัน: ผู้ใช้แต่ละคนมีแถว wallet_limits หนึ่งแถว (models.WalletLimit)
+เก็บตัวสะสมเป็น bucket ละ LIMIT_BUCKET_MINUTES นาที ที่อัพเดทตอน settle
+- ตรวจ: อ่านแถวเดียวด้วย primary key (FOR UPDATE บน PostgreSQL) ตัด bucket ที่หลุด window ออกจากผลรวม
+  แล้วเทียบกับ limit - งานต่อครั้งขึ้นกับจำนวน bucket ใน window เท่านั้น ไม่ขึ้นกับจำนวนตาที่เล่น
+- บันทึก: บวกเข้า bucket ปัจจุบันและผลรวม ใน transaction เดียวกับการหัก / เพิ่มยอดเงิน (ภายใน settle ของ run_write)
+  ถ้าเกิน limit → HTTPException 403 ทั้ง transaction rollback จึงไม่มีการหักเงินโดยไม่ได้บันทึก (หรือกลับกัน)
+
+ความละเอียดของ window = ขนาด bucket: bucket ถูกตัดออกเมื่อหลุด window ทั้ง bucket แล้ว
+(นับค้างได้ไม่เกิน 1 bucket - ผลคือเข้มกว่า limit จริงเล็กน้อย ไม่ใช่หลวมกว่า)
+
+ขาดทุนสุทธิ = เงินที่เสีย - เงินที่ได้ ก่อนเล่นตรวจว่า ขาดทุนสุทธิ + เดิมพันตานี้ (กรณีแพ้) ไม่เกิน limit
+limit ที่ผู้ใช้ไม่ได้ตั้งใช้ค่าเริ่มต้นจาก env (0 = ไม่จำกัด)
+ผู้ใช้ลด limit ของตัวเองได้ทันที - เพิ่มหรือยกเลิก limit ต้องให้ admin ทำ
+"""
+
+import json
+import os
+import time
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from . import rules
+from .models import WalletLimit, dialect_insert
+
+LIMIT_LOSS_WINDOW_H = float(os.getenv("LIMIT_LOSS_WINDOW_H", "24"))
+LIMIT_DEPOSIT_WINDOW_H = float(os.getenv("LIMIT_DEPOSIT_WINDOW_H", "168"))
+LIMIT_BUCKET_MINUTES = float(os.getenv("LIMIT_BUCKET_MINUTES", "60"))
+LIMIT_DEFAULT_MAX_LOSS = float(os.getenv("LIMIT_DEFAULT_MAX_LOSS", "0"))
+LIMIT_DEFAULT_MAX_DEPOSIT = float(os.getenv("LIMIT_DEFAULT_MAX_DEPOSIT", "0"))
+
+BUCKET_S = int(LIMIT_BUCKET_MINUTES * 60)
+
+
+class Window(NamedTuple):
+    kind: str              # prefix ของคอลัมน์ใน wallet_limits ("loss" / "deposit")
+    window_s: int
+    default_max_cents: int
+    message: str
+
+
+LOSS = Window("loss", int(LIMIT_LOSS_WINDOW_H * 3600), rules.to_cents(LIMIT_DEFAULT_MAX_LOSS),
+              "Loss limit reached")
+DEPOSIT = Window("deposit", int(LIMIT_DEPOSIT_WINDOW_H * 3600), rules.to_cents(LIMIT_DEFAULT_MAX_DEPOSIT),
+                 "Deposit limit reached")
+
+
+# ===============================
+# Rolling window accumulators
+# ===============================
+def _advance(row: WalletLimit, window: Window, now: float) -> List[list]:
+    """ตัด bucket ที่หลุด window ออก (ลบออกจากผลรวม) คืน bucket ที่เหลือ"""
+    buckets = json.loads(getattr(row, f"{window.kind}_buckets") or "[]")
+    cutoff = now - window.window_s
+    expired = 0
+    while buckets and buckets[0][0] + BUCKET_S <= cutoff:
+        expired += buckets.pop(0)[1]
+    if expired:
+        setattr(row, f"{window.kind}_cents", (getattr(row, f"{window.kind}_cents") or 0) - expired)
+        setattr(row, f"{window.kind}_buckets", json.dumps(buckets))
+    return buckets
+
+
+def _add(row: WalletLimit, window: Window, buckets: List[list], now: float, cents: int):
+    start = int(now // BUCKET_S * BUCKET_S)
+    if buckets and buckets[-1][0] == start:
+        buckets[-1][1] += cents
+    else:
+        buckets.append([start, cents])
+    setattr(row, f"{window.kind}_cents", (getattr(row, f"{window.kind}_cents") or 0) + cents)
+    setattr(row, f"{window.kind}_buckets", json.dumps(buckets))
+
+
+def max_cents(row: Optional[WalletLimit], window: Window) -> Optional[int]:
+    """limit ที่มีผล (สตางค์) - None = ไม่จำกัด"""
+    value = getattr(row, f"max_{window.kind}_cents") if row is not None else None
+    if value is None:
+        value = window.default_max_cents or None
+    return value
+
+
+def _locked_row(db: Session, user_id: int) -> WalletLimit:
+    """แถว wallet_limits ของผู้ใช้ (ล็อกไว้จนจบ transaction) - สร้างให้ครั้งแรกที่ใช้"""
+    query = db.query(WalletLimit).filter(WalletLimit.user_id == user_id).with_for_update()
+    row = query.first()
+    if row is None:
+        # INSERT ... ON CONFLICT DO NOTHING - worker อื่นอาจสร้างแถวเดียวกันพร้อมกัน
+        db.execute(dialect_insert(db)(WalletLimit.__table__).values(
+            user_id=user_id, loss_cents=0, loss_buckets="[]", deposit_cents=0, deposit_buckets="[]",
+        ).on_conflict_do_nothing(index_elements=["user_id"]))
+        row = query.first()
+    return row
+
+
+def _charge(db: Session, user_id: int, window: Window, check_cents: int, record_cents: int):
+    row = _locked_row(db, user_id)
+    now = time.time()
+    buckets = _advance(row, window, now)
+    limit = max_cents(row, window)
+    used = getattr(row, f"{window.kind}_cents") or 0
+    if limit is not None and used + check_cents > limit:
+        remaining = max(0, limit - used) / 100
+        raise HTTPException(status_code=403, detail=f"{window.message}: {remaining:.2f} remaining in the current window")
+    if record_cents:
+        _add(row, window, buckets, now, record_cents)
+
+
+def record_bet(db: Session, user_id: int, bet_amount, balance_change):
+    """ตรวจ loss limit ด้วยเดิมพันตานี้แล้วบันทึกผลสุทธิ - เรียกใน settle ก่อน commit (เช่นเดียวกับการหักเงิน)"""
+    _charge(db, user_id, LOSS, rules.to_cents(bet_amount), -rules.to_cents(balance_change))
+
+
+def record_deposit(db: Session, user_id: int, amount):
+    """ตรวจ deposit limit แล้วบันทึกยอดฝาก - เรียกใน transaction เดียวกับการเพิ่มยอดเงิน"""
+    cents = rules.to_cents(amount)
+    _charge(db, user_id, DEPOSIT, cents, cents)
+
+
+# ===============================
+# Settings / usage
+# ===============================
+def summary(db: Session, user_id: int) -> dict:
+    """limit และยอดที่ใช้ไปใน window ปัจจุบัน (อ่านอย่างเดียว)"""
+    row = db.query(WalletLimit).filter(WalletLimit.user_id == user_id).first()
+    now = time.time()
+    result = {}
+    for window in (LOSS, DEPOSIT):
+        used = 0
+        if row is not None:
+            cutoff = now - window.window_s
+            used = sum(cents for start, cents in json.loads(getattr(row, f"{window.kind}_buckets") or "[]")
+                       if start + BUCKET_S > cutoff)
+        limit = max_cents(row, window)
+        result[window.kind] = {
+            "limit": limit / 100 if limit is not None else None,
+            "used": used / 100,
+            "remaining": max(0, limit - used) / 100 if limit is not None else None,
+            "window_hours": window.window_s / 3600,
+            "custom": row is not None and getattr(row, f"max_{window.kind}_cents") is not None,
+        }
+    return result
+
+
+def set_limits(db: Session, user_id: int, changes: dict, allow_raise: bool = False):
+    """
+    changes = {"loss": จำนวนเงิน | None, "deposit": ...} (None = กลับไปใช้ค่าเริ่มต้น)
+    allow_raise=False (ผู้ใช้ตั้งเอง): ลดได้อย่างเดียว - เพิ่มหรือยกเลิก limit → 403
+    """
+    row = _locked_row(db, user_id)
+    for window in (LOSS, DEPOSIT):
+        if window.kind not in changes:
+            continue
+        amount = changes[window.kind]
+        if amount is not None and amount < 0:
+            raise HTTPException(status_code=400, detail="Limit must not be negative")
+        new = rules.to_cents(amount) if amount is not None else None
+        if not allow_raise:
+            current = max_cents(row, window)
+            effective = new if new is not None else window.default_max_cents or None
+            if current is not None and (effective is None or effective > current):
+                raise HTTPException(status_code=403, detail="Limits can only be lowered; contact support to raise them")
+        setattr(row, f"max_{window.kind}_cents", new)
@@ -1,20 +1,45 @@
 from fastapi import FastAPI, Request, HTTPException, status, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-import os, re
+from typing import List, Optional
+from datetime import datetime
+import os, re, csv, io
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from decimal import Decimal
 
 # import ของคุณเอง
-from .models import SessionLocal, User, Credit, Report, Game1, Game2, Game2Stats, create_db, ensure_admin
+from .models import SessionLocal, engine, read_engine, write_engine, User, Credit, Game1, Game2, UserTotals
+from .profiler import SQLProfilerMiddleware, install_query_listeners
+from .sampling import SamplingProfilerMiddleware, profiler_control
+from .db_routing import ReadYourWritesMiddleware, read_session
+from .writer import run_write
+from .idempotency import IdempotencyMiddleware
+from .ratelimit import RateLimitMiddleware
+from .startup import run_startup
+from .partitions import iter_plays
+from . import limits
+from .cache import cached, depends_on, install_invalidation_hooks, response_cache
+from .bus import event_bus
+from .search import search_reports
+from . import triage
+from .directory import list_users
+from . import services
+from . import rules
+from . import rounds
 
 APP_NAME = os.getenv("APP_NAME", "MyApp")
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin@xbet.com").lower()
 
 app = FastAPI(title=APP_NAME)
 
+# ✅ Idempotency-Key สำหรับเล่นเกม / ฝาก / ถอน (เพิ่มก่อน CORS เพื่อให้ response ที่ replay ยังได้ CORS headers)
+app.add_middleware(IdempotencyMiddleware, owner=lambda request: current_email(request))
+
+# ✅ Rate limit (token bucket) ต่อผู้ใช้ / IP - อยู่นอก idempotency เพื่อให้ตัด request เกินก่อนถึง store และ database
+app.add_middleware(RateLimitMiddleware, owner=lambda request: current_email(request))
+
 # ✅ เปิด CORS ให้ Next.js เรียกได้
 app.add_middleware(
     CORSMiddleware,
@@ -33,11 +58,34 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db(request: Request):
+    # อ่านอย่างเดียว: ใช้ replica ถ้ามี (กลับไป primary ชั่วคราวหลังผู้ใช้เขียนข้อมูล)
+    db = read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+# ✅ Read-through cache ของ endpoint อ่าน (invalidate ตาม tag หลัง commit - ดู cache.py)
+install_invalidation_hooks()
+
+# ✅ Read-your-writes: หลังเขียนข้อมูล ให้ request อ่านของผู้ใช้คนนั้นไปที่ primary ชั่วคราว
+app.add_middleware(ReadYourWritesMiddleware)
+
 @app.on_event("startup")
 async def on_startup():
-    create_db()
-    with SessionLocal() as s:
-        ensure_admin(s)
+    # ตรวจ schema version + seed + warm pool (ดู startup.py) และเก็บเวลาแต่ละขั้นไว้ดูภายหลัง
+    app.state.startup_timings = run_startup()
+    # ✅ Event bus ข้าม workers (LISTEN/NOTIFY บน PostgreSQL, Unix socket บน SQLite - ดู bus.py)
+    event_bus.start()
+    print(f"📡 Event bus started: {event_bus.name}")
+    # ✅ วงล้อแบบหลายคน: ticker ตัดสินรอบที่ปิดรับแล้ว + push สถานะรอบผ่าน SSE (ดู rounds.py)
+    rounds.round_hub.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await rounds.round_hub.stop()
+    event_bus.stop()
 
 
 def current_email(request: Request) -> str | None:
@@ -54,6 +102,15 @@ def must_admin(request: Request):
     if email != ADMIN_EMAIL:
         raise HTTPException(status_code=403, detail="Admin only")
 
+# ✅ SQL profiler (เปิดด้วย SQL_PROFILER=1 หรือ admin ส่ง header X-SQL-Profile: 1)
+install_query_listeners(engine)
+install_query_listeners(read_engine)
+install_query_listeners(write_engine)
+app.add_middleware(SQLProfilerMiddleware, is_admin=lambda request: current_email(request) == ADMIN_EMAIL)
+
+# ✅ Sampling profiler (admin arm ผ่าน /api/admin/profiler/arm หรือส่ง header X-Profile-Request: 1)
+app.add_middleware(SamplingProfilerMiddleware, is_admin=lambda request: current_email(request) == ADMIN_EMAIL)
+
 # ---------- Models ----------
 class RegisterPayload(BaseModel):
     full_name: str
@@ -73,18 +130,38 @@ class DepositPayload(BaseModel):
 class WithdrawPayload(BaseModel):
     amount: float
 
+class LimitsPayload(BaseModel):
+    max_loss: Optional[float] = None     # ขาดทุนสุทธิสูงสุดใน window (null = กลับไปใช้ค่าเริ่มต้น)
+    max_deposit: Optional[float] = None  # ยอดฝากสูงสุดใน window
+
 class ReportPayload(BaseModel):
     title: str
     category: str
     description: str
 
+class ReportStatusPayload(BaseModel):
+    ids: List[int]
+    status: str
+
+class ReportClosePayload(BaseModel):
+    ids: Optional[List[int]] = None               # ระบุ id หรือใช้ filter ด้านล่าง (ปิดครั้งละไม่เกิน REPORT_BULK_MAX)
+    categories: Optional[List[str]] = None
+    statuses: Optional[List[str]] = None
+    updated_before: Optional[datetime] = None
+
+class ProfilerArmPayload(BaseModel):
+    path: str
+    count: int = 1
+    memory: bool = False
+
 # ---------- Endpoints ----------
 @app.get("/")
 def root(request: Request):
     return {"ok": True, "service": "fastapi", "email": current_email(request)}
 
 @app.get("/me")
-def me(request: Request, db: Session = Depends(get_db)):
+@cached("me", current_email)
+def me(request: Request, db: Session = Depends(get_read_db)):
     email = current_email(request)
     if not email:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -93,6 +170,7 @@ def me(request: Request, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == email).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    depends_on(f"user:{user.id}")
     
     return {
         "email": user.email,
@@ -102,6 +180,7 @@ def me(request: Request, db: Session = Depends(get_db)):
     }
 
 @app.get("/balance")
+@cached("balance", current_email)
 def balance(request: Request, db: Session = Depends(get_db)):
     email = current_email(request)
     if not email:
@@ -111,6 +190,7 @@ def balance(request: Request, db: Session = Depends(get_db)):
     user = db.query(User).filter(func.lower(User.email) == email).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    depends_on(f"user:{user.id}", f"credit:{user.id}")
     
     # ดึง balance จาก credit table
     user_credit = db.query(Credit).filter(Credit.user_id == user.id).first()
@@ -128,28 +208,67 @@ def balance(request: Request, db: Session = Depends(get_db)):
         "last_updated": user_credit.updated_at
     }
 
+@app.get("/api/admin/reports/search")
+def search_reports_endpoint(request: Request, q: str = "", category: str = None, status: str = None,
+                            limit: int = 20, cursor: str = None, db: Session = Depends(get_read_db)):
+    """
+    ค้นหา reports แบบ full-text (Admin only) - category / status ส่งได้หลายค่าคั่นด้วย comma
+    หน้าถัดไป: ส่ง next_cursor ที่ได้กลับมาเป็น cursor
+    """
+    must_admin(request)
+    
+    try:
+        return {"success": True, **search_reports(
+            db, q,
+            categories=category.split(",") if category else None,
+            statuses=status.split(",") if status else None,
+            limit=limit, cursor=cursor,
+        )}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/admin/reports/status")
+async def bulk_report_status(payload: ReportStatusPayload, request: Request, db: Session = Depends(get_db)):
+    """
+    เปลี่ยน status ของหลาย reports ในครั้งเดียว (Admin only) - ผลราย id:
+    updated / unchanged / invalid_transition / not_found
+    """
+    must_admin(request)
+    
+    result = await run_write(db, lambda db: triage.transition_reports(db, payload.ids, payload.status))
+    
+    print(f"🗂️  Reports → {payload.status}: {result['counts']}")
+    return {"success": True, **result}
+
+@app.post("/api/admin/reports/bulk-close")
+async def bulk_close_reports(payload: ReportClosePayload, request: Request, db: Session = Depends(get_db)):
+    """
+    ปิด reports ตาม ids หรือตาม filter categories / statuses / updated_before (Admin only)
+    has_more = true แปลว่ายังมี report ตาม filter เหลือ เรียกซ้ำได้
+    """
+    must_admin(request)
+    
+    result = await run_write(db, lambda db: triage.close_reports(
+        db, payload.ids, payload.categories, payload.statuses, payload.updated_before,
+    ))
+    
+    print(f"🗂️  Reports closed: {result['counts']}")
+    return {"success": True, **result}
+
+@app.get("/api/admin/reports/counters")
+def report_counters(request: Request, db: Session = Depends(get_read_db)):
+    """
+    จำนวน reports ต่อ category × status (จากตัวนับ ไม่ต้อง COUNT ทั้งตาราง)
+    """
+    must_admin(request)
+    return {"success": True, **triage.report_counts(db)}
+
 @app.get("/reports")
-def reports(request: Request, db: Session = Depends(get_db)):
+def reports(request: Request, db: Session = Depends(get_read_db)):
     must_admin(request)
     
     # ดึง reports ทั้งหมดพร้อมข้อมูล user
-    reports = db.query(Report).join(User).order_by(Report.created_at.desc()).all()
-    
-    reports_data = []
-    for report in reports:
-        reports_data.append({
-            "id": report.id,
-            "title": report.title,
-            "category": report.category,
-            "description": report.description,
-            "status": report.status,
-            "user_email": report.user.email,
-            "user_name": report.user.full_name,
-            "created_at": report.created_at.isoformat(),
-            "updated_at": report.updated_at.isoformat()
-        })
-    
-    return {"reports": reports_data}
+    return {"reports": services.list_reports(db)}
 
 @app.post("/api/submit-report")
 async def submit_report(payload: ReportPayload, request: Request, db: Session = Depends(get_db)):
@@ -157,45 +276,29 @@ async def submit_report(payload: ReportPayload, request: Request, db: Session =
     if not email:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    # ตรวจสอบข้อมูล
-    if not payload.title or not payload.category or not payload.description:
-        raise HTTPException(status_code=400, detail="All fields are required")
-    
-    if payload.category not in ["technical", "payment", "account", "betting", "suggestion", "other"]:
-        raise HTTPException(status_code=400, detail="Invalid category")
-    
     # หา user
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user_id = services.user_by_email(db, email).id
     
     print(f"📝 Report submission: {email} - {payload.title[:50]}...")
     
-    # สร้าง report ใหม่
-    new_report = Report(
-        user_id=user.id,
-        title=payload.title.strip(),
-        category=payload.category,
-        description=payload.description.strip(),
-        status="pending"
-    )
-    
     try:
-        db.add(new_report)
-        db.commit()
-        db.refresh(new_report)
+        # สร้าง report ใหม่ (ตรวจข้อมูลใน services.submit_report)
+        report_id = await run_write(db, lambda db: services.submit_report(
+            db, user_id, payload.title, payload.category, payload.description,
+        ).id)
         
-        print(f"✅ Report saved successfully: ID {new_report.id}")
+        print(f"✅ Report saved successfully: ID {report_id}")
         
         return {
             "message": "Report submitted successfully",
-            "report_id": new_report.id,
+            "report_id": report_id,
             "status": "pending"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error saving report: {e}")
-        db.rollback()
         raise HTTPException(status_code=500, detail="Failed to save report")
 
 @app.post("/api/register")
@@ -237,6 +340,7 @@ async def register(payload: RegisterPayload, db: Session = Depends(get_db)):
         balance=Decimal('0.00')
     )
     db.add(user_credit)
+    db.add(UserTotals(user_id=user.id))  # แถวยอดรวมการเล่น (admin user directory)
     db.commit()
     
     return {"message": "Registered successfully"}
@@ -289,20 +393,11 @@ async def deposit(payload: DepositPayload, request: Request, db: Session = Depen
     print(f"💰 Deposit request: {email} wants to deposit {payload.amount}")
     
     # ดึงข้อมูล user
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # อัพเดต balance
-    user_credit = db.query(Credit).filter(Credit.user_id == user.id).first()
-    if not user_credit:
-        user_credit = Credit(user_id=user.id, balance=Decimal('0.00'))
-        db.add(user_credit)
+    user_id = services.user_by_email(db, email).id
     
-    old_balance = float(user_credit.balance)
-    user_credit.balance += Decimal(str(payload.amount))
-    new_balance = float(user_credit.balance)
-    db.commit()
+    # อัพเดต balance (ผ่าน writer queue ถ้าเปิด SQLite production mode)
+    old_balance, new_balance = await run_write(db, lambda db: services.deposit(db, user_id, payload.amount),
+                                               user_id=user_id)
     
     print(f"✅ Deposit successful: {email} balance updated from {old_balance} to {new_balance}")
     
@@ -324,21 +419,10 @@ async def withdraw(payload: WithdrawPayload, request: Request, db: Session = Dep
     print(f"💸 Withdraw request: {email} wants to withdraw {payload.amount}")
     
     # ดึงข้อมูล user
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # ตรวจสอบ balance เพียงพอ
-    user_credit = db.query(Credit).filter(Credit.user_id == user.id).first()
-    if not user_credit or user_credit.balance < Decimal(str(payload.amount)):
-        print(f"❌ Insufficient balance: {email} has {user_credit.balance if user_credit else 0}, wants {payload.amount}")
-        raise HTTPException(status_code=400, detail="Insufficient balance")
+    user_id = services.user_by_email(db, email).id
     
-    # หัก balance
-    old_balance = float(user_credit.balance)
-    user_credit.balance -= Decimal(str(payload.amount))
-    new_balance = float(user_credit.balance)
-    db.commit()
+    old_balance, new_balance = await run_write(db, lambda db: services.withdraw(db, user_id, payload.amount),
+                                               user_id=user_id)
     
     print(f"✅ Withdrawal successful: {email} balance updated from {old_balance} to {new_balance}")
     
@@ -348,6 +432,83 @@ async def withdraw(payload: WithdrawPayload, request: Request, db: Session = Dep
         "withdrawn_amount": payload.amount
     }
 
+# ===============================
+# Responsible gambling limits (ดู limits.py)
+# ===============================
+def _limit_changes(payload: LimitsPayload) -> dict:
+    fields = payload.model_fields_set
+    changes = {}
+    if "max_loss" in fields:
+        changes["loss"] = payload.max_loss
+    if "max_deposit" in fields:
+        changes["deposit"] = payload.max_deposit
+    return changes
+
+@app.get("/api/limits")
+async def get_limits(request: Request, db: Session = Depends(get_db)):
+    """
+    ดู limit ขาดทุน / ยอดฝาก และยอดที่ใช้ไปใน window ปัจจุบัน
+    """
+    email = current_email(request)
+    if not email:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    user = db.query(User).filter(func.lower(User.email) == email).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return {"success": True, "limits": limits.summary(db, user.id)}
+
+@app.put("/api/limits")
+async def update_limits(payload: LimitsPayload, request: Request, db: Session = Depends(get_db)):
+    """
+    ตั้ง limit ของตัวเอง (ลดได้อย่างเดียว - เพิ่มหรือยกเลิกต้องให้ admin ทำ)
+    """
+    email = current_email(request)
+    if not email:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    user = db.query(User).filter(func.lower(User.email) == email).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    user_id = user.id
+    await run_write(db, lambda db: limits.set_limits(db, user_id, _limit_changes(payload)), user_id=user_id)
+    
+    print(f"🛑 Limits updated: {email} {_limit_changes(payload)}")
+    return {"success": True, "limits": limits.summary(db, user_id)}
+
+@app.get("/api/admin/users")
+def admin_users(request: Request, q: str = "", match: str = "prefix", sort: str = "id", order: str = "desc",
+                limit: int = 50, cursor: str = None, db: Session = Depends(get_read_db)):
+    """
+    รายชื่อผู้ใช้ (Admin only) พร้อมยอดเงินและยอดรวมการเล่น
+    q ค้นหา email / phone / ชื่อ (match=prefix|contains), sort=id|balance|plays|wagered|net, order=asc|desc
+    หน้าถัดไป: ส่ง next_cursor ที่ได้กลับมาเป็น cursor (ใช้ q / sort / order เดิม)
+    """
+    must_admin(request)
+    
+    try:
+        return {"success": True, **list_users(db, q, match=match, sort=sort, order=order, limit=limit, cursor=cursor)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.put("/api/admin/users/{user_id}/limits")
+async def admin_update_limits(user_id: int, payload: LimitsPayload, request: Request, db: Session = Depends(get_db)):
+    """
+    ตั้ง / เพิ่ม / ยกเลิก limit ของผู้ใช้ (Admin only)
+    """
+    must_admin(request)
+    
+    if not db.query(User).filter(User.id == user_id).first():
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    await run_write(db, lambda db: limits.set_limits(db, user_id, _limit_changes(payload), allow_raise=True),
+                    user_id=user_id)
+    
+    print(f"🛑 Admin updated limits of user {user_id}: {_limit_changes(payload)}")
+    return {"success": True, "limits": limits.summary(db, user_id)}
+
 # ===============================
 # Game Betting APIs
 # ===============================
@@ -417,31 +578,14 @@ async def process_game_result(payload: GameResultPayload, request: Request, db:
     if not email:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    if payload.result not in ["win", "lose", "tie"]:
+    if payload.result not in rules.RPS_OUTCOMES:
         raise HTTPException(status_code=400, detail="Invalid game result")
     
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    user_credit = db.query(Credit).filter(Credit.user_id == user.id).first()
-    if not user_credit:
-        raise HTTPException(status_code=404, detail="User credit not found")
-    
-    old_balance = float(user_credit.balance)
+    user_id = services.user_by_email(db, email).id
     
-    # Update balance based on result
-    if payload.result == "win":
-        # Player wins - add winnings minus the bet (net profit)
-        net_profit = payload.win_amount - payload.bet_amount
-        user_credit.balance += Decimal(str(net_profit))
-    elif payload.result == "lose":
-        # Player loses - subtract bet amount
-        user_credit.balance -= Decimal(str(payload.bet_amount))
-    # For tie, balance remains the same
-    
-    new_balance = float(user_credit.balance)
-    db.commit()
+    old_balance, new_balance = await run_write(db, lambda db: services.apply_game_result(
+        db, user_id, payload.result, payload.bet_amount, payload.win_amount,
+    ), user_id=user_id)
     
     print(f"🎮 Game result processed: {email} - {payload.result} - Balance: {old_balance} -> {new_balance}")
     
@@ -457,30 +601,21 @@ async def process_game_result(payload: GameResultPayload, request: Request, db:
 # Dashboard Statistics API
 # ===============================
 @app.get("/api/dashboard-stats")
-async def get_dashboard_stats(request: Request, db: Session = Depends(get_db)):
+async def get_dashboard_stats(request: Request, db: Session = Depends(get_read_db)):
     """
     Get dashboard statistics: total users and total reports
     """
     must_admin(request)  # Only admin can access dashboard stats
     
     try:
-        # Count total users
-        total_users = db.query(User).count()
-        
-        # Count total reports
-        total_reports = db.query(Report).count()
-        
-        return {
-            "total_users": total_users,
-            "total_reports": total_reports,
-            "status": "success"
-        }
+        # จำนวนผู้ใช้ + จำนวน reports (จากตัวนับ category × status)
+        return {**services.dashboard_stats(db), "status": "success"}
     except Exception as e:
         print(f"❌ Error fetching dashboard stats: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/api/game-stats")
-async def get_game_stats(request: Request, db: Session = Depends(get_db)):
+async def get_game_stats(request: Request, db: Session = Depends(get_read_db)):
     """
     Get game statistics for pie chart: Game1 (Premium Wheel) vs Game2 (Rock Paper Scissors)
     """
@@ -492,11 +627,9 @@ async def get_game_stats(request: Request, db: Session = Depends(get_db)):
         raise
     
     try:
-        # Count total Game1 plays
-        game1_total = db.query(Game1).count()
-        
-        # Count total Game2 plays  
-        game2_total = db.query(Game2).count()
+        # จำนวนตาของแต่ละเกม
+        game1_total = services.play_count(db, "game1")
+        game2_total = services.play_count(db, "game2")
         
         # Calculate total plays
         total_plays = game1_total + game2_total
@@ -510,57 +643,7 @@ async def get_game_stats(request: Request, db: Session = Depends(get_db)):
             game2_percentage = 50.0
         
         # Get recent activities (last 10 games from both tables)
-        from sqlalchemy import text
-        
-        recent_activities_query = text("""
-            SELECT 
-                'game1' as game_type,
-                u.email,
-                g.win_loss_amount,
-                CASE WHEN g.won = 1 THEN 'win' ELSE 'lose' END as result,
-                g.played_at
-            FROM game1 g
-            JOIN users u ON g.user_id = u.id
-            UNION ALL
-            SELECT 
-                'game2' as game_type,
-                u.email,
-                g.win_loss_amount,
-                g.result,
-                g.played_at
-            FROM game2 g
-            JOIN users u ON g.user_id = u.id
-            ORDER BY played_at DESC
-            LIMIT 10
-        """)
-        
-        recent_results = db.execute(recent_activities_query).fetchall()
-        
-        activities = []
-        for result in recent_results:
-            # Calculate time ago
-            from datetime import datetime, timedelta
-            played_time = result[4]  # played_at
-            time_diff = datetime.utcnow() - played_time
-            
-            if time_diff.days > 0:
-                time_ago = f"{time_diff.days}d ago"
-            elif time_diff.seconds > 3600:
-                hours = time_diff.seconds // 3600
-                time_ago = f"{hours}h ago"
-            elif time_diff.seconds > 60:
-                minutes = time_diff.seconds // 60
-                time_ago = f"{minutes}m ago"
-            else:
-                time_ago = "Just now"
-            
-            activities.append({
-                "id": result[1],  # email
-                "amount": f"{abs(float(result[2])):.2f} THB",
-                "type": result[3],  # win/lose/tie
-                "time": time_ago,
-                "game": result[0]  # game1 or game2
-            })
+        activities = services.recent_activities(db, limit=10)
         
         return {
             "game_stats": [
@@ -587,55 +670,35 @@ async def get_game_stats(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/api/game1/count")
-async def get_game1_count(db: Session = Depends(get_db)):
+async def get_game1_count(db: Session = Depends(get_read_db)):
     """
     Get total count of Game1 plays (accessible to authenticated users)
     """
     try:
-        count = db.query(Game1).count()
-        return {"count": count, "game": "Premium Wheel"}
+        return {"count": services.play_count(db, "game1"), "game": "Premium Wheel"}
     except Exception as e:
         print(f"❌ Error getting Game1 count: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/api/game2/count")
-async def get_game2_count(db: Session = Depends(get_db)):
+async def get_game2_count(db: Session = Depends(get_read_db)):
     """
     Get total count of Game2 plays (accessible to authenticated users)
     """
     try:
-        count = db.query(Game2).count()
-        return {"count": count, "game": "Rock-Paper-Scissors"}
+        return {"count": services.play_count(db, "game2"), "game": "Rock-Paper-Scissors"}
     except Exception as e:
         print(f"❌ Error getting Game2 count: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/api/report-categories")
-async def get_report_categories(db: Session = Depends(get_db)):
+async def get_report_categories(db: Session = Depends(get_read_db)):
     """
     Get report categories statistics from database (real-time data)
     """
     try:
-        # Query to count reports by category
-        category_stats = db.query(
-            Report.category,
-            func.count(Report.id).label('count')
-        ).group_by(Report.category).all()
-        
-        # Create a mapping with all possible categories (with 0 if no reports)
-        categories_map = {
-            'technical': 0,
-            'payment': 0,
-            'account': 0,
-            'betting': 0,
-            'suggestion': 0,
-            'other': 0
-        }
-        
-        # Update with actual counts from database
-        for category, count in category_stats:
-            if category in categories_map:
-                categories_map[category] = count
+        # จำนวน reports ต่อ category จากตัวนับ (ทุก category แม้ยังไม่มี report)
+        categories_map = services.report_category_counts(db)
         
         # Format response for frontend
         report_categories = [
@@ -750,84 +813,20 @@ async def play_game1(payload: Game1BetPayload, request: Request, db: Session = D
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     # หา user จาก email
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Validate input
-    if payload.selected_color not in ["blue", "white"]:
-        raise HTTPException(status_code=400, detail="Selected color must be 'blue' or 'white'")
-    
-    if payload.bet_amount <= 0:
-        raise HTTPException(status_code=400, detail="Bet amount must be positive")
+    user_id = services.user_by_email(db, email).id
     
     try:
-        # ตรวจสอบยอดเงิน
-        credit = db.query(Credit).filter(Credit.user_id == user.id).first()
-        if not credit or float(credit.balance) < payload.bet_amount:
-            raise HTTPException(status_code=400, detail="Insufficient balance")
-        
-        current_balance = float(credit.balance)
-        
+        # ตรวจข้อมูล หักเงิน บันทึกการเล่นใน transaction เดียว (ดู services.play_game1 - run_write จะ commit ให้)
         # ใช้ผลลัพธ์จาก Frontend หรือสุ่มใหม่ถ้าไม่ได้ส่งมา
-        if payload.result_color and payload.result_color in ['blue', 'white']:
-            result_color = payload.result_color
-        else:
-            # Fallback: สุ่มผลลัพธ์ (50% โอกาสแต่ละสี)
-            import random
-            result_color = random.choice(['blue', 'white'])
+        result = await run_write(db, lambda db: services.play_game1(
+            db, user_id, payload.bet_amount, payload.selected_color, payload.result_color,
+        ), user_id=user_id)
         
-        won = 1 if payload.selected_color == result_color else 0
+        print(f"🎮 Game1 played: {email} bet {payload.bet_amount} on {payload.selected_color}, result: {result['result_color']}, {'WON' if result['won'] else 'LOST'}")
+        print(f"💰 Balance updated in DB: {result['balance_before']} → {result['balance_after']} (user_id: {user_id})")
+        print(f"📊 Game recorded in DB with ID: {result['game_id']}")
         
-        # คำนวณจำนวนเงินที่ชนะ/แพ้
-        if won:
-            win_loss_amount = payload.bet_amount  # ชนะได้เท่าที่เดิมพัน
-            new_balance = current_balance + payload.bet_amount
-        else:
-            win_loss_amount = -payload.bet_amount  # แพ้เสียเท่าที่เดิมพัน
-            new_balance = current_balance - payload.bet_amount
-        
-        # อัพเดทยอดเงินในตาราง credit
-        credit.balance = Decimal(str(new_balance))
-        credit.updated_at = func.now()  # อัพเดทเวลา
-        
-        # บันทึกผลการเล่น
-        game1_play = Game1(
-            user_id=user.id,  # ใช้ user.id แทน email
-            bet_amount=Decimal(str(payload.bet_amount)),
-            selected_color=payload.selected_color,
-            result_color=result_color,
-            won=won,
-            win_loss_amount=Decimal(str(win_loss_amount)),
-            balance_before=Decimal(str(current_balance)),
-            balance_after=Decimal(str(new_balance))
-        )
-        
-        # เพิ่มทั้ง credit และ game1_play ในครั้งเดียว
-        db.add(credit)  # อัพเดท credit balance
-        db.add(game1_play)  # เพิ่มการเล่นใหม่
-        db.commit()  # commit ทั้งสองอย่างพร้อมกัน
-        db.refresh(game1_play)
-        db.refresh(credit)  # refresh credit เพื่อให้แน่ใจว่าอัพเดทแล้ว
-        
-        print(f"🎮 Game1 played: {email} bet {payload.bet_amount} on {payload.selected_color}, result: {result_color}, {'WON' if won else 'LOST'}")
-        print(f"💰 Balance updated in DB: {current_balance} → {float(credit.balance)} (user_id: {user.id})")
-        print(f"📊 Game recorded in DB with ID: {game1_play.id}")
-        
-        return {
-            "success": True,
-            "result": {
-                "game_id": game1_play.id,
-                "selected_color": payload.selected_color,
-                "result_color": result_color,
-                "won": bool(won),
-                "bet_amount": payload.bet_amount,
-                "win_loss_amount": float(win_loss_amount),
-                "balance_before": current_balance,
-                "balance_after": new_balance,
-                "message": "" if won else ""
-            }
-        }
+        return {"success": True, "result": result}
         
     except HTTPException:
         raise
@@ -837,7 +836,8 @@ async def play_game1(payload: Game1BetPayload, request: Request, db: Session = D
         raise HTTPException(status_code=500, detail="Failed to process game")
 
 @app.get("/api/game1/history")
-async def get_game1_history(request: Request, limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
+@cached("game1_history", current_email, params=("limit", "offset"))
+async def get_game1_history(request: Request, limit: int = 20, offset: int = 0, db: Session = Depends(get_read_db)):
     """
     ดึงประวัติการเล่น Game1 ของผู้ใช้
     """
@@ -846,31 +846,12 @@ async def get_game1_history(request: Request, limit: int = 20, offset: int = 0,
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     # หา user จาก email
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = services.user_by_email(db, email)
+    depends_on(f"game1:{user.id}")
     
     try:
-        # ดึงประวัติการเล่น
-        games = db.query(Game1).filter(Game1.user_id == user.id)\
-                              .order_by(Game1.played_at.desc())\
-                              .offset(offset)\
-                              .limit(limit)\
-                              .all()
-        
-        history = []
-        for game in games:
-            history.append({
-                "id": game.id,
-                "bet_amount": float(game.bet_amount),
-                "selected_color": game.selected_color,
-                "result_color": game.result_color,
-                "won": bool(game.won),
-                "win_loss_amount": float(game.win_loss_amount),
-                "balance_before": float(game.balance_before),
-                "balance_after": float(game.balance_after),
-                "played_at": game.played_at.isoformat()
-            })
+        # ดึงประวัติการเล่น (ตารางร้อน + เดือนที่ archive แล้ว)
+        history = services.game1_history(db, user.id, limit, offset)
         
         return {
             "success": True,
@@ -883,7 +864,8 @@ async def get_game1_history(request: Request, limit: int = 20, offset: int = 0,
         raise HTTPException(status_code=500, detail="Failed to fetch history")
 
 @app.get("/api/game1/stats")
-async def get_game1_stats(request: Request, db: Session = Depends(get_db)):
+@cached("game1_stats", current_email)
+async def get_game1_stats(request: Request, db: Session = Depends(get_read_db)):
     """
     ดึงสถิติการเล่น Game1 ของผู้ใช้
     """
@@ -892,68 +874,11 @@ async def get_game1_stats(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     # หา user จาก email
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = services.user_by_email(db, email)
+    depends_on(f"game1:{user.id}")
     
     try:
-        # ใช้ raw SQL เพื่อคำนวณสถิติ
-        from sqlalchemy import text
-        
-        stats_query = text("""
-            SELECT 
-                COUNT(*) as total_games,
-                COUNT(CASE WHEN won = 1 THEN 1 END) as total_wins,
-                COUNT(CASE WHEN won = 0 THEN 1 END) as total_losses,
-                COALESCE(SUM(bet_amount), 0) as total_bet_amount,
-                COALESCE(SUM(CASE WHEN won = 1 THEN win_loss_amount ELSE 0 END), 0) as total_win_amount,
-                COALESCE(SUM(CASE WHEN won = 0 THEN ABS(win_loss_amount) ELSE 0 END), 0) as total_loss_amount,
-                COALESCE(SUM(win_loss_amount), 0) as net_profit_loss,
-                MIN(played_at) as first_played_at,
-                MAX(played_at) as last_played_at
-            FROM game1 
-            WHERE user_id = :user_id
-        """)
-        
-        result = db.execute(stats_query, {"user_id": user.id}).fetchone()
-        
-        if not result or result[0] == 0:
-            # ยังไม่เคยเล่น
-            return {
-                "success": True,
-                "stats": {
-                    "total_games": 0,
-                    "total_wins": 0,
-                    "total_losses": 0,
-                    "total_bet_amount": 0.0,
-                    "total_win_amount": 0.0,
-                    "total_loss_amount": 0.0,
-                    "net_profit_loss": 0.0,
-                    "win_percentage": 0.0,
-                    "first_played_at": None,
-                    "last_played_at": None
-                }
-            }
-        
-        total_games = result[0]
-        total_wins = result[1]
-        win_percentage = (total_wins / total_games * 100) if total_games > 0 else 0
-        
-        return {
-            "success": True,
-            "stats": {
-                "total_games": total_games,
-                "total_wins": total_wins,
-                "total_losses": result[2],
-                "total_bet_amount": float(result[3]),
-                "total_win_amount": float(result[4]),
-                "total_loss_amount": float(result[5]),
-                "net_profit_loss": float(result[6]),
-                "win_percentage": round(win_percentage, 2),
-                "first_played_at": result[7].isoformat() if result[7] else None,
-                "last_played_at": result[8].isoformat() if result[8] else None
-            }
-        }
+        return {"success": True, "stats": services.game1_stats(db, user.id)}
         
     except Exception as e:
         print(f"❌ Error fetching game1 stats: {e}")
@@ -961,54 +886,14 @@ async def get_game1_stats(request: Request, db: Session = Depends(get_db)):
 
 # Admin API สำหรับดูสถิติทุกคน
 @app.get("/api/admin/game1/all-stats")
-async def get_all_users_game1_stats(request: Request, db: Session = Depends(get_db)):
+async def get_all_users_game1_stats(request: Request, db: Session = Depends(get_read_db)):
     """
     ดึงสถิติการเล่น Game1 ของผู้ใช้ทุกคน (Admin เท่านั้น)
     """
     must_admin(request)
     
     try:
-        from sqlalchemy import text
-        
-        all_stats_query = text("""
-            SELECT 
-                u.id,
-                u.full_name,
-                u.email,
-                COUNT(g.id) as total_games,
-                COUNT(CASE WHEN g.won = 1 THEN 1 END) as total_wins,
-                COALESCE(SUM(g.bet_amount), 0) as total_bet_amount,
-                COALESCE(SUM(g.win_loss_amount), 0) as net_profit_loss,
-                MAX(g.played_at) as last_played_at
-            FROM users u
-            LEFT JOIN game1 g ON u.id = g.user_id
-            WHERE u.role = 'user'
-            GROUP BY u.id, u.full_name, u.email
-            HAVING COUNT(g.id) > 0
-            ORDER BY total_games DESC, net_profit_loss DESC
-            LIMIT 100
-        """)
-        
-        results = db.execute(all_stats_query).fetchall()
-        
-        all_stats = []
-        for result in results:
-            total_games = result[3]
-            total_wins = result[4]
-            win_percentage = (total_wins / total_games * 100) if total_games > 0 else 0
-            
-            all_stats.append({
-                "user_id": result[0],
-                "full_name": result[1],
-                "email": result[2],
-                "total_games": total_games,
-                "total_wins": total_wins,
-                "total_losses": total_games - total_wins,
-                "total_bet_amount": float(result[5]),
-                "net_profit_loss": float(result[6]),
-                "win_percentage": round(win_percentage, 2),
-                "last_played_at": result[7].isoformat() if result[7] else None
-            })
+        all_stats = services.all_game1_stats(db, limit=100)
         
         return {
             "success": True,
@@ -1020,6 +905,67 @@ async def get_all_users_game1_stats(request: Request, db: Session = Depends(get_
         print(f"❌ Error fetching all users game1 stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch all stats")
 
+# ===============================
+# Game1 Shared-round wheel (ทุกคนหมุนรอบเดียวกัน - ดู rounds.py)
+# ===============================
+
+class WheelBetPayload(BaseModel):
+    bet_amount: float
+    selected_color: str  # "blue" หรือ "white"
+
+@app.post("/api/wheel/bet")
+async def place_wheel_bet(payload: WheelBetPayload, request: Request, db: Session = Depends(get_db)):
+    """
+    วางเดิมพันในรอบปัจจุบันของวงล้อแบบหลายคน (หักเงินทันที ผลออกเมื่อรอบปิด)
+    """
+    email = current_email(request)
+    if not email:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    user_id = services.user_by_email(db, email).id
+    
+    try:
+        bet = await run_write(db, lambda db: rounds.place_bet(
+            db, user_id, payload.bet_amount, payload.selected_color,
+        ), user_id=user_id)
+        
+        print(f"🎡 Wheel bet: {email} bet {payload.bet_amount} on {payload.selected_color} in round {bet['round_id']}")
+        
+        return {"success": True, "bet": bet}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error placing wheel bet: {e}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to place bet")
+
+@app.get("/api/wheel/round")
+async def get_wheel_round(request: Request, db: Session = Depends(get_read_db)):
+    """
+    สถานะรอบปัจจุบัน ผลของรอบล่าสุด และเดิมพันล่าสุดของผู้ใช้
+    """
+    email = current_email(request)
+    if not email:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    user = services.user_by_email(db, email)
+    return {
+        "success": True,
+        "round": rounds.round_state(db),
+        "recent_rounds": rounds.recent_rounds(db),
+        "my_bets": rounds.user_bets(db, user.id),
+    }
+
+@app.get("/api/wheel/stream")
+async def wheel_stream(request: Request):
+    """
+    Server-Sent Events: "tick" (รอบปัจจุบัน / เวลาที่เหลือ) ทุกวินาที และ "settled" เมื่อรอบถูกตัดสิน
+    """
+    must_login(request)
+    return StreamingResponse(rounds.round_hub.stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # ===============================
 # Game2 (Rock Paper Scissors) APIs
 # ===============================
@@ -1040,130 +986,18 @@ async def play_game2(payload: Game2BetPayload, request: Request, db: Session = D
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     # หา user จาก email
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Validate input
-    valid_choices = ["rock", "paper", "scissors"]
-    if payload.player_choice not in valid_choices:
-        raise HTTPException(status_code=400, detail="Player choice must be 'rock', 'paper', or 'scissors'")
-    
-    if payload.bot_choice not in valid_choices:
-        raise HTTPException(status_code=400, detail="Bot choice must be 'rock', 'paper', or 'scissors'")
-    
-    if payload.result not in ["win", "lose", "tie"]:
-        raise HTTPException(status_code=400, detail="Result must be 'win', 'lose', or 'tie'")
-    
-    if payload.bet_amount <= 0:
-        raise HTTPException(status_code=400, detail="Bet amount must be positive")
+    user_id = services.user_by_email(db, email).id
     
     try:
-        # ตรวจสอบยอดเงิน
-        credit = db.query(Credit).filter(Credit.user_id == user.id).first()
-        if not credit or float(credit.balance) < payload.bet_amount:
-            raise HTTPException(status_code=400, detail="Insufficient balance")
-        
-        current_balance = float(credit.balance)
-        
-        # คำนวณจำนวนเงินที่ชนะ/แพ้
-        if payload.result == "win":
-            win_loss_amount = payload.bet_amount * 2  # ชนะได้ 2 เท่า
-            new_balance = current_balance + payload.bet_amount
-        elif payload.result == "lose":
-            win_loss_amount = -payload.bet_amount  # แพ้เสียเท่าที่เดิมพัน
-            new_balance = current_balance - payload.bet_amount
-        else:  # tie
-            win_loss_amount = 0  # เสมอไม่ได้ไม่เสีย
-            new_balance = current_balance
-        
-        # อัพเดทยอดเงินในตาราง credit
-        credit.balance = Decimal(str(new_balance))
-        credit.updated_at = func.now()
-        
-        # บันทึกผลการเล่น
-        game2_play = Game2(
-            user_id=user.id,
-            bet_amount=Decimal(str(payload.bet_amount)),
-            player_choice=payload.player_choice,
-            bot_choice=payload.bot_choice,
-            result=payload.result,
-            win_loss_amount=Decimal(str(win_loss_amount)),
-            balance_before=Decimal(str(current_balance)),
-            balance_after=Decimal(str(new_balance))
-        )
-        
-        # อัพเดทสถิติ Game2 
-        stats = db.query(Game2Stats).filter(Game2Stats.user_id == user.id).first()
-        if not stats:
-            # สร้างสถิติใหม่ถ้ายังไม่มี
-            stats = Game2Stats(
-                user_id=user.id,
-                total_games_played=0,
-                total_wins=0,
-                total_losses=0,
-                total_ties=0,
-                total_bet_amount=Decimal('0.00'),
-                total_win_amount=Decimal('0.00'),
-                total_loss_amount=Decimal('0.00'),
-                net_profit_loss=Decimal('0.00'),
-                rock_played=0,
-                paper_played=0,
-                scissors_played=0,
-                first_played_at=func.now()
-            )
-            db.add(stats)
-        
-        # อัพเดทสถิติ
-        stats.total_games_played += 1
-        stats.total_bet_amount += Decimal(str(payload.bet_amount))
-        stats.last_played_at = func.now()
-        
-        if payload.result == "win":
-            stats.total_wins += 1
-            stats.total_win_amount += Decimal(str(payload.bet_amount))
-        elif payload.result == "lose":
-            stats.total_losses += 1
-            stats.total_loss_amount += Decimal(str(payload.bet_amount))
-        else:
-            stats.total_ties += 1
-        
-        # นับตัวเลือก
-        if payload.player_choice == "rock":
-            stats.rock_played += 1
-        elif payload.player_choice == "paper":
-            stats.paper_played += 1
-        elif payload.player_choice == "scissors":
-            stats.scissors_played += 1
-        
-        stats.net_profit_loss = stats.total_win_amount - stats.total_loss_amount
-        
-        # บันทึกทั้งหมด
-        db.add(credit)
-        db.add(game2_play)
-        db.add(stats)
-        db.commit()
-        db.refresh(game2_play)
-        db.refresh(credit)
-        db.refresh(stats)
+        # ตรวจข้อมูล หักเงิน บันทึกการเล่นใน transaction เดียว (ดู services.play_game2 - run_write จะ commit ให้)
+        result = await run_write(db, lambda db: services.play_game2(
+            db, user_id, payload.bet_amount, payload.player_choice, payload.bot_choice, payload.result,
+        ), user_id=user_id)
         
         print(f"🎮 Game2 played: {email} bet {payload.bet_amount} - {payload.player_choice} vs {payload.bot_choice} = {payload.result}")
-        print(f"💰 Balance updated: {current_balance} → {float(credit.balance)}")
+        print(f"💰 Balance updated: {result['balance_before']} → {result['balance_after']}")
         
-        return {
-            "success": True,
-            "result": {
-                "game_id": game2_play.id,
-                "player_choice": payload.player_choice,
-                "bot_choice": payload.bot_choice,
-                "result": payload.result,
-                "bet_amount": payload.bet_amount,
-                "win_loss_amount": float(win_loss_amount),
-                "balance_before": current_balance,
-                "balance_after": new_balance,
-                "message": f"You {payload.result}!"
-            }
-        }
+        return {"success": True, "result": result}
         
     except HTTPException:
         raise
@@ -1173,7 +1007,8 @@ async def play_game2(payload: Game2BetPayload, request: Request, db: Session = D
         raise HTTPException(status_code=500, detail="Failed to process game")
 
 @app.get("/api/game2/history")
-async def get_game2_history(request: Request, limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
+@cached("game2_history", current_email, params=("limit", "offset"))
+async def get_game2_history(request: Request, limit: int = 20, offset: int = 0, db: Session = Depends(get_read_db)):
     """
     ดึงประวัติการเล่น Game2 ของผู้ใช้
     """
@@ -1181,30 +1016,11 @@ async def get_game2_history(request: Request, limit: int = 20, offset: int = 0,
     if not email:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = services.user_by_email(db, email)
+    depends_on(f"game2:{user.id}")
     
     try:
-        games = db.query(Game2).filter(Game2.user_id == user.id)\
-                              .order_by(Game2.played_at.desc())\
-                              .offset(offset)\
-                              .limit(limit)\
-                              .all()
-        
-        history = []
-        for game in games:
-            history.append({
-                "id": game.id,
-                "bet_amount": float(game.bet_amount),
-                "player_choice": game.player_choice,
-                "bot_choice": game.bot_choice,
-                "result": game.result,
-                "win_loss_amount": float(game.win_loss_amount),
-                "balance_before": float(game.balance_before),
-                "balance_after": float(game.balance_after),
-                "played_at": game.played_at.isoformat()
-            })
+        history = services.game2_history(db, user.id, limit, offset)
         
         return {
             "success": True,
@@ -1216,8 +1032,62 @@ async def get_game2_history(request: Request, limit: int = 20, offset: int = 0,
         print(f"❌ Error fetching game2 history: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch history")
 
+# ---------- Export (CSV ทั้งหมดของผู้ใช้ รวมเดือนที่ archive แล้ว) ----------
+EXPORT_COLUMNS = {
+    Game1: ["id", "bet_amount", "selected_color", "result_color", "won", "win_loss_amount",
+            "balance_before", "balance_after", "played_at"],
+    Game2: ["id", "bet_amount", "player_choice", "bot_choice", "result", "win_loss_amount",
+            "balance_before", "balance_after", "played_at"],
+}
+
+def export_plays_csv(request: Request, model, filename: str):
+    email = current_email(request)
+    if not email:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    with read_session(request) as db:
+        user = db.query(User).filter(func.lower(User.email) == email).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user_id = user.id
+
+    columns = EXPORT_COLUMNS[model]
+
+    def rows():
+        # เปิด session ของตัวเองใน generator เพราะ stream ต่อหลัง handler return ไปแล้ว
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for count, game in enumerate(iter_plays(lambda: read_session(request), model, user_id), 1):
+            writer.writerow([
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in (getattr(game, column) for column in columns)
+            ])
+            if count % 500 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(rows(), media_type="text/csv",
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/api/game1/export")
+def export_game1(request: Request):
+    """
+    ดาวน์โหลดประวัติ Game1 ทั้งหมดของผู้ใช้เป็น CSV (เก่าไปใหม่)
+    """
+    return export_plays_csv(request, Game1, "game1_history.csv")
+
+@app.get("/api/game2/export")
+def export_game2(request: Request):
+    """
+    ดาวน์โหลดประวัติ Game2 ทั้งหมดของผู้ใช้เป็น CSV (เก่าไปใหม่)
+    """
+    return export_plays_csv(request, Game2, "game2_history.csv")
+
 @app.get("/api/game2/stats")
-async def get_game2_stats(request: Request, db: Session = Depends(get_db)):
+@cached("game2_stats", current_email)
+async def get_game2_stats(request: Request, db: Session = Depends(get_read_db)):
     """
     ดึงสถิติการเล่น Game2 ของผู้ใช้
     """
@@ -1225,57 +1095,55 @@ async def get_game2_stats(request: Request, db: Session = Depends(get_db)):
     if not email:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    user = db.query(User).filter(func.lower(User.email) == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = services.user_by_email(db, email)
+    depends_on(f"game2:{user.id}")
     
     try:
-        stats = db.query(Game2Stats).filter(Game2Stats.user_id == user.id).first()
-        
-        if not stats:
-            return {
-                "success": True,
-                "stats": {
-                    "total_games": 0,
-                    "total_wins": 0,
-                    "total_losses": 0,
-                    "total_ties": 0,
-                    "total_bet_amount": 0.0,
-                    "total_win_amount": 0.0,
-                    "total_loss_amount": 0.0,
-                    "net_profit_loss": 0.0,
-                    "win_percentage": 0.0,
-                    "rock_played": 0,
-                    "paper_played": 0,
-                    "scissors_played": 0,
-                    "first_played_at": None,
-                    "last_played_at": None
-                }
-            }
-        
-        total_games = stats.total_games_played
-        win_percentage = (stats.total_wins / total_games * 100) if total_games > 0 else 0
-        
-        return {
-            "success": True,
-            "stats": {
-                "total_games": total_games,
-                "total_wins": stats.total_wins,
-                "total_losses": stats.total_losses,
-                "total_ties": stats.total_ties,
-                "total_bet_amount": float(stats.total_bet_amount),
-                "total_win_amount": float(stats.total_win_amount),
-                "total_loss_amount": float(stats.total_loss_amount),
-                "net_profit_loss": float(stats.net_profit_loss),
-                "win_percentage": round(win_percentage, 2),
-                "rock_played": stats.rock_played,
-                "paper_played": stats.paper_played,
-                "scissors_played": stats.scissors_played,
-                "first_played_at": stats.first_played_at.isoformat() if stats.first_played_at else None,
-                "last_played_at": stats.last_played_at.isoformat() if stats.last_played_at else None
-            }
-        }
+        return {"success": True, "stats": services.game2_stats(db, user.id)}
         
     except Exception as e:
         print(f"❌ Error fetching game2 stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch stats")
+
+# ===============================
+# Profiler Admin APIs
+# ===============================
+@app.post("/api/admin/profiler/arm")
+async def arm_profiler(payload: ProfilerArmPayload, request: Request):
+    """
+    Profile the next N requests to a route (Admin only)
+    """
+    must_admin(request)
+    
+    try:
+        armed = profiler_control.arm(payload.path, payload.count, payload.memory)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    print(f"🔥 Profiler armed: {payload.path} x{payload.count} (memory: {payload.memory})")
+    return {"success": True, "armed": armed}
+
+@app.post("/api/admin/profiler/disarm")
+async def disarm_profiler(payload: ProfilerArmPayload, request: Request):
+    """
+    Cancel a pending profile for a route (Admin only)
+    """
+    must_admin(request)
+    profiler_control.disarm(payload.path)
+    return {"success": True}
+
+@app.get("/api/admin/profiler/status")
+async def profiler_status(request: Request):
+    """
+    Show armed routes, profiler rate-limit state and startup phase timings (Admin only)
+    """
+    must_admin(request)
+    return {"success": True, **profiler_control.status(), "startup": getattr(app.state, "startup_timings", None)}
+
+@app.get("/api/admin/cache/stats")
+async def cache_stats(request: Request):
+    """
+    Read-through cache hit rate, size and eviction counters + event bus counters (Admin only)
+    """
+    must_admin(request)
+    return {"success": True, "cache": response_cache.stats(), "bus": event_bus.stats()}
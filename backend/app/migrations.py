@@ -0,0 +1,434 @@
+"""
+Versioned schema migrations
+
+ทุกการเปลี่ยน schema อยู่ใน MIGRATIONS ตามลำดับ version และตาราง schema_version บันทึกว่า
+version ไหนถูก apply ไปแล้ว (รันซ้ำได้ - จะ apply เฉพาะที่ยังไม่เคยรัน)
+
+- upgrade(conn): DDL / ย้ายข้อมูลเล็ก ๆ รันใน transaction เดียวกับการบันทึก version
+- backfills: UPDATE ข้อมูลจำนวนมากแบบ online - ทำทีละช่วง primary key (BACKFILL_BATCH_SIZE แถว)
+  commit ทีละ batch แล้วพัก BACKFILL_SLEEP_MS ระหว่าง batch จึงไม่ล็อกทั้งตารางนานและเกมยังเล่นต่อได้
+  เงื่อนไข where ทำให้รันซ้ำได้ (แถวที่ทำแล้วจะไม่ถูกแก้อีก) ถ้าหยุดกลางทางรันใหม่ได้เลย
+- online=True: upgrade รันแบบ autocommit (เช่น CREATE INDEX CONCURRENTLY บน PostgreSQL)
+- CopyRows: เหมือน backfill แต่ INSERT ... SELECT ไปตารางใหม่ และจำ id ล่าสุดไว้ใน backfill_progress
+- finalize(conn): รันหลัง backfills ใน transaction เดียวกับการบันทึก version (เช่น copy แถวที่เหลือแล้วสลับตาราง)
+
+รันผ่าน CLI: python migrate.py (ดู migrate.py ที่ root)
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from .models import Base, engine as default_engine
+from .partitions import STATS_MODELS, archives_for, partition_play_tables, roll_up_archive
+from .plays import create_play_views, create_plays_table, legacy_copy_sql
+from .search import create_report_search
+from .triage import recount_report_counters
+from .directory import create_user_search, recount_user_totals
+
+SCHEMA_VERSION_TABLE = "schema_version"
+BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "5000"))
+BACKFILL_SLEEP_MS = float(os.getenv("BACKFILL_SLEEP_MS", "50"))
+
+# กัน runner สองตัวรันพร้อมกันบน PostgreSQL (pg_advisory_lock)
+MIGRATION_LOCK_ID = 7_301_036
+
+
+class Backfill:
+    """UPDATE table SET <assignments> WHERE <where> ทีละช่วง id"""
+
+    def __init__(self, table: str, assignments: str, where: str):
+        self.table = table
+        self.assignments = assignments
+        self.where = where
+
+    def run(self, engine, batch_size: int, sleep_ms: float, log: Callable[[str], None]) -> int:
+        with engine.connect() as conn:
+            max_id = conn.execute(text(f"SELECT MAX(id) FROM {self.table}")).scalar() or 0
+
+        last_id, updated, batches = 0, 0, 0
+        started = time.perf_counter()
+        while last_id < max_id:
+            with engine.begin() as conn:
+                # ขอบบนของ batch = id ตัวที่ batch_size ถัดไป (ไล่ตาม primary key index)
+                upper = conn.execute(
+                    text(f"SELECT id FROM {self.table} WHERE id > :lower ORDER BY id LIMIT 1 OFFSET :offset"),
+                    {"lower": last_id, "offset": batch_size - 1},
+                ).scalar() or max_id
+                result = conn.execute(
+                    text(f"UPDATE {self.table} SET {self.assignments} "
+                         f"WHERE id > :lower AND id <= :upper AND ({self.where})"),
+                    {"lower": last_id, "upper": upper},
+                )
+                updated += max(result.rowcount, 0)
+            last_id = upper
+            batches += 1
+            if batches % 20 == 0:
+                log(f"      {self.table}: id <= {last_id}/{max_id}, {updated} rows updated")
+            if sleep_ms > 0 and last_id < max_id:
+                time.sleep(sleep_ms / 1000)
+
+        log(f"   ↳ backfill {self.table}: {updated} rows, {batches} batches, {time.perf_counter() - started:.1f}s")
+        return updated
+
+
+class CopyRows:
+    """INSERT ... SELECT จาก source ทีละช่วง id - id ล่าสุดที่ copy แล้วอยู่ใน backfill_progress (รันต่อได้)"""
+
+    PROGRESS_TABLE = "backfill_progress"
+
+    def __init__(self, name: str, source: str, insert_sql: str):
+        self.name = name
+        self.source = source
+        self.insert_sql = insert_sql     # ใช้ :lower / :upper (upper เป็น NULL = ถึงแถวสุดท้าย)
+
+    def last_id(self, conn) -> int:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {self.PROGRESS_TABLE} (name VARCHAR(100) PRIMARY KEY, last_id BIGINT NOT NULL)"
+        ))
+        return conn.execute(text(f"SELECT last_id FROM {self.PROGRESS_TABLE} WHERE name = :name"),
+                            {"name": self.name}).scalar() or 0
+
+    def copy_range(self, conn, lower: int, upper: Optional[int]) -> int:
+        copied = max(conn.execute(text(self.insert_sql), {"lower": lower, "upper": upper}).rowcount, 0)
+        last_id = upper if upper is not None else conn.execute(
+            text(f"SELECT MAX(id) FROM {self.source}")).scalar() or lower
+        updated = conn.execute(text(f"UPDATE {self.PROGRESS_TABLE} SET last_id = :last_id WHERE name = :name"),
+                               {"last_id": last_id, "name": self.name})
+        if updated.rowcount == 0:
+            conn.execute(text(f"INSERT INTO {self.PROGRESS_TABLE} (name, last_id) VALUES (:name, :last_id)"),
+                         {"name": self.name, "last_id": last_id})
+        return copied
+
+    def run(self, engine, batch_size: int, sleep_ms: float, log: Callable[[str], None]) -> int:
+        with engine.begin() as conn:
+            last_id = self.last_id(conn)
+            max_id = conn.execute(text(f"SELECT MAX(id) FROM {self.source}")).scalar() or 0
+
+        copied, batches = 0, 0
+        started = time.perf_counter()
+        while last_id < max_id:
+            with engine.begin() as conn:
+                upper = conn.execute(
+                    text(f"SELECT id FROM {self.source} WHERE id > :lower ORDER BY id LIMIT 1 OFFSET :offset"),
+                    {"lower": last_id, "offset": batch_size - 1},
+                ).scalar() or max_id
+                copied += self.copy_range(conn, last_id, upper)
+            last_id = upper
+            batches += 1
+            if batches % 20 == 0:
+                log(f"      {self.source}: id <= {last_id}/{max_id}, {copied} rows copied")
+            if sleep_ms > 0 and last_id < max_id:
+                time.sleep(sleep_ms / 1000)
+
+        log(f"   ↳ copy {self.source}: {copied} rows, {batches} batches, {time.perf_counter() - started:.1f}s")
+        return copied
+
+    def finish(self, conn) -> int:
+        """copy แถวที่เพิ่มเข้ามาระหว่าง backfill (เรียกตอนตาราง source ถูกล็อกแล้ว) แล้วลบ progress"""
+        copied = self.copy_range(conn, self.last_id(conn), None)
+        conn.execute(text(f"DELETE FROM {self.PROGRESS_TABLE} WHERE name = :name"), {"name": self.name})
+        return copied
+
+
+class Migration:
+    def __init__(self, version: int, name: str, upgrade: Optional[Callable] = None,
+                 backfills: Optional[list] = None, online: bool = False, finalize: Optional[Callable] = None):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        self.backfills = backfills or []
+        self.online = online
+        self.finalize = finalize
+
+
+# ===============================
+# Helpers ที่ใช้ใน migrations
+# ===============================
+def _is_postgres(conn) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+def _columns(conn, table: str) -> List[str]:
+    return [column["name"] for column in inspect(conn).get_columns(table)]
+
+
+def _tables(conn) -> List[str]:
+    return inspect(conn).get_table_names()
+
+
+def create_index(conn, name: str, table: str, columns: str):
+    """สร้าง index ถ้ายังไม่มี - PostgreSQL ใช้ CONCURRENTLY (ต้องอยู่ใน migration ที่ online=True)"""
+    concurrently = "CONCURRENTLY " if _is_postgres(conn) else ""
+    conn.execute(text(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+# ===============================
+# Migrations
+# ===============================
+BASELINE_TABLES = ("users", "credit", "reports", "game1", "game1_stats", "game2", "game2_stats", "idempotency_keys")
+
+
+def _baseline(conn):
+    # ตารางตาม models.py ณ ตอนเริ่มใช้ migration runner (ตารางที่มีอยู่แล้วจะไม่ถูกแตะ)
+    Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables[name] for name in BASELINE_TABLES])
+
+
+def _details_to_credit(conn):
+    # แทน check_and_migrate.py / migrate_details_to_credit.py / drop_details_table.py
+    if "details" not in _tables(conn):
+        return
+    columns = _columns(conn, "details")
+    created_at = "d.created_at" if "created_at" in columns else "CURRENT_TIMESTAMP"
+    updated_at = "d.updated_at" if "updated_at" in columns else "CURRENT_TIMESTAMP"
+    conn.execute(text(f"""
+        INSERT INTO credit (user_id, balance, created_at, updated_at)
+        SELECT d.user_id, COALESCE(d.balance, 0), COALESCE({created_at}, CURRENT_TIMESTAMP),
+               COALESCE({updated_at}, CURRENT_TIMESTAMP)
+        FROM details d
+        JOIN users u ON u.id = d.user_id
+        WHERE NOT EXISTS (SELECT 1 FROM credit c WHERE c.user_id = d.user_id)
+    """))
+    conn.execute(text("DROP TABLE details"))
+
+
+def _game1_balance_columns(conn):
+    # แทน fix_game1_table.py / migrate_game1_table.py: ตาราง game1 รุ่นเก่ายังไม่มีคอลัมน์ยอดเงิน
+    columns = _columns(conn, "game1")
+    for name in ("win_loss_amount", "balance_before", "balance_after"):
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE game1 ADD COLUMN {name} NUMERIC(10, 2)"))
+
+
+def _history_indexes(conn):
+    # index เดียวกับที่ setup_*.py เคยสร้าง (history / stats กรองตาม user_id และเรียงตาม played_at)
+    create_index(conn, "idx_game1_user_id", "game1", "user_id")
+    create_index(conn, "idx_game1_played_at", "game1", "played_at")
+    create_index(conn, "idx_game2_user_id", "game2", "user_id")
+    create_index(conn, "idx_game2_played_at", "game2", "played_at")
+    create_index(conn, "idx_game2_result", "game2", "result")
+    create_index(conn, "idx_reports_user_id", "reports", "user_id")
+
+
+def _play_partitions(conn):
+    # partition รายเดือน (PostgreSQL) + ตาราง manifest ของไฟล์ archive (ดู partitions.py)
+    Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables["play_archives"]])
+    if _is_postgres(conn):
+        partition_play_tables(conn)
+
+
+PLAY_COPIES = [CopyRows(f"plays_from_{game}", game, legacy_copy_sql(game, game)) for game in ("game1", "game2")]
+
+
+def _create_plays(conn):
+    # partition ของ plays (PostgreSQL) ต้องครอบเดือนเก่าสุดของข้อมูลที่จะ copy มา
+    tables = _tables(conn)
+    oldest = [
+        conn.execute(text(f"SELECT MIN(played_at) FROM {game}")).scalar()
+        for game in ("game1", "game2") if game in tables
+    ]
+    create_plays_table(conn, min((value for value in oldest if value is not None), default=None))
+
+
+def _swap_play_views(conn):
+    # ล็อกการเขียนตารางเดิม (อ่านได้) → copy แถวที่เหลือ → เก็บตารางเดิมเป็น <game>_legacy → สร้าง view แทน
+    if _is_postgres(conn):
+        conn.execute(text("LOCK TABLE game1, game2 IN EXCLUSIVE MODE"))
+    for copy in PLAY_COPIES:
+        copy.finish(conn)
+    for game in ("game1", "game2"):
+        conn.execute(text(f"ALTER TABLE {game} RENAME TO {game}_legacy"))
+    create_play_views(conn)
+
+
+def _wallet_limits(conn):
+    # limit ขาดทุน / ยอดฝาก + ตัวสะสม rolling window ต่อผู้ใช้ (ดู limits.py)
+    Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables["wallet_limits"]])
+
+
+def _report_search(conn):
+    # full-text search ของ reports: FTS5 + triggers (SQLite) / tsvector + GIN (PostgreSQL) - ดู search.py
+    create_report_search(conn, concurrently=_is_postgres(conn))
+
+
+def _report_counters(conn):
+    # ตัวนับ reports ต่อ category × status (ดู triage.py) - นับครั้งแรกจากข้อมูลที่มีอยู่ใน transaction เดียวกัน
+    Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables["report_counters"]])
+    recount_report_counters(conn)
+
+
+def _user_totals(conn):
+    # ยอดรวมการเล่นต่อผู้ใช้สำหรับ admin user directory (ดู directory.py) - คำนวณครั้งแรกจาก plays
+    Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables["user_totals"]])
+    recount_user_totals(conn)
+
+
+def _user_directory_indexes(conn):
+    # ค้นหาผู้ใช้ด้วย prefix / substring + เรียงตามยอดเงิน
+    create_user_search(conn, concurrently=_is_postgres(conn))
+    create_index(conn, "idx_credit_balance", "credit", "balance, user_id")
+
+
+def _wallet_transactions(conn):
+    # ledger ฝาก / ถอน + checkpoint ของ reconcile_balances.py (ดู reconcile.py)
+    Base.metadata.create_all(bind=conn, tables=[
+        Base.metadata.tables[name] for name in ("wallet_transactions", "reconcile_state", "reconcile_runs")
+    ])
+
+
+def _wheel_rounds(conn):
+    # วงล้อแบบหลายคน: รอบ + เดิมพันของรอบ (ดู rounds.py)
+    Base.metadata.create_all(bind=conn, tables=[
+        Base.metadata.tables[name] for name in ("wheel_rounds", "round_bets")
+    ])
+
+
+def _archived_play_stats(conn):
+    # game1_stats / game2_stats กลายเป็นสรุปของเดือนที่ archive แล้ว (ดู partitions.lifetime_stats):
+    # ล้างตัวนับเดิม (ตั้งแต่ migration 6 แถวเหล่านั้นอยู่ใน plays แล้ว) แล้วสรุปใหม่จากไฟล์ archive ที่มีอยู่
+    db = Session(bind=conn)
+    for table, model in STATS_MODELS.items():
+        conn.execute(model.__table__.delete())
+        for archive in archives_for(db, table):
+            roll_up_archive(db, archive)
+    db.close()
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline", _baseline),
+    Migration(2, "details_to_credit", _details_to_credit),
+    Migration(3, "game1_balance_columns", _game1_balance_columns, backfills=[
+        # แทน UPDATE ทั้งตารางใน migrate_game1_data.py
+        Backfill("game1", "win_loss_amount = CASE WHEN won = 1 THEN bet_amount ELSE -bet_amount END",
+                 "win_loss_amount IS NULL"),
+        Backfill("game1", "balance_before = COALESCE(balance_before, 0), balance_after = COALESCE(balance_after, 0)",
+                 "balance_before IS NULL OR balance_after IS NULL"),
+    ]),
+    Migration(4, "history_indexes", _history_indexes, online=True),
+    Migration(5, "play_partitions", _play_partitions, online=True),
+    # game1 / game2 → ตาราง plays เดียว + view ชื่อเดิม (ตารางเดิมเก็บไว้เป็น game1_legacy / game2_legacy)
+    Migration(6, "unified_plays", _create_plays, backfills=PLAY_COPIES, finalize=_swap_play_views),
+    Migration(7, "wallet_limits", _wallet_limits),
+    Migration(8, "report_search", _report_search, online=True),
+    Migration(9, "report_counters", _report_counters),
+    Migration(10, "user_totals", _user_totals),
+    Migration(11, "user_directory_indexes", _user_directory_indexes, online=True),
+    Migration(12, "wallet_transactions", _wallet_transactions),
+    Migration(13, "wheel_rounds", _wheel_rounds),
+    Migration(14, "archived_play_stats", _archived_play_stats),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ===============================
+# Runner
+# ===============================
+def ensure_version_table(engine=default_engine):
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                applied_at TIMESTAMP NOT NULL,
+                duration_ms INTEGER NOT NULL
+            )
+        """))
+
+
+def applied_versions(engine=default_engine) -> dict:
+    """{version: applied_at} (ว่างถ้ายังไม่มีตาราง schema_version)"""
+    if SCHEMA_VERSION_TABLE not in inspect(engine).get_table_names():
+        return {}
+    with engine.connect() as conn:
+        return dict(conn.execute(text(f"SELECT version, applied_at FROM {SCHEMA_VERSION_TABLE}")).all())
+
+
+def current_version(engine=default_engine) -> int:
+    return max(applied_versions(engine), default=0)
+
+
+def stored_version(engine=default_engine) -> int:
+    """version ล่าสุดด้วย query เดียว (ไม่ reflect schema) - 0 ถ้ายังไม่มีตาราง schema_version"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar() or 0
+    except DBAPIError:
+        return 0
+
+
+def pending_migrations(engine=default_engine, target: Optional[int] = None) -> List[Migration]:
+    applied = applied_versions(engine)
+    return [
+        migration for migration in MIGRATIONS
+        if migration.version not in applied and (target is None or migration.version <= target)
+    ]
+
+
+def _record(conn, migration: Migration, duration_ms: int):
+    conn.execute(
+        text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at, duration_ms) "
+             f"VALUES (:version, :name, :applied_at, :duration_ms)"),
+        {"version": migration.version, "name": migration.name,
+         "applied_at": datetime.utcnow(), "duration_ms": duration_ms},
+    )
+
+
+def apply_migration(engine, migration: Migration, batch_size: int, sleep_ms: float, log: Callable[[str], None]):
+    started = time.perf_counter()
+    log(f"⬆️  {migration.version:04d} {migration.name}")
+    if migration.upgrade is not None and migration.online:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            migration.upgrade(conn)
+    elif migration.upgrade is not None and not migration.backfills and migration.finalize is None:
+        # DDL + บันทึก version ใน transaction เดียว
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            _record(conn, migration, int((time.perf_counter() - started) * 1000))
+        return
+    elif migration.upgrade is not None:
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+
+    for backfill in migration.backfills:
+        backfill.run(engine, batch_size, sleep_ms, log)
+
+    with engine.begin() as conn:
+        if migration.finalize is not None:
+            migration.finalize(conn)
+        _record(conn, migration, int((time.perf_counter() - started) * 1000))
+
+
+def stamp(engine=default_engine, version: Optional[int] = None):
+    """บันทึกว่า migrations ถึง version (None = ล่าสุด) ถูก apply แล้วโดยไม่รัน (schema สร้างจาก create_db)"""
+    ensure_version_table(engine)
+    applied = applied_versions(engine)
+    with engine.begin() as conn:
+        for migration in MIGRATIONS:
+            if migration.version not in applied and (version is None or migration.version <= version):
+                _record(conn, migration, 0)
+
+
+def migrate(engine=default_engine, target: Optional[int] = None, batch_size: int = BACKFILL_BATCH_SIZE,
+            sleep_ms: float = BACKFILL_SLEEP_MS, log: Callable[[str], None] = print) -> List[int]:
+    """apply migrations ที่ยังไม่ได้รันจนถึง target (None = ล่าสุด) คืนรายการ version ที่ apply"""
+    ensure_version_table(engine)
+    lock_conn = None
+    if engine.dialect.name == "postgresql":
+        lock_conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+    try:
+        applied = []
+        for migration in pending_migrations(engine, target):
+            apply_migration(engine, migration, batch_size, sleep_ms, log)
+            applied.append(migration.version)
+        return applied
+    finally:
+        if lock_conn is not None:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            lock_conn.close()
@@ -1,12 +1,14 @@
 # backend/app/models.py
+import hashlib
 import os
 from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import (
-    create_engine, Column, Integer, String, DateTime, Numeric, ForeignKey,
-    CheckConstraint, func, Text
+    create_engine, event, Column, Integer, SmallInteger, BigInteger, String, DateTime, Numeric, ForeignKey,
+    CheckConstraint, UniqueConstraint, Index, func, inspect, Text
 )
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 from sqlalchemy.exc import OperationalError
 
@@ -21,15 +23,109 @@ DATABASE_URL = os.getenv(
     "sqlite:///./dev.db"
 )
 
-engine = create_engine(
-    DATABASE_URL,
-    future=True,
-    pool_pre_ping=True,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+def database_instance_id(url: str = DATABASE_URL) -> str:
+    """
+    id สั้นของ database นี้ - ใช้ตั้งชื่อทรัพยากรที่แชร์กันบนเครื่อง (socket ของ event bus, ไฟล์ rate limit)
+    deployment ที่ใช้คนละ database บนเครื่องเดียวกันจึงไม่ปนกัน (SQLite ใช้ path จริงของไฟล์)
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database and parsed.database != ":memory:":
+        url = "sqlite:///" + os.path.abspath(parsed.database)
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+
+# Read replica (optional) - ถ้าไม่ตั้งค่า ทุกอย่างใช้ primary ตัวเดียว
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+# SQLite production mode: WAL + pragmas, pool อ่านแยก, เขียนผ่าน writer ตัวเดียว (ดู writer.py)
+SQLITE_PRODUCTION = os.getenv("SQLITE_PRODUCTION", "0") == "1" and DATABASE_URL.startswith("sqlite")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "8"))
+
+def make_engine(url: str, pool_size: int, max_overflow: int):
+    return create_engine(
+        url,
+        future=True,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {}
+    )
+
+def tune_sqlite_engine(sqlite_engine, read_only: bool = False, immediate: bool = False):
+    """ตั้ง pragmas ทุกครั้งที่เปิด connection ใหม่ และเลือกชนิด BEGIN ของ engine นี้"""
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        # ปิด transaction อัตโนมัติของ pysqlite แล้วให้ SQLAlchemy ส่ง BEGIN เอง (ดู _begin ด้านล่าง)
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    @event.listens_for(sqlite_engine, "begin")
+    def _begin(conn):
+        # writer จอง write lock ตั้งแต่ต้น transaction จะได้ไม่เจอ "database is locked"
+        # ตอน upgrade จาก read เป็น write กลางทาง - engine อื่นใช้ BEGIN ธรรมดา (ไม่ถือ lock ตอนอ่าน)
+        if conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT":
+            # online migration (migrations.py) - ไม่มี COMMIT ตามมา ถ้า BEGIN ไว้ DDL จะหายตอนคืน connection
+            return
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+if SQLITE_PRODUCTION:
+    # Request sessions: อ่าน + เขียนเล็ก ๆ ที่ไม่ผ่าน writer (สมัครสมาชิก, report)
+    engine = make_engine(
+        DATABASE_URL,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    )
+    tune_sqlite_engine(engine)
+    # Writer: connection เดียวสำหรับ writer thread (ดู writer.py) เพราะ SQLite เขียนได้ทีละ transaction
+    write_engine = make_engine(DATABASE_URL, pool_size=1, max_overflow=0)
+    tune_sqlite_engine(write_engine, immediate=True)
+    # Readers: pool อ่านอย่างเดียวบนไฟล์เดียวกัน (WAL ทำให้อ่านได้พร้อมกับการเขียน)
+    read_engine = make_engine(DATABASE_URL, pool_size=SQLITE_READ_POOL_SIZE, max_overflow=0)
+    tune_sqlite_engine(read_engine, read_only=True)
+else:
+    # Primary (เขียน + อ่านที่ต้องการข้อมูลล่าสุด เช่น settlement)
+    engine = make_engine(
+        DATABASE_URL,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    )
+    write_engine = engine
+    # Replica (อ่านอย่างเดียว เช่น analytics / history) - pool แยกจาก primary
+    read_engine = make_engine(
+        DATABASE_READ_URL,
+        pool_size=int(os.getenv("DB_READ_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_READ_MAX_OVERFLOW", "10")),
+    ) if DATABASE_READ_URL else engine
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False, future=True) \
+    if read_engine is not engine else SessionLocal
+WriteSessionLocal = sessionmaker(bind=write_engine, autocommit=False, autoflush=False, future=True) \
+    if write_engine is not engine else SessionLocal
 Base = declarative_base()
 
+
+def dialect_insert(bind):
+    """insert() ของ dialect ที่ใช้อยู่ (มี on_conflict_do_nothing / on_conflict_do_update) - bind = Session หรือ Connection"""
+    dialect = bind.get_bind().dialect if hasattr(bind, "get_bind") else bind.dialect
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
 # ===============================
 # Password hashing
 # ===============================
@@ -76,6 +172,7 @@ class Credit(Base):
 
     __table_args__ = (
         CheckConstraint("balance >= 0", name="balance_non_negative"),
+        Index("idx_credit_balance", "balance", "user_id"),  # admin user directory เรียงตามยอดเงิน
     )
 
 # ===============================
@@ -101,9 +198,38 @@ class Report(Base):
         CheckConstraint("status IN ('pending','reviewing','resolved','closed')", name="status_allowed"),
     )
 
+# ===============================
+# Plays ORM model (ทุกตาของทุกเกมในตารางเดียว)
+# ===============================
+class Play(Base):
+    """
+    หนึ่งแถวต่อหนึ่งตา เก็บแบบกะทัดรัด: รหัสตัวเลข (rules.GAME_CODES / CHOICE_CODES / OUTCOME_CODES)
+    แทนข้อความ และเงินเป็นสตางค์ (BIGINT) - win_loss_amount คำนวณจาก outcome ตามกติกาใน rules.py
+    ตาราง game1 / game2 เดิมกลายเป็น view บนตารางนี้ (ดู plays.py)
+    """
+    __tablename__ = "plays"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    game = Column(SmallInteger, nullable=False)          # rules.GAME_CODES
+    choice = Column(SmallInteger, nullable=False)        # ตัวเลือกของผู้เล่น (rules.CHOICE_CODES)
+    result = Column(SmallInteger, nullable=False)        # สีที่วงล้อออก / ตัวเลือกของบอท
+    outcome = Column(SmallInteger, nullable=False)       # rules.OUTCOME_CODES
+    bet_cents = Column(BigInteger, nullable=False)
+    balance_before_cents = Column(BigInteger, nullable=False)
+    balance_after_cents = Column(BigInteger, nullable=False)
+    played_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # index เดียวรองรับ history / stats ของทุกเกม (user_id, game แล้วเรียงตาม played_at)
+        Index("idx_plays_user_game_played", "user_id", "game", "played_at"),
+        CheckConstraint("bet_cents > 0", name="plays_bet_positive"),
+    )
+
 # ===============================
 # Game1 ORM model (Game play tracking)
 # ===============================
+# ตั้งแต่ migration 6 เป็น view (อ่านอย่างเดียว) บนตาราง plays - โครงเดิมยังใช้สร้างตารางใน migration 1
 class Game1(Base):
     __tablename__ = "game1"
 
@@ -126,11 +252,13 @@ class Game1(Base):
         CheckConstraint("result_color IN ('blue','white')", name="result_color_allowed"),
         CheckConstraint("won IN (0,1)", name="won_boolean"),
         CheckConstraint("bet_amount > 0", name="bet_amount_positive"),
+        {"info": {"view": True}},
     )
 
 # ===============================
 # Game1 Statistics ORM model (จำนวนครั้งที่เล่น)
 # ===============================
+# สรุปของเดือนที่ archive ออกจาก plays แล้ว (partitions.roll_up_archive) - สถิติตลอดอายุ = แถวนี้ + แถวร้อน
 class Game1Stats(Base):
     __tablename__ = "game1_stats"
 
@@ -154,6 +282,7 @@ class Game1Stats(Base):
 # ===============================
 # Game2 ORM model (Rock Paper Scissors game play tracking)
 # ===============================
+# view บนตาราง plays เช่นเดียวกับ Game1
 class Game2(Base):
     __tablename__ = "game2"
 
@@ -176,11 +305,13 @@ class Game2(Base):
         CheckConstraint("bot_choice IN ('rock','paper','scissors')", name="bot_choice_allowed"),
         CheckConstraint("result IN ('win','lose','tie')", name="result_allowed"),
         CheckConstraint("bet_amount > 0", name="bet_amount_positive"),
+        {"info": {"view": True}},
     )
 
 # ===============================
 # Game2 Statistics ORM model (จำนวนครั้งที่เล่น Rock Paper Scissors)
 # ===============================
+# สรุปของเดือนที่ archive ออกจาก plays แล้ว เหมือน Game1Stats (ไม่ถูกอัพเดทตอนเล่น)
 class Game2Stats(Base):
     __tablename__ = "game2_stats"
 
@@ -206,12 +337,221 @@ class Game2Stats(Base):
     # Relationship
     user = relationship("User", backref="game2_stats")
 
+# ===============================
+# Idempotency keys (ผลลัพธ์ของ request การเงินที่ส่ง Idempotency-Key มา ดู idempotency.py)
+# ===============================
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner = Column(String(255), nullable=False)          # email ของผู้ส่ง (จาก cookie)
+    key = Column(String(255), nullable=False)            # ค่าจาก header Idempotency-Key
+    endpoint = Column(String(100), nullable=False)       # เช่น "POST /deposit"
+    request_hash = Column(String(64), nullable=False)    # sha256 ของ body - key เดิมต้องมากับ body เดิม
+    status = Column(String(20), nullable=False, default="processing")  # processing / completed
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("owner", "key", name="uq_idempotency_owner_key"),
+        CheckConstraint("status IN ('processing','completed')", name="idempotency_status_allowed"),
+    )
+
+# ===============================
+# Wallet limits (responsible gambling - ดู limits.py)
+# ===============================
+class WalletLimit(Base):
+    """
+    limit ต่อผู้ใช้ + ตัวสะสมแบบ rolling window ที่อัพเดทตอน settle (แถวเดียวต่อผู้ใช้ อ่านด้วย primary key)
+    *_buckets = JSON [[เวลาเริ่ม bucket (unix s), สตางค์], ...] และ *_cents = ผลรวมของ bucket ที่ยังอยู่ใน window
+    """
+    __tablename__ = "wallet_limits"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    max_loss_cents = Column(BigInteger, nullable=True)       # ขาดทุนสุทธิสูงสุดใน LIMIT_LOSS_WINDOW_H (NULL = ค่าเริ่มต้น)
+    max_deposit_cents = Column(BigInteger, nullable=True)    # ยอดฝากสูงสุดใน LIMIT_DEPOSIT_WINDOW_H
+    loss_cents = Column(BigInteger, nullable=False, default=0)
+    loss_buckets = Column(Text, nullable=False, default="[]")
+    deposit_cents = Column(BigInteger, nullable=False, default=0)
+    deposit_buckets = Column(Text, nullable=False, default="[]")
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        CheckConstraint("max_loss_cents IS NULL OR max_loss_cents >= 0", name="wallet_limits_loss_non_negative"),
+        CheckConstraint("max_deposit_cents IS NULL OR max_deposit_cents >= 0", name="wallet_limits_deposit_non_negative"),
+    )
+
+# ===============================
+# User totals (ดู directory.py)
+# ===============================
+class UserTotals(Base):
+    """ยอดรวมการเล่นต่อผู้ใช้ (ทุกเกม) - อัพเดทตอน settle ใช้เรียง / แสดงใน admin user directory"""
+    __tablename__ = "user_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    plays = Column(BigInteger, nullable=False, default=0)
+    wagered_cents = Column(BigInteger, nullable=False, default=0)   # ยอดเดิมพันรวม
+    net_cents = Column(BigInteger, nullable=False, default=0)       # ยอดเงินได้ / เสียสุทธิจากเกม
+    last_played_at = Column(DateTime, nullable=True)
+
+    # keyset pagination: เรียงตามยอดแล้ว user_id
+    __table_args__ = (
+        Index("idx_user_totals_plays", "plays", "user_id"),
+        Index("idx_user_totals_wagered", "wagered_cents", "user_id"),
+        Index("idx_user_totals_net", "net_cents", "user_id"),
+    )
+
+# ===============================
+# Report counters (ดู triage.py)
+# ===============================
+class ReportCounter(Base):
+    """จำนวน reports ต่อ (category, status) - อัพเดทใน transaction เดียวกับการสร้าง / เปลี่ยน status ของ report"""
+    __tablename__ = "report_counters"
+
+    category = Column(String(50), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    # ไม่มี CHECK count >= 0: upsert ส่ง delta ติดลบเป็นแถวที่จะ insert ซึ่งถูกตรวจ constraint ก่อนชน conflict
+    count = Column(BigInteger, nullable=False, default=0)
+
+# ===============================
+# Wallet ledger + balance reconciliation (ดู services.py / reconcile.py)
+# ===============================
+class WalletTransaction(Base):
+    """
+    การเปลี่ยนยอดเงินที่ไม่ใช่ตาเล่น (ฝาก / ถอน / ผลเกมจาก /api/game-result) เก็บยอดก่อน / หลังเป็นสตางค์
+    แบบเดียวกับ plays - plays + wallet_transactions ของผู้ใช้เรียงตามเวลาต้องต่อกันเป็น balance chain เดียว
+    """
+    __tablename__ = "wallet_transactions"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String(20), nullable=False)                # deposit / withdraw / game_result
+    amount_cents = Column(BigInteger, nullable=False)        # การเปลี่ยนแปลงของยอด (ถอน / เสีย = ติดลบ)
+    balance_before_cents = Column(BigInteger, nullable=False)
+    balance_after_cents = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_wallet_transactions_user_created", "user_id", "created_at"),
+    )
+
+class ReconcileState(Base):
+    """
+    checkpoint ต่อผู้ใช้: ตำแหน่งสุดท้ายใน balance chain ที่ตรวจแล้ว และยอดหลังรายการนั้น
+    (ทุกรายการที่เวลา <= position_at ตรวจไปแล้ว รอบถัดไปเริ่มต่อจาก balance_cents)
+    """
+    __tablename__ = "reconcile_state"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    position_at = Column(DateTime, nullable=True)            # เวลาของรายการสุดท้ายที่ตรวจแล้ว (NULL = ยังไม่มีรายการ)
+    balance_cents = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ReconcileRun(Base):
+    """หนึ่งรอบของ reconcile_balances.py - รอบถัดไปอ่านเฉพาะรายการหลัง cutoff ของรอบล่าสุดที่จบแล้ว"""
+    __tablename__ = "reconcile_runs"
+
+    id = Column(Integer, primary_key=True)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    since = Column(DateTime, nullable=True)                  # NULL = ตรวจตั้งแต่ต้น
+    cutoff = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    users = Column(Integer, nullable=False, default=0)
+    entries = Column(BigInteger, nullable=False, default=0)
+    discrepancies = Column(Integer, nullable=False, default=0)
+
+# ===============================
+# Shared-round wheel (ดู rounds.py)
+# ===============================
+class WheelRound(Base):
+    """หนึ่งรอบของวงล้อแบบหลายคน - id = เลขช่วงเวลา (epoch // WHEEL_ROUND_S) ทุก worker จึงรู้รอบปัจจุบันเอง"""
+    __tablename__ = "wheel_rounds"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    status = Column(String(10), nullable=False, default="betting")   # betting / settled
+    opens_at = Column(DateTime, nullable=False)
+    closes_at = Column(DateTime, nullable=False)
+    result = Column(SmallInteger, nullable=True)                      # สีที่วงล้อออก (rules.CHOICE_CODES["game1"])
+    bets = Column(Integer, nullable=False, default=0)
+    total_bet_cents = Column(BigInteger, nullable=False, default=0)
+    paid_cents = Column(BigInteger, nullable=False, default=0)
+    settled_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # ticker หา "รอบที่ปิดรับแล้วแต่ยังไม่ตัดสิน"
+        Index("idx_wheel_rounds_status_closes", "status", "closes_at"),
+    )
+
+class RoundBet(Base):
+    """เดิมพันในรอบ (หักเงินแล้วตอนวาง) - ผู้ใช้เดิมพันได้ครั้งเดียวต่อรอบ"""
+    __tablename__ = "round_bets"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    round_id = Column(Integer, ForeignKey("wheel_rounds.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    choice = Column(SmallInteger, nullable=False)                     # rules.CHOICE_CODES["game1"]
+    bet_cents = Column(BigInteger, nullable=False)
+    placed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        CheckConstraint("bet_cents > 0", name="round_bet_positive"),
+        # ใช้เป็น index ของการตัดสินทั้งรอบด้วย (round_id นำหน้า)
+        UniqueConstraint("round_id", "user_id", name="uq_round_bets_round_user"),
+    )
+
+# ===============================
+# Play archives (ดู partitions.py)
+# ===============================
+class PlayArchive(Base):
+    """เดือนที่ถูกย้ายออกจากตาราง game1/game2 ไปเป็นไฟล์ archive (SQLite + gzip) แล้ว"""
+    __tablename__ = "play_archives"
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(20), nullable=False)      # "game1" / "game2"
+    period = Column(String(7), nullable=False)           # "2026-07"
+    period_start = Column(DateTime, nullable=False)      # รวม
+    period_end = Column(DateTime, nullable=False)        # ไม่รวม (ต้นเดือนถัดไป)
+    path = Column(String(255), nullable=False)           # relative กับ ARCHIVE_DIR
+    row_count = Column(Integer, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("table_name", "period", name="uq_play_archive_period"),
+    )
+
 # ===============================
 # Create DB
 # ===============================
-def create_db():
+def create_db(bind=None, first_played_at: Optional[datetime] = None):
+    """
+    สร้าง schema ล่าสุดบน bind (ค่าเริ่มต้น: engine) - first_played_at = เดือนแรกของ partition plays (PostgreSQL)
+    สำหรับฐานที่จะโหลดข้อมูลเก่าเข้ามา (เช่น migrate_to_postgres.py)
+    """
+    from . import migrations
+    from .plays import create_play_views, create_plays_table
+    from .search import create_report_search
+    from .directory import create_user_search
+
+    bind = engine if bind is None else bind
     try:
-        Base.metadata.create_all(bind=engine)
+        fresh = not inspect(bind).has_table("users")
+        # Game1 / Game2 เป็น view และ plays เป็น partitioned table (PostgreSQL) - สร้างแยก
+        Base.metadata.create_all(bind=bind, tables=[
+            table for table in Base.metadata.sorted_tables
+            if not table.info.get("view") and table.name != Play.__tablename__
+        ])
+        with bind.begin() as conn:
+            create_plays_table(conn, first_played_at)
+            create_play_views(conn)
+            create_report_search(conn)
+            create_user_search(conn)
+        if fresh:
+            # schema ตาม models.py ครบแล้ว - migrate.py ภายหลังจะไม่ apply migration เก่าซ้ำ
+            migrations.stamp(bind)
     except OperationalError:
         raise
 
@@ -260,66 +600,54 @@ class RegisterPayload(BaseModel):
 # ===============================
 # Ensure Admin user
 # ===============================
+# bcrypt ของรหัสผ่านเริ่มต้น (admin123 / 123456) คำนวณไว้ล่วงหน้า - ไม่ต้อง hash ใหม่ทุกครั้งที่ worker boot
+# ตั้ง ADMIN_PASSWORD_HASH / TEST_USER_PASSWORD_HASH เพื่อเปลี่ยนรหัสผ่านโดยไม่ต้องเก็บ plaintext
+ADMIN_PASSWORD_HASH = os.getenv(
+    "ADMIN_PASSWORD_HASH", "$2b$12$Ml3YcU5Sfkbz98AsbSgZuuLGA3YWv4dfrXsGcLFQ8.i2z0C9vxgzC"
+)
+TEST_USER_PASSWORD_HASH = os.getenv(
+    "TEST_USER_PASSWORD_HASH", "$2b$12$mb2zHBfWP69V1J7DRpShhuCJWMjvoUAQFvckrixpVN5BKQiMI6VJ."
+)
+
+def seed_accounts():
+    """บัญชีเริ่มต้น: (ข้อมูล User, balance เริ่มต้น)"""
+    return [
+        (dict(full_name="Admin", age=30, phone="0000000000",
+              email=os.getenv("ADMIN_EMAIL", "admin@xbet.com").lower(),
+              password_hash=ADMIN_PASSWORD_HASH, role="admin"), 1000000.00),
+        (dict(full_name="Test User", age=25, phone="0811111111", email="user@test.com",
+              password_hash=TEST_USER_PASSWORD_HASH, role="user"), 0.00),
+    ]
+
 def ensure_admin(session):
-    admin_email = os.getenv("ADMIN_EMAIL", "admin@xbet.com").lower()
-    admin_phone = "0000000000"
-    
-    # Check if admin already exists by email OR phone
-    existing_admin = session.query(User).filter(
-        (func.lower(User.email) == admin_email) | 
-        (User.phone == admin_phone)
-    ).first()
-    
-    if not existing_admin:
-        admin = User(
-            full_name="Admin",
-            age=30,
-            phone=admin_phone,
-            email=admin_email,
-            password_hash=bcrypt.hash("admin123"),
-            role="admin",
-        )
-        session.add(admin)
-        session.commit()
-        
-        # สร้าง Credit (Balance) สำหรับ Admin
-        admin_credit = Credit(
-            user_id=admin.id,
-            balance=1000000.00  # ให้ Admin มี balance เริ่มต้น 1,000,000
-        )
-        session.add(admin_credit)
-        session.commit()
-        print(f"✅ Admin user created: {admin_email}")
-    
-    # เพิ่ม test user ธรรมดา
-    test_email = "user@test.com"
-    test_phone = "0811111111"
-    
-    existing_user = session.query(User).filter(
-        (func.lower(User.email) == test_email) | 
-        (User.phone == test_phone)
-    ).first()
-    
-    if not existing_user:
-        test_user = User(
-            full_name="Test User",
-            age=25,
-            phone=test_phone,
-            email=test_email,
-            password_hash=bcrypt.hash("123456"),
-            role="user",
-        )
-        session.add(test_user)
-        session.commit()
-        
-        # สร้าง Credit (Balance) สำหรับ Test User
-        user_credit = Credit(
-            user_id=test_user.id,
-            balance=0.00  # ให้ Test User มี balance เริ่มต้น 0.00
-        )
-        session.add(user_credit)
-        session.commit()
-        print(f"✅ Test user created: {test_email}")
+    """สร้าง admin + test user ที่ยังไม่มี (query ตรวจครั้งเดียว, insert และ commit ใน transaction เดียว)"""
+    accounts = seed_accounts()
+    emails = [account["email"] for account, _ in accounts]
+    phones = [account["phone"] for account, _ in accounts]
+
+    # ข้ามบัญชีที่มี email หรือ phone ซ้ำอยู่แล้ว
+    existing = session.query(User.email, User.phone).filter(
+        func.lower(User.email).in_(emails) | User.phone.in_(phones)
+    ).all()
+    taken = {email.lower() for email, _ in existing} | {phone for _, phone in existing}
+
+    created = []
+    for account, balance in accounts:
+        if account["email"] in taken or account["phone"] in taken:
+            continue
+        user = User(**account)
+        session.add(user)
+        created.append((user, balance))
+    if not created:
+        return
+
+    session.flush()  # ได้ user.id ก่อนสร้าง Credit
+    for user, balance in created:
+        session.add(Credit(user_id=user.id, balance=balance))
+        session.add(UserTotals(user_id=user.id))
+    session.commit()
+    for user, _ in created:
+        print(f"✅ {'Admin' if user.role == 'admin' else 'Test'} user created: {user.email}")
 
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
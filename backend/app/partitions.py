@@ -0,0 +1,538 @@
+"""
+Play history partitioning + cold archive
+
+ตาราง plays (ทุกเกม - game1 / game2 เป็น view บน plays ดู plays.py) แบ่งตามเดือนของ played_at:
+
+- PostgreSQL: native RANGE partitions (plays_p2026_11, ...) + DEFAULT partition กันเดือนที่ยังไม่ได้สร้าง
+  (migration 5 เคยแปลง game1 / game2 เดิมแบบ online: สร้าง unique index (id, played_at) แบบ CONCURRENTLY
+  และ CHECK ช่วงเวลาแบบ NOT VALID + VALIDATE ก่อน แล้วค่อย rename + ATTACH ตารางเดิมเป็น partition
+  "game1_p_legacy" - ตั้งแต่ migration 6 ข้อมูลย้ายมาอยู่ plays ที่สร้างเป็น partitioned table ตั้งแต่แรก)
+- SQLite: ไม่มี partition ในตัว - ตารางหลักเก็บเฉพาะเดือนที่ยัง "ร้อน" ส่วนเดือนที่ปิดแล้ว
+  ถูกย้ายออกไปเป็นไฟล์ archive ต่อเดือน (ตารางต่อ period อยู่ในไฟล์แยก)
+
+Archive (archive_closed_periods / python archive_plays.py):
+  เดือนที่เก่ากว่า ARCHIVE_HOT_MONTHS ถูก export แยกต่อเกม (คอลัมน์แบบเดิมจาก view) เป็นไฟล์ SQLite
+  (มี index user_id, played_at) บีบอัดด้วย gzip ที่ ARCHIVE_DIR/<game>/<game>_YYYY_MM.sqlite.gz
+  บันทึกใน play_archives ครบทุกเกมของเดือนนั้นแล้วค่อยลบเดือนออกจาก plays
+  (PostgreSQL: DETACH + DROP partition ถ้าตรงเดือนพอดี, ไม่งั้น DELETE ทีละ batch)
+
+การอ่าน (play_history / iter_plays): แถวร้อนจาก view ที่ played_at >= ขอบของ archive ล่าสุด
+แล้วต่อด้วยไฟล์ archive เรียงจากเดือนใหม่ไปเก่า - ถ้า archive ค้างกลางทาง (บันทึกไฟล์แล้วแต่ยังลบไม่ครบ)
+แถวซ้ำในตารางจะไม่ถูกนับเพราะอยู่ต่ำกว่าขอบนั้น
+
+สถิติตลอดอายุ (lifetime_stats): ตอนบันทึก manifest ของไฟล์ สรุปต่อผู้ใช้ของไฟล์นั้นถูกบวกเข้า
+game1_stats / game2_stats ใน transaction เดียวกัน (roll_up_archive) แล้วสถิติ = แถวนั้น + แถวร้อนเหนือขอบ archive
+"""
+
+import gzip
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import Column, DateTime, Index, MetaData, Numeric, Table, create_engine, func, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from .models import Game1, Game1Stats, Game2, Game2Stats, Play, PlayArchive
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+ARCHIVE_CACHE_DIR = os.getenv("ARCHIVE_CACHE_DIR", os.path.join(ARCHIVE_DIR, ".cache"))
+ARCHIVE_HOT_MONTHS = int(os.getenv("ARCHIVE_HOT_MONTHS", "3"))       # รวมเดือนปัจจุบัน
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+ARCHIVE_SLEEP_MS = float(os.getenv("ARCHIVE_SLEEP_MS", "20"))
+PARTITION_PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", "2"))
+
+# view ต่อเกม (ใช้ export / อ่าน archive) และตารางจริงที่ถูก partition
+PLAY_TABLES = {"game1": Game1, "game2": Game2}
+PARTITIONED_TABLE = Play.__tablename__
+HISTORY_INDEXES = {
+    "game1": {"idx_game1_user_id": "user_id", "idx_game1_played_at": "played_at"},
+    "game2": {"idx_game2_user_id": "user_id", "idx_game2_played_at": "played_at", "idx_game2_result": "result"},
+}
+
+
+# ===============================
+# Periods
+# ===============================
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def period_label(start: datetime) -> str:
+    return start.strftime("%Y-%m")
+
+
+def partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y_%m}"
+
+
+# ===============================
+# PostgreSQL native partitions
+# ===============================
+_BOUND = re.compile(r"FROM \((?:'([^']+)'|MINVALUE)\) TO \((?:'([^']+)'|MAXVALUE)\)")
+
+
+def is_partitioned(conn, table: str) -> bool:
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table"
+    ), {"table": table}).first() is not None
+
+
+def partition_bounds(conn, table: str) -> List[tuple]:
+    """[(ชื่อ partition, start | None, end | None)] ไม่รวม DEFAULT partition"""
+    rows = conn.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+    """), {"table": table}).all()
+    bounds = []
+    for name, expr in rows:
+        match = _BOUND.search(expr or "")
+        if match:
+            start, end = (datetime.fromisoformat(value) if value else None for value in match.groups())
+            bounds.append((name, start, end))
+    return bounds
+
+
+def ensure_month_partitions(conn, table: str, first: datetime, months: int):
+    """สร้าง partition รายเดือนตั้งแต่ first ไปอีก months เดือน (ข้ามเดือนที่มี partition ครอบอยู่แล้ว)"""
+    bounds = partition_bounds(conn, table)
+    for offset in range(months):
+        start = add_months(first, offset)
+        end = add_months(start, 1)
+        covered = any((lo is None or lo < end) and (hi is None or hi > start) for _, lo, hi in bounds)
+        if not covered:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(table, start)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            ))
+
+
+def ensure_future_partitions(conn, now: Optional[datetime] = None):
+    current = month_start(now or datetime.utcnow())
+    if is_partitioned(conn, PARTITIONED_TABLE):
+        ensure_month_partitions(conn, PARTITIONED_TABLE, current, PARTITION_PREMAKE_MONTHS + 1)
+
+
+def partition_play_tables(conn):
+    """
+    migration 5: แปลงตาราง game1 / game2 รุ่นเดิมเป็น partitioned table (conn ต้องเป็น AUTOCOMMIT เพราะใช้ CONCURRENTLY)
+    ตารางเดิมกลายเป็น partition <table>_p_legacy ครอบตั้งแต่อดีตจนถึงต้นเดือนหน้า
+    """
+    boundary = add_months(month_start(datetime.utcnow()), 1)
+    for table in PLAY_TABLES:
+        if is_partitioned(conn, table):
+            continue
+        legacy = f"{table}_p_legacy"
+        # ขั้นที่ใช้เวลา (สแกนตาราง) ทำก่อนโดยไม่บล็อกการเขียน
+        conn.execute(text(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {table}_id_played_at ON {table} (id, played_at)"))
+        conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_legacy_range"))
+        conn.execute(text(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_range "
+            f"CHECK (played_at < '{boundary:%Y-%m-%d}') NOT VALID"
+        ))
+        conn.execute(text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_legacy_range"))
+
+        # สลับตารางใน transaction สั้น ๆ (ทุกขั้นเป็นแค่ metadata)
+        conn.exec_driver_sql("BEGIN")
+        try:
+            sequence = conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}).scalar()
+            conn.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+            conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+            # PK ของ partition ต้องมี partition key ด้วย - ใช้ unique index ที่สร้างไว้แล้วแทน PK เดิม
+            conn.execute(text(f"ALTER TABLE {legacy} DROP CONSTRAINT {table}_pkey"))
+            conn.execute(text(f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_pkey PRIMARY KEY USING INDEX {table}_id_played_at"))
+            existing = {row[0] for row in conn.execute(
+                text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": legacy})}
+            for index in HISTORY_INDEXES[table]:
+                if index in existing:
+                    conn.execute(text(f"ALTER INDEX {index} RENAME TO {index}_legacy"))
+
+            conn.execute(text(
+                f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                f"PARTITION BY RANGE (played_at)"
+            ))
+            conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {table}_legacy_range"))
+            conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, played_at)"))
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)"
+            ))
+            for index, column in HISTORY_INDEXES[table].items():
+                conn.execute(text(f"CREATE INDEX {index} ON {table} ({column})"))
+            # index ที่ตรงกันบนตารางเดิมถูกผูกเข้ากับ index ของ parent (ไม่ต้อง build ใหม่)
+            conn.execute(text(
+                f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{boundary:%Y-%m-%d}')"
+            ))
+            ensure_month_partitions(conn, table, boundary, PARTITION_PREMAKE_MONTHS)
+            conn.execute(text(f"CREATE TABLE {table}_pdefault PARTITION OF {table} DEFAULT"))
+            if sequence:
+                # ให้ sequence ผูกกับ parent จะได้ไม่หายไปตอน drop partition เก่า
+                conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+            conn.exec_driver_sql("COMMIT")
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+        print(f"🗂️  {table}: partitioned by month (legacy rows in {legacy})")
+
+
+# ===============================
+# Archive files
+# ===============================
+def archive_table(name: str, model) -> Table:
+    """โครงตารางในไฟล์ archive: คอลัมน์/ชนิดเดียวกับ model (ไม่มี FK) + index (user_id, played_at)"""
+    metadata = MetaData()
+    table = Table(name, metadata, *[
+        Column(column.name, column.type, primary_key=column.primary_key)
+        for column in model.__table__.columns
+    ])
+    Index(f"idx_{name}_user_played", table.c.user_id, table.c.played_at)
+    return table
+
+
+def _sqlite_engine(path: str, read_only: bool = False):
+    url = f"sqlite:///file:{path}?mode=ro&uri=true" if read_only else f"sqlite:///{path}"
+    return create_engine(url, poolclass=NullPool, future=True)
+
+
+class ArchiveReader:
+    """เปิดไฟล์ archive แบบ read-only (แตก gzip ไว้ใน ARCHIVE_CACHE_DIR ครั้งแรกที่ใช้)"""
+
+    def __init__(self, archive_dir: str = ARCHIVE_DIR, cache_dir: str = ARCHIVE_CACHE_DIR):
+        self.archive_dir = archive_dir
+        self.cache_dir = cache_dir
+        self._engines: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _local_path(self, archive: PlayArchive) -> str:
+        source = os.path.join(self.archive_dir, archive.path)
+        local = os.path.join(self.cache_dir, os.path.basename(archive.path)[:-len(".gz")])
+        if not os.path.exists(local) or os.path.getmtime(local) < os.path.getmtime(source):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as out, gzip.open(source, "rb") as src:
+                shutil.copyfileobj(src, out)
+            os.replace(tmp, local)
+        return local
+
+    def engine(self, archive: PlayArchive):
+        with self._lock:
+            key = archive.path
+            if key not in self._engines:
+                self._engines[key] = _sqlite_engine(self._local_path(archive), read_only=True)
+            return self._engines[key]
+
+    def user_rows(self, archive: PlayArchive, user_id: int, limit: Optional[int] = None,
+                  offset: int = 0, newest_first: bool = True) -> List[SimpleNamespace]:
+        table = archive_table(archive.table_name, PLAY_TABLES[archive.table_name])
+        order = (table.c.played_at.desc(), table.c.id.desc()) if newest_first else (table.c.id,)
+        query = select(table).where(table.c.user_id == user_id).order_by(*order).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        with self.engine(archive).connect() as conn:
+            return [SimpleNamespace(**row._mapping) for row in conn.execute(query)]
+
+    def user_count(self, archive: PlayArchive, user_id: int) -> int:
+        table = archive_table(archive.table_name, PLAY_TABLES[archive.table_name])
+        with self.engine(archive).connect() as conn:
+            return conn.execute(select(func.count()).select_from(table).where(table.c.user_id == user_id)).scalar()
+
+
+archive_reader = ArchiveReader()
+
+
+def archives_for(db: Session, table: str) -> List[PlayArchive]:
+    """archive ของตารางนี้ เรียงจากเดือนใหม่ไปเก่า"""
+    return db.query(PlayArchive).filter(PlayArchive.table_name == table)\
+             .order_by(PlayArchive.period_start.desc()).all()
+
+
+def play_history(db: Session, model, user_id: int, limit: int, offset: int = 0) -> list:
+    """ประวัติการเล่น (ใหม่ไปเก่า) จากตารางร้อนต่อด้วยไฟล์ archive - คืน ORM object / SimpleNamespace ที่มี field เดียวกัน"""
+    archives = archives_for(db, model.__tablename__)
+    hot = db.query(model).filter(model.user_id == user_id)
+    if archives:
+        hot = hot.filter(model.played_at >= archives[0].period_end)
+    rows = hot.order_by(model.played_at.desc(), model.id.desc()).offset(offset).limit(limit).all()
+    if len(rows) >= limit or not archives:
+        return rows
+
+    # ตารางร้อนหมดแล้ว: ข้ามแถวที่ offset ยังเหลือ แล้วอ่านต่อจาก archive
+    skip = 0 if rows else max(0, offset - hot.count())
+    for archive in archives:
+        if len(rows) >= limit:
+            break
+        if skip:
+            count = archive_reader.user_count(archive, user_id)
+            if skip >= count:
+                skip -= count
+                continue
+        rows.extend(archive_reader.user_rows(archive, user_id, limit - len(rows), skip))
+        skip = 0
+    return rows
+
+
+def iter_plays(session_factory, model, user_id: int, batch_size: int = 1000) -> Iterator:
+    """ทุกแถวของผู้ใช้ เรียงตาม id (archive เก่าไปใหม่ แล้วตารางร้อน) - ใช้กับ export แบบ streaming"""
+    with session_factory() as db:
+        archives = archives_for(db, model.__tablename__)
+        hot_floor = archives[0].period_end if archives else None
+        for archive in reversed(archives):
+            yield from archive_reader.user_rows(archive, user_id, newest_first=False)
+
+        last_id = 0
+        while True:
+            query = db.query(model).filter(model.user_id == user_id, model.id > last_id)
+            if hot_floor is not None:
+                query = query.filter(model.played_at >= hot_floor)
+            batch = query.order_by(model.id).limit(batch_size).all()
+            if not batch:
+                return
+            yield from batch
+            last_id = batch[-1].id
+            db.expunge_all()
+
+
+# ===============================
+# Lifetime stats
+# ===============================
+# สรุปต่อผู้ใช้ของ view / ตารางในไฟล์ archive - ชื่อคอลัมน์ตรงกับ Game1Stats / Game2Stats
+STATS_COLUMNS = {
+    "game1": """
+        COUNT(*) AS total_games_played,
+        COUNT(CASE WHEN won = 1 THEN 1 END) AS total_wins,
+        COUNT(CASE WHEN won = 0 THEN 1 END) AS total_losses,
+        COALESCE(SUM(bet_amount), 0) AS total_bet_amount,
+        COALESCE(SUM(CASE WHEN won = 1 THEN win_loss_amount ELSE 0 END), 0) AS total_win_amount,
+        COALESCE(SUM(CASE WHEN won = 0 THEN ABS(win_loss_amount) ELSE 0 END), 0) AS total_loss_amount,
+        COALESCE(SUM(win_loss_amount), 0) AS net_profit_loss,
+        MIN(played_at) AS first_played_at,
+        MAX(played_at) AS last_played_at
+    """,
+    "game2": """
+        COUNT(*) AS total_games_played,
+        COUNT(CASE WHEN result = 'win' THEN 1 END) AS total_wins,
+        COUNT(CASE WHEN result = 'lose' THEN 1 END) AS total_losses,
+        COUNT(CASE WHEN result = 'tie' THEN 1 END) AS total_ties,
+        COALESCE(SUM(bet_amount), 0) AS total_bet_amount,
+        COALESCE(SUM(CASE WHEN result = 'win' THEN bet_amount ELSE 0 END), 0) AS total_win_amount,
+        COALESCE(SUM(CASE WHEN result = 'lose' THEN bet_amount ELSE 0 END), 0) AS total_loss_amount,
+        COALESCE(SUM(CASE WHEN result = 'win' THEN bet_amount WHEN result = 'lose' THEN -bet_amount ELSE 0 END), 0)
+            AS net_profit_loss,
+        COUNT(CASE WHEN player_choice = 'rock' THEN 1 END) AS rock_played,
+        COUNT(CASE WHEN player_choice = 'paper' THEN 1 END) AS paper_played,
+        COUNT(CASE WHEN player_choice = 'scissors' THEN 1 END) AS scissors_played,
+        MIN(played_at) AS first_played_at,
+        MAX(played_at) AS last_played_at
+    """,
+}
+STATS_MODELS = {"game1": Game1Stats, "game2": Game2Stats}
+STATS_AMOUNTS = ("total_bet_amount", "total_win_amount", "total_loss_amount", "net_profit_loss")
+
+
+def _stats_query(table: str, where: str, per_user: bool = False):
+    # ระบุชนิดผลลัพธ์: SQLite คืน MIN/MAX ของ DateTime เป็น string และ SUM เป็น float
+    sql = f"SELECT {'user_id, ' if per_user else ''}{STATS_COLUMNS[table]} FROM {table} WHERE {where}"
+    return text(sql + (" GROUP BY user_id" if per_user else "")).columns(
+        first_played_at=DateTime, last_played_at=DateTime,
+        **{column: Numeric(15, 2) for column in STATS_AMOUNTS},
+    )
+
+
+def merge_stats(totals: dict, other: dict) -> dict:
+    """รวมสรุปสองชุด: จำนวน / ยอดเงินบวกกัน, first_played_at / last_played_at เอาค่าแรก / ล่าสุด"""
+    merged = {}
+    for column, value in totals.items():
+        extra = other.get(column)
+        if column in ("first_played_at", "last_played_at"):
+            dates = [date for date in (value, extra) if date is not None]
+            merged[column] = (min if column == "first_played_at" else max)(dates) if dates else None
+        else:
+            merged[column] = (value or 0) + (extra or 0)
+    return merged
+
+
+def hot_floor(db: Session, table: str) -> Optional[datetime]:
+    """ขอบล่างของแถวร้อนที่ยังไม่อยู่ในไฟล์ archive (None = ตารางนี้ยังไม่เคย archive)"""
+    return db.query(func.max(PlayArchive.period_end)).filter(PlayArchive.table_name == table).scalar()
+
+
+def lifetime_stats(db: Session, table: str, user_id: int) -> dict:
+    """สถิติตลอดอายุของผู้ใช้ = game1_stats / game2_stats (เดือนที่ archive แล้ว) + แถวร้อนเหนือขอบ archive"""
+    floor = hot_floor(db, table)
+    params = {"user_id": user_id}
+    where = "user_id = :user_id"
+    if floor is not None:
+        where += " AND played_at >= :floor"
+        params["floor"] = floor
+    hot = dict(db.execute(_stats_query(table, where), params).mappings().one())
+
+    model = STATS_MODELS[table]
+    archived = db.query(model).filter(model.user_id == user_id).first()
+    if archived is None:
+        return hot
+    return merge_stats(hot, {column: getattr(archived, column) for column in hot})
+
+
+def roll_up_archive(db: Session, archive: PlayArchive, batch_size: int = 1000) -> int:
+    """
+    บวกสรุปต่อผู้ใช้ของไฟล์ archive เข้า game1_stats / game2_stats คืนจำนวนผู้ใช้
+    ต้อง commit พร้อม manifest ของไฟล์นั้น - รันซ้ำ (archive job ที่หยุดกลางทาง) จะไม่นับซ้ำ
+    """
+    model = STATS_MODELS[archive.table_name]
+    with archive_reader.engine(archive).connect() as conn:
+        rows = conn.execute(_stats_query(archive.table_name, "1 = 1", per_user=True)).mappings().all()
+    for start in range(0, len(rows), batch_size):
+        batch = {row["user_id"]: dict(row) for row in rows[start:start + batch_size]}
+        existing = {stats.user_id: stats for stats in db.query(model).filter(model.user_id.in_(batch))}
+        for user_id, row in batch.items():
+            del row["user_id"]
+            stats = existing.get(user_id)
+            if stats is None:
+                db.add(model(user_id=user_id, **row))
+                continue
+            current = {column: getattr(stats, column) for column in row}
+            for column, value in merge_stats(current, row).items():
+                setattr(stats, column, value)
+    db.flush()
+    return len(rows)
+
+
+# ===============================
+# Archival job
+# ===============================
+def _write_archive(engine, model, start: datetime, end: datetime, batch_size: int) -> Optional[tuple]:
+    """export แถวของเดือนเป็นไฟล์ .sqlite.gz - คืน (relative path, rows, bytes) หรือ None ถ้าไม่มีข้อมูล"""
+    name = model.__tablename__
+    source = model.__table__
+    relative = os.path.join(name, f"{name}_{start:%Y_%m}.sqlite.gz")
+    destination = os.path.join(ARCHIVE_DIR, relative)
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+    workdir = tempfile.mkdtemp(dir=os.path.dirname(destination))
+    try:
+        path = os.path.join(workdir, "archive.sqlite")
+        target = archive_table(name, model)
+        archive_engine = _sqlite_engine(path)
+        target.metadata.create_all(archive_engine)
+
+        rows, last_id = 0, 0
+        with engine.connect() as conn, archive_engine.begin() as out:
+            while True:
+                batch = conn.execute(
+                    select(source).where(source.c.played_at >= start, source.c.played_at < end, source.c.id > last_id)
+                    .order_by(source.c.id).limit(batch_size)
+                ).mappings().all()
+                if not batch:
+                    break
+                out.execute(target.insert(), [dict(row) for row in batch])
+                rows += len(batch)
+                last_id = batch[-1]["id"]
+        if rows == 0:
+            archive_engine.dispose()
+            return None
+        with archive_engine.connect() as out:
+            out.exec_driver_sql("VACUUM")
+        archive_engine.dispose()
+
+        with open(path, "rb") as src, gzip.open(os.path.join(workdir, "archive.gz"), "wb", compresslevel=6) as gz:
+            shutil.copyfileobj(src, gz)
+        os.replace(os.path.join(workdir, "archive.gz"), destination)
+        return relative, rows, os.path.getsize(destination)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _purge_period(engine, start: datetime, end: datetime, batch_size: int, sleep_ms: float) -> int:
+    """ลบเดือนที่ archive ครบทุกเกมแล้วออกจาก plays: DETACH + DROP partition ถ้าตรงเดือนพอดี ไม่งั้น DELETE ทีละ batch"""
+    name = PARTITIONED_TABLE
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for partition, lo, hi in partition_bounds(conn, name) if is_partitioned(conn, name) else []:
+                if lo == start and hi == end:
+                    conn.execute(text(f"ALTER TABLE {name} DETACH PARTITION {partition}"))
+                    conn.execute(text(f"DROP TABLE {partition}"))
+                    return 0
+
+    deleted = 0
+    source = Play.__table__
+    while True:
+        with engine.begin() as conn:
+            ids = conn.execute(
+                select(source.c.id).where(source.c.played_at >= start, source.c.played_at < end).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                return deleted
+            conn.execute(source.delete().where(source.c.id.in_(ids)))
+        deleted += len(ids)
+        if sleep_ms > 0:
+            time.sleep(sleep_ms / 1000)
+
+
+def _drop_empty_partitions(engine, table: str, cutoff: datetime):
+    """PostgreSQL: ทิ้ง partition ที่อยู่ก่อน cutoff ทั้งหมดและว่างแล้ว (เช่น legacy หลัง archive ครบ)"""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        if not is_partitioned(conn, table):
+            return
+        for partition, _, hi in partition_bounds(conn, table):
+            if hi is not None and hi <= cutoff and conn.execute(text(f"SELECT 1 FROM {partition} LIMIT 1")).first() is None:
+                conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+                conn.execute(text(f"DROP TABLE {partition}"))
+                print(f"🧹 dropped empty partition {partition}")
+
+
+def archive_closed_periods(engine, hot_months: int = ARCHIVE_HOT_MONTHS, now: Optional[datetime] = None,
+                           batch_size: int = ARCHIVE_BATCH_SIZE, sleep_ms: float = ARCHIVE_SLEEP_MS,
+                           dry_run: bool = False, log: Callable[[str], None] = print) -> List[tuple]:
+    """ย้ายเดือนที่เก่ากว่า hot_months (นับรวมเดือนปัจจุบัน) ไปเป็นไฟล์ archive คืน [(table, period, rows)]"""
+    cutoff = add_months(month_start(now or datetime.utcnow()), -(max(1, hot_months) - 1))
+    archived = []
+    with engine.connect() as conn:
+        oldest = conn.execute(select(func.min(Play.played_at)).where(Play.played_at < cutoff)).scalar()
+    start = month_start(oldest) if oldest else cutoff
+    while start < cutoff:
+        end = add_months(start, 1)
+        label = period_label(start)
+        if dry_run:
+            log(f"📦 {label}: would archive {', '.join(PLAY_TABLES)}")
+            start = end
+            continue
+
+        for name, model in PLAY_TABLES.items():
+            with Session(engine) as db:
+                existing = db.query(PlayArchive).filter(
+                    PlayArchive.table_name == name, PlayArchive.period == label).first()
+            if existing is not None:
+                continue
+            written = _write_archive(engine, model, start, end, batch_size)
+            if written is not None:
+                relative, rows, size = written
+                with Session(engine) as db:
+                    archive = PlayArchive(table_name=name, period=label, period_start=start, period_end=end,
+                                          path=relative, row_count=rows, size_bytes=size)
+                    db.add(archive)
+                    users = roll_up_archive(db, archive)
+                    db.commit()
+                log(f"📦 {name} {label}: {rows} rows → {relative} ({size / 1024:.1f} KB, stats of {users} users rolled up)")
+                archived.append((name, label, rows))
+        # ลบหลังบันทึก manifest ครบทุกเกมแล้วเท่านั้น (รันซ้ำได้ถ้าหยุดกลางทาง)
+        _purge_period(engine, start, end, batch_size, sleep_ms)
+        start = end
+
+    if engine.dialect.name == "postgresql" and not dry_run:
+        _drop_empty_partitions(engine, PARTITIONED_TABLE, cutoff)
+        with engine.begin() as conn:
+            ensure_future_partitions(conn, now)
+    return archived
@@ -0,0 +1,181 @@
+"""
+Unified plays table - ทุกตาของทุกเกมอยู่ในตาราง plays (ดู models.Play)
+
+- รหัสตัวเลขแทนข้อความ: game / choice / result / outcome ตาม rules.GAME_CODES, CHOICE_CODES, OUTCOME_CODES
+- เงินเป็นสตางค์ (BIGINT) ไม่มีทศนิยมปัดเศษ และไม่เก็บ win_loss_amount ซ้ำ (คำนวณจาก outcome ตาม rules)
+- index เดียว (user_id, game, played_at) แทน index แยกต่อเกม 4-5 ตัว
+- เล่นหนึ่งตา = INSERT หนึ่งแถว (ไม่ต้องเขียน game2_stats ทุกตาอีก - สถิติคำนวณจาก plays)
+
+game1 / game2 เป็น view ที่คืนคอลัมน์เดิมทุกตัว (bet_amount, selected_color, win_loss_amount, ...)
+query เดิม, ORM Game1 / Game2, history, export และ archive จึงใช้ได้เหมือนเดิม (อ่านอย่างเดียว)
+เกมใหม่ = เพิ่มรหัสใน rules.py + view ของเกมนั้น ไม่ต้องสร้างตารางใหม่
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import inspect, text
+
+from . import rules
+from .models import Play
+from .partitions import PARTITION_PREMAKE_MONTHS, ensure_month_partitions, month_start
+
+PLAY_COLUMNS = ("user_id", "game", "choice", "result", "outcome",
+                "bet_cents", "balance_before_cents", "balance_after_cents", "played_at")
+
+
+# ===============================
+# SQL helpers
+# ===============================
+def _case(expression: str, mapping: Dict, default: str = "NULL") -> str:
+    """CASE expression WHEN key THEN value ... (ค่า str ถูกใส่ quote ให้)"""
+    quote = lambda value: f"'{value}'" if isinstance(value, str) else str(value)  # noqa: E731
+    whens = " ".join(f"WHEN {quote(key)} THEN {quote(value)}" for key, value in mapping.items())
+    return f"CASE {expression} {whens} ELSE {default} END"
+
+
+def _money(dialect: str, cents: str) -> str:
+    """สตางค์ → จำนวนเงิน (PostgreSQL คืน NUMERIC แบบเดียวกับคอลัมน์เดิม)"""
+    if dialect == "postgresql":
+        return f"CAST(({cents}) / 100.0 AS NUMERIC(15, 2))"
+    return f"(({cents}) / 100.0)"
+
+
+def _cents(amount: str) -> str:
+    return f"CAST(ROUND(({amount}) * 100) AS BIGINT)"
+
+
+def _recorded_cents(game: str) -> str:
+    """win_loss_amount ที่บันทึก = bet * ตัวคูณ recorded ของผล (rules.*_OUTCOMES)"""
+    outcomes = rules.GAMES[game][0]
+    multiplier = _case("outcome", {rules.OUTCOME_CODES[name]: rule.recorded for name, rule in outcomes.items()}, "0")
+    return f"bet_cents * {multiplier}"
+
+
+# ===============================
+# Compatibility views (game1 / game2)
+# ===============================
+def view_columns(dialect: str, game: str) -> Dict[str, str]:
+    """คอลัมน์ของตารางเดิม → expression บน plays"""
+    decode = {code: name for name, code in rules.CHOICE_CODES[game].items()}
+    money = lambda cents: _money(dialect, cents)  # noqa: E731
+    columns = {"id": "id", "user_id": "user_id", "bet_amount": money("bet_cents")}
+    if game == "game1":
+        columns.update({
+            "selected_color": _case("choice", decode),
+            "result_color": _case("result", decode),
+            "won": f"CASE WHEN outcome = {rules.OUTCOME_CODES['win']} THEN 1 ELSE 0 END",
+        })
+    else:
+        columns.update({
+            "player_choice": _case("choice", decode),
+            "bot_choice": _case("result", decode),
+            "result": _case("outcome", {code: name for name, code in rules.OUTCOME_CODES.items()}),
+        })
+    columns.update({
+        "win_loss_amount": money(_recorded_cents(game)),
+        "balance_before": money("balance_before_cents"),
+        "balance_after": money("balance_after_cents"),
+        "played_at": "played_at",
+    })
+    return columns
+
+
+def create_play_views(conn):
+    """สร้าง / แทนที่ view game1, game2 (ข้ามถ้าชื่อนั้นยังเป็นตารางเดิมที่ยังไม่ได้ migrate)"""
+    dialect = conn.dialect.name
+    tables = set(inspect(conn).get_table_names())
+    for game, code in rules.GAME_CODES.items():
+        if game in tables:
+            print(f"⚠️  {game} is still a table - run `python migrate.py` to move it into plays")
+            continue
+        select_list = ",\n    ".join(f"{expression} AS {name}" for name, expression in view_columns(dialect, game).items())
+        body = f"SELECT\n    {select_list}\nFROM plays\nWHERE game = {code}"
+        if dialect == "postgresql":
+            conn.execute(text(f"CREATE OR REPLACE VIEW {game} AS\n{body}"))
+        else:
+            conn.execute(text(f"DROP VIEW IF EXISTS {game}"))
+            conn.execute(text(f"CREATE VIEW {game} AS\n{body}"))
+
+
+# ===============================
+# Legacy tables → plays
+# ===============================
+def legacy_copy_sql(game: str, source: str) -> str:
+    """INSERT ... SELECT จากตาราง game1 / game2 รุ่นเดิม ทีละช่วง id (:lower < id <= :upper)"""
+    choices = rules.CHOICE_CODES[game]
+    if game == "game1":
+        choice, result = _case("selected_color", choices), _case("result_color", choices)
+        outcome = f"CASE WHEN won = 1 THEN {rules.OUTCOME_CODES['win']} ELSE {rules.OUTCOME_CODES['lose']} END"
+    else:
+        choice, result = _case("player_choice", choices), _case("bot_choice", choices)
+        outcome = _case("result", rules.OUTCOME_CODES)
+    return f"""
+        INSERT INTO plays ({", ".join(PLAY_COLUMNS)})
+        SELECT user_id, {rules.GAME_CODES[game]}, {choice}, {result}, {outcome},
+               {_cents("bet_amount")}, {_cents("COALESCE(balance_before, 0)")}, {_cents("COALESCE(balance_after, 0)")},
+               played_at
+        FROM {source}
+        WHERE id > :lower AND (:upper IS NULL OR id <= :upper)
+        ORDER BY id
+    """
+
+
+def create_plays_table(conn, first_played_at: Optional[datetime] = None):
+    """
+    สร้างตาราง plays - PostgreSQL: partitioned รายเดือนตั้งแต่เดือนของ first_played_at (ข้อมูลเดิมที่จะ copy มา)
+    ถึงเดือนหน้าอีก PARTITION_PREMAKE_MONTHS เดือน + DEFAULT partition (ดู partitions.py)
+    """
+    if conn.dialect.name != "postgresql":
+        Play.__table__.create(bind=conn, checkfirst=True)
+        return
+    if "plays" in inspect(conn).get_table_names():
+        return
+    # PK ของ partitioned table ต้องมี partition key ด้วย (ORM ยังใช้ id อย่างเดียว)
+    conn.execute(text("""
+        CREATE TABLE plays (
+            id BIGSERIAL,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            game SMALLINT NOT NULL,
+            choice SMALLINT NOT NULL,
+            result SMALLINT NOT NULL,
+            outcome SMALLINT NOT NULL,
+            bet_cents BIGINT NOT NULL,
+            balance_before_cents BIGINT NOT NULL,
+            balance_after_cents BIGINT NOT NULL,
+            played_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT plays_bet_positive CHECK (bet_cents > 0),
+            PRIMARY KEY (id, played_at)
+        ) PARTITION BY RANGE (played_at)
+    """))
+    conn.execute(text("CREATE INDEX idx_plays_user_game_played ON plays (user_id, game, played_at)"))
+    current = month_start(datetime.utcnow())
+    first = min(month_start(first_played_at), current) if first_played_at else current
+    months = (current.year - first.year) * 12 + current.month - first.month + PARTITION_PREMAKE_MONTHS + 1
+    ensure_month_partitions(conn, "plays", first, months)
+    conn.execute(text("CREATE TABLE plays_pdefault PARTITION OF plays DEFAULT"))
+
+
+# ===============================
+# Writes
+# ===============================
+def play_values(game: str, user_id: int, choice: str, result: str, outcome: str, bet_amount,
+                balance_before, balance_after, played_at: Optional[datetime] = None) -> dict:
+    """ค่าแบบเดิม (ข้อความ / จำนวนเงิน) → คอลัมน์ของ plays (ใช้กับ bulk insert ได้ด้วย)"""
+    choices = rules.CHOICE_CODES[game]
+    return {
+        "user_id": user_id,
+        "game": rules.GAME_CODES[game],
+        "choice": choices[choice],
+        "result": choices[result],
+        "outcome": rules.OUTCOME_CODES[outcome],
+        "bet_cents": rules.to_cents(bet_amount),
+        "balance_before_cents": rules.to_cents(balance_before),
+        "balance_after_cents": rules.to_cents(balance_after),
+        "played_at": played_at or datetime.utcnow(),
+    }
+
+
+def new_play(*args, **kwargs) -> Play:
+    """แถว Play ใหม่ - ใช้แทน Game1(...) / Game2(...) (argument เดียวกับ play_values)"""
+    return Play(**play_values(*args, **kwargs))
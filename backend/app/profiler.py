@@ -0,0 +1,205 @@
+"""
+SQL query profiler - บันทึกทุก statement ต่อ request พร้อมเวลาที่ใช้
+
+เปิดใช้ได้ 2 วิธี:
+  - ตั้ง env SQL_PROFILER=1 (profile ทุก request)
+  - Admin ส่ง header "X-SQL-Profile: 1" มากับ request (profile เฉพาะ request นั้น)
+
+สิ่งที่ได้:
+  - Server-Timing header (db / app) ให้ดูใน DevTools ได้ทันที
+  - แจ้งเตือน statement ที่ถูกเรียกซ้ำหลายครั้งใน request เดียว (N+1 pattern)
+  - log query ที่ช้ากว่า SQL_SLOW_QUERY_MS พร้อมผล EXPLAIN
+"""
+
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+
+SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER", "0") == "1"
+SQL_PROFILE_HEADER = "x-sql-profile"
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+SQL_NPLUS1_THRESHOLD = int(os.getenv("SQL_NPLUS1_THRESHOLD", "5"))
+
+# profile ของ request ปัจจุบัน (None = ไม่ได้ profile)
+_current_profile: ContextVar[Optional["QueryProfile"]] = ContextVar("sql_profile", default=None)
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """ตัด literal และช่องว่างออก ให้ statement ที่ต่างกันแค่ค่า parameter นับเป็นตัวเดียวกัน"""
+    statement = _LITERAL_RE.sub("?", statement)
+    return _WHITESPACE_RE.sub(" ", statement).strip()
+
+
+class QueryRecord:
+    __slots__ = ("statement", "parameters", "duration_ms", "engine")
+
+    def __init__(self, statement, parameters, duration_ms, engine):
+        self.statement = statement
+        self.parameters = parameters
+        self.duration_ms = duration_ms
+        self.engine = engine
+
+
+class QueryProfile:
+    """เก็บ statement ทั้งหมดที่รันใน request หนึ่ง"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.queries: List[QueryRecord] = []
+        self.started_at = time.perf_counter()
+
+    def record(self, statement, parameters, duration_ms, engine):
+        self.queries.append(QueryRecord(statement, parameters, duration_ms, engine))
+
+    @property
+    def db_ms(self) -> float:
+        return sum(q.duration_ms for q in self.queries)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def repeated(self, threshold: int = SQL_NPLUS1_THRESHOLD) -> List[Dict]:
+        """statement ที่ถูกเรียกซ้ำ >= threshold ครั้ง (สัญญาณของ N+1)"""
+        groups: Dict[str, Dict] = {}
+        for q in self.queries:
+            key = normalize_statement(q.statement)
+            group = groups.setdefault(key, {"statement": key, "count": 0, "total_ms": 0.0})
+            group["count"] += 1
+            group["total_ms"] += q.duration_ms
+        return sorted(
+            (g for g in groups.values() if g["count"] >= threshold),
+            key=lambda g: g["count"],
+            reverse=True,
+        )
+
+    def slow(self, threshold_ms: float = SQL_SLOW_QUERY_MS) -> List[QueryRecord]:
+        return [q for q in self.queries if q.duration_ms >= threshold_ms]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_ms:.2f};desc="{len(self.queries)} queries", '
+            f"app;dur={self.elapsed_ms():.2f}"
+        )
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current_profile.get()
+
+
+@contextmanager
+def collect_queries(label: str = "manual"):
+    """เก็บ query ที่รันภายใน block นี้ (ใช้ใน benchmark / script โดยไม่ต้องผ่าน middleware)"""
+    profile = QueryProfile("-", label)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("sql_profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    starts = conn.info.get("sql_profiler_start")
+    if profile is None or not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    profile.record(statement, parameters, duration_ms, conn.engine)
+
+
+def install_query_listeners(engine):
+    """ผูก event ของ SQLAlchemy เข้ากับ engine (เรียกซ้ำได้ ไม่ผูกซ้ำ)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def explain(record: QueryRecord) -> List[str]:
+    """รัน EXPLAIN ของ statement ที่ช้าบน connection ใหม่"""
+    statement = record.statement.lstrip()
+    if statement.split(None, 1)[0].upper() not in ("SELECT", "UPDATE", "DELETE", "WITH"):
+        return []
+    prefix = "EXPLAIN QUERY PLAN " if record.engine.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        with record.engine.connect() as conn:
+            rows = conn.exec_driver_sql(prefix + statement, record.parameters).fetchall()
+            conn.rollback()
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+    return [" | ".join(str(col) for col in row) for row in rows]
+
+
+def report(profile: QueryProfile):
+    """พิมพ์สรุป profile ของ request (รันใน threadpool เพราะ EXPLAIN ต้องใช้ DB)"""
+    print(
+        f"🔎 SQL profile {profile.method} {profile.path}: "
+        f"{len(profile.queries)} queries, db {profile.db_ms:.2f} ms"
+    )
+    for group in profile.repeated():
+        print(
+            f"⚠️ Possible N+1: {group['count']}x ({group['total_ms']:.2f} ms) "
+            f"{group['statement'][:200]}"
+        )
+    for record in profile.slow():
+        print(f"🐢 Slow query ({record.duration_ms:.2f} ms): {normalize_statement(record.statement)[:500]}")
+        for line in explain(record):
+            print(f"     {line}")
+
+
+class SQLProfilerMiddleware:
+    """
+    ASGI middleware ที่เปิด QueryProfile ต่อ request
+
+    is_admin: ฟังก์ชันรับ Request แล้วคืน True ถ้าเป็น admin
+              (ใช้ตรวจสิทธิ์ก่อนยอมรับ header X-SQL-Profile)
+    """
+
+    def __init__(self, app, is_admin: Callable[[Request], bool], enabled: bool = SQL_PROFILER_ENABLED):
+        self.app = app
+        self.is_admin = is_admin
+        self.enabled = enabled
+
+    def wants_profile(self, scope) -> bool:
+        if self.enabled:
+            return True
+        request = Request(scope)
+        if request.headers.get(SQL_PROFILE_HEADER) != "1":
+            return False
+        return self.is_admin(request)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile(scope["method"], scope["path"])
+        token = _current_profile.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_profile.reset(token)
+            await run_in_threadpool(report, profile)
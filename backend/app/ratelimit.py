@@ -0,0 +1,254 @@
+"""
+Rate limiting (token bucket) สำหรับ endpoint เล่นเกม / การเงิน / login / สมัครสมาชิก
+
+- bucket ต่อผู้ใช้ (email จาก cookie) + route สำหรับเล่นเกมและฝาก/ถอน, ต่อ IP สำหรับ /login และ /api/register
+  (ถ้ายังไม่ login จะนับต่อ IP แทน)
+- ค่า limit เป็น "<requests>/<seconds>": bucket จุได้ requests ครั้ง (burst) และเติมกลับเต็มใน seconds วินาที
+- ตอบ header มาตรฐาน RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset / RateLimit-Policy
+  ถ้าเกินตอบ 429 + Retry-After ทันทีจาก middleware - ไม่แตะ database และไม่เข้า handler
+- backend:
+  memory (ค่าเริ่มต้น) - dict ใน process (LRU จำกัดจำนวน key) แต่ละ uvicorn worker นับแยกกัน
+  shared - ไฟล์ mmap ที่ทุก worker บนเครื่องเดียวกันเปิดร่วมกัน (ล็อกด้วย flock ระหว่างอ่าน-แก้ bucket)
+           limit จึงเป็นของทั้งเครื่องไม่ใช่ต่อ worker (ต้องมี fcntl - Linux / macOS)
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from starlette.requests import Request
+
+from .models import database_instance_id
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")          # memory | shared
+# ไฟล์แยกตาม database เหมือน EVENT_BUS_SOCKET_DIR - deployment อื่นบนเครื่องเดียวกันไม่ใช้ bucket ร่วมกัน
+RATE_LIMIT_SHARED_PATH = os.getenv(
+    "RATE_LIMIT_SHARED_PATH", os.path.join(tempfile.gettempdir(), f"xbet_ratelimit_{database_instance_id()}.bin")
+)
+RATE_LIMIT_SHARED_SLOTS = int(os.getenv("RATE_LIMIT_SHARED_SLOTS", "65536"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # memory backend
+# ใช้ IP จาก X-Forwarded-For (เปิดเฉพาะเมื่ออยู่หลัง reverse proxy ที่เชื่อถือได้)
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+
+
+class Limit(NamedTuple):
+    name: str           # ชื่อ policy (ใช้เป็นส่วนหนึ่งของ key)
+    capacity: int       # burst สูงสุด
+    refill_per_s: float
+    per: str            # "user" | "ip"
+
+    @property
+    def window_s(self) -> float:
+        return self.capacity / self.refill_per_s
+
+
+def parse_limit(name: str, spec: str, per: str) -> Limit:
+    """"10/1" = 10 ครั้ง เติมเต็มใน 1 วินาที"""
+    requests, seconds = spec.split("/")
+    return Limit(name, int(requests), int(requests) / float(seconds), per)
+
+
+PLAY_LIMIT = parse_limit("play", os.getenv("RATE_LIMIT_PLAY", "10/1"), "user")
+MONEY_LIMIT = parse_limit("money", os.getenv("RATE_LIMIT_MONEY", "5/10"), "user")
+LOGIN_LIMIT = parse_limit("login", os.getenv("RATE_LIMIT_LOGIN", "10/60"), "ip")
+REGISTER_LIMIT = parse_limit("register", os.getenv("RATE_LIMIT_REGISTER", "5/3600"), "ip")
+
+RATE_LIMITS: Dict[Tuple[str, str], Limit] = {
+    ("POST", "/api/game1/play"): PLAY_LIMIT,
+    ("POST", "/api/game1-play"): PLAY_LIMIT,
+    ("POST", "/api/game2/play"): PLAY_LIMIT,
+    ("POST", "/api/wheel/bet"): PLAY_LIMIT,
+    ("POST", "/api/place-bet"): PLAY_LIMIT,
+    ("POST", "/api/game-result"): PLAY_LIMIT,
+    ("POST", "/deposit"): MONEY_LIMIT,
+    ("POST", "/withdraw"): MONEY_LIMIT,
+    ("POST", "/login"): LOGIN_LIMIT,
+    ("POST", "/api/register"): REGISTER_LIMIT,
+}
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    reset_s: float        # เวลาจน bucket เต็มอีกครั้ง
+    retry_after_s: float  # 0 ถ้าผ่าน
+
+
+def _consume(tokens: float, elapsed: float, limit: Limit) -> Tuple[float, Decision]:
+    """เติม token ตามเวลาที่ผ่านไปแล้วหยิบ 1 อัน คืน (tokens ใหม่, ผล)"""
+    tokens = min(float(limit.capacity), tokens + max(0.0, elapsed) * limit.refill_per_s)
+    allowed = tokens >= 1.0
+    if allowed:
+        tokens -= 1.0
+    retry_after = 0.0 if allowed else (1.0 - tokens) / limit.refill_per_s
+    reset = (limit.capacity - tokens) / limit.refill_per_s
+    return tokens, Decision(allowed, int(tokens), reset, retry_after)
+
+
+# ===============================
+# Backends
+# ===============================
+class MemoryBackend:
+    """bucket ใน process เดียว (เรียกจาก event loop เท่านั้น จึงไม่ต้องล็อก)"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, limit: Limit) -> Decision:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (float(limit.capacity), now))
+        tokens, decision = _consume(tokens, now - updated, limit)
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            # key ที่ไม่ได้ใช้นานที่สุดน่าจะเติมเต็มแล้ว - ทิ้งได้โดยไม่เปลี่ยนผล
+            self._buckets.popitem(last=False)
+        return decision
+
+
+class SharedFileBackend:
+    """
+    hash table ขนาดคงที่ในไฟล์ mmap ที่ทุก worker เปิดร่วมกัน
+    slot = (hash ของ key 8 bytes, tokens, updated unix time) - ชนกันให้ probe ต่อไม่เกิน PROBES slot
+    ถ้าเต็มทั้งช่วง probe ทับ slot ที่ไม่ได้ใช้นานที่สุด
+    """
+
+    SLOT = struct.Struct("<Qdd")
+    PROBES = 8
+
+    def __init__(self, path: str = RATE_LIMIT_SHARED_PATH, slots: int = RATE_LIMIT_SHARED_SLOTS):
+        import fcntl
+
+        self._fcntl = fcntl
+        self.slots = slots
+        size = slots * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size != size:
+                # ไฟล์ใหม่หรือเปลี่ยนจำนวน slot - เริ่มนับใหม่ทั้งหมด
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # 0 = slot ว่าง
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def take(self, key: str, limit: Limit) -> Decision:
+        digest = self._hash(key)
+        start = digest % self.slots
+        self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+        try:
+            now = time.time()
+            target, oldest = None, None
+            for probe in range(self.PROBES):
+                index = (start + probe) % self.slots
+                slot_hash, tokens, updated = self.SLOT.unpack_from(self._map, index * self.SLOT.size)
+                if slot_hash == digest:
+                    target = (index, tokens, updated)
+                    break
+                if slot_hash == 0:
+                    target = (index, float(limit.capacity), now)
+                    break
+                if oldest is None or updated < oldest[2]:
+                    oldest = (index, float(limit.capacity), updated)
+            if target is None:
+                index = oldest[0]
+                target = (index, float(limit.capacity), now)
+
+            index, tokens, updated = target
+            tokens, decision = _consume(tokens, now - updated, limit)
+            self.SLOT.pack_into(self._map, index * self.SLOT.size, digest, tokens, now)
+            return decision
+        finally:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+
+def make_backend(kind: str = RATE_LIMIT_BACKEND):
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "shared":
+        return SharedFileBackend()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {kind!r} (expected 'memory' or 'shared')")
+
+
+# ===============================
+# Middleware
+# ===============================
+def client_ip(scope) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def rate_limit_headers(limit: Limit, decision: Decision) -> list:
+    headers = [
+        (b"ratelimit-limit", str(limit.capacity).encode()),
+        (b"ratelimit-remaining", str(decision.remaining).encode()),
+        (b"ratelimit-reset", str(math.ceil(decision.reset_s)).encode()),
+        (b"ratelimit-policy", f"{limit.capacity};w={math.ceil(limit.window_s)}".encode()),
+    ]
+    if not decision.allowed:
+        headers.append((b"retry-after", str(max(1, math.ceil(decision.retry_after_s))).encode()))
+    return headers
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware ตาม RATE_LIMITS - ตัดสินจาก cookie / IP และ bucket ในหน่วยความจำเท่านั้น
+
+    owner: ฟังก์ชันรับ Request แล้วคืน email ของผู้ใช้ (None = ไม่ได้ login ใช้ IP แทน)
+    """
+
+    def __init__(self, app, owner: Callable[[Request], Optional[str]], backend=None,
+                 limits: Dict[Tuple[str, str], Limit] = RATE_LIMITS, enabled: bool = RATE_LIMIT_ENABLED):
+        self.app = app
+        self.owner = owner
+        self.backend = backend or make_backend()
+        self.limits = limits
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if limit is None or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        owner = self.owner(Request(scope)) if limit.per == "user" else None
+        ident = f"u:{owner}" if owner else f"ip:{client_ip(scope)}"
+        # key ต่อ route ด้วย - route ที่ใช้ policy เดียวกัน (เช่น PLAY_LIMIT) นับ bucket แยกกัน
+        decision = self.backend.take(f"{limit.name}:{scope['method']} {scope['path']}:{ident}", limit)
+        headers = rate_limit_headers(limit, decision)
+
+        if not decision.allowed:
+            body = json.dumps({"detail": "Too many requests, please slow down"}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode())] + headers,
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) + headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
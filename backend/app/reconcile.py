@@ -0,0 +1,309 @@
+"""
+Balance reconciliation - ตรวจว่า balance chain ของผู้ใช้ทุกคนต่อกันและตรงกับ credit.balance (ดู reconcile_balances.py)
+
+- balance chain ของผู้ใช้ = plays (game1 / game2) + wallet_transactions (ฝาก / ถอน / /api/game-result)
+  เรียงตามเวลา: balance_before ของแต่ละรายการต้องเท่ากับ balance_after ของรายการก่อนหน้า
+  และ balance_after ของรายการสุดท้ายต้องเท่ากับ credit.balance (ทุกค่าเป็นสตางค์)
+- ความผิดปกติที่รายงาน:
+  gap     - balance_before ไม่ต่อจากรายการก่อนหน้า (มีการเปลี่ยนยอดที่ไม่มีแถวบันทึก) หลังจากนั้นตรวจต่อจากแถวนั้น
+  amount  - balance_after - balance_before ไม่ตรงกับกติกา (plays: ตัวคูณใน rules.py × เดิมพัน, ledger: amount_cents)
+  balance - ยอดหลังรายการสุดท้าย (หรือ checkpoint) ไม่ตรงกับ credit.balance
+- แบ่งผู้ใช้เป็นช่วง user id ละ RECONCILE_CHUNK_USERS คน กระจายให้ worker process แต่ละช่วงอ่าน plays / ledger /
+  credit / checkpoint เป็น 4 stream ที่เรียงตาม user_id บน connection เดียว (snapshot เดียวกัน) แล้ว merge ทีละผู้ใช้
+  ไม่โหลดทั้งตารางเข้าหน่วยความจำ
+- Incremental: แต่ละรอบอ่านเฉพาะรายการหลัง cutoff ของรอบก่อนที่จบแล้ว (reconcile_runs) และต่อจาก checkpoint
+  ต่อผู้ใช้ (reconcile_state) - checkpoint เก็บเฉพาะรายการที่เก่ากว่า cutoff = เวลาเริ่ม - RECONCILE_GRACE_S
+  เพื่อให้ transaction ที่ยัง commit ไม่เสร็จตอนอ่านถูกตรวจในรอบถัดไป (รายการหลัง cutoff ตรวจซ้ำอีกรอบ)
+- รอบแรก (ยังไม่มีรอบที่จบ) เริ่มที่เวลาที่สร้าง wallet_transactions (migration 12) เพราะก่อนหน้านั้นฝาก / ถอน
+  ไม่มีแถวบันทึก ส่วน full=True ตรวจใหม่ตั้งแต่ต้น (หลังเดือนที่ archive แล้ว) และเขียน checkpoint ใหม่ทั้งหมด
+  รายการแรกของผู้ใช้ที่ยังไม่มี checkpoint ใช้ balance_before เป็นยอดตั้งต้น
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from itertools import groupby
+from multiprocessing import get_context
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from . import rules
+from .models import (
+    engine as default_engine, Credit, Play, PlayArchive, ReconcileRun, ReconcileState, User,
+    WalletTransaction, dialect_insert,
+)
+
+RECONCILE_WORKERS = int(os.getenv("RECONCILE_WORKERS", str(min(4, os.cpu_count() or 1))))
+RECONCILE_CHUNK_USERS = int(os.getenv("RECONCILE_CHUNK_USERS", "5000"))
+RECONCILE_FETCH_SIZE = int(os.getenv("RECONCILE_FETCH_SIZE", "2000"))
+RECONCILE_GRACE_S = int(os.getenv("RECONCILE_GRACE_S", "300"))
+# จำนวนความผิดปกติสูงสุดที่ส่งกลับต่อหนึ่งช่วงผู้ใช้ (นับทั้งหมดเสมอ)
+RECONCILE_MAX_REPORTED = int(os.getenv("RECONCILE_MAX_REPORTED", "1000"))
+
+LEDGER_MIGRATION = 12
+
+# (รหัสเกม, รหัสผล) → ตัวคูณการเปลี่ยนยอดต่อเงินเดิมพัน
+PLAY_MULTIPLIERS: Dict[Tuple[int, int], int] = {
+    (rules.GAME_CODES[game], rules.OUTCOME_CODES[name]): outcome.balance
+    for game, (outcomes, _, _) in rules.GAMES.items()
+    for name, outcome in outcomes.items()
+}
+GAME_NAMES = {code: game for game, code in rules.GAME_CODES.items()}
+
+
+class _Groups:
+    """stream ที่เรียงตาม user_id (คอลัมน์แรก) → แถวของผู้ใช้ทีละคน"""
+
+    def __init__(self, rows: Iterable):
+        self._groups = groupby(rows, key=itemgetter(0))
+        self._advance()
+
+    def _advance(self):
+        self.user_id, self._rows = next(self._groups, (None, None))
+
+    def take(self, user_id: int) -> list:
+        if self.user_id != user_id:
+            return []
+        rows = list(self._rows)
+        self._advance()
+        return rows
+
+
+def _plays_query(lo: int, hi: int, since: Optional[datetime]):
+    query = select(
+        Play.user_id, Play.played_at, Play.id, Play.balance_before_cents, Play.balance_after_cents,
+        Play.game, Play.outcome, Play.bet_cents,
+    ).where(Play.user_id >= lo, Play.user_id < hi)
+    if since is not None:
+        query = query.where(Play.played_at > since)
+    return query.order_by(Play.user_id, Play.played_at, Play.id)
+
+
+def _ledger_query(lo: int, hi: int, since: Optional[datetime]):
+    query = select(
+        WalletTransaction.user_id, WalletTransaction.created_at, WalletTransaction.id,
+        WalletTransaction.balance_before_cents, WalletTransaction.balance_after_cents,
+        WalletTransaction.kind, WalletTransaction.amount_cents,
+    ).where(WalletTransaction.user_id >= lo, WalletTransaction.user_id < hi)
+    if since is not None:
+        query = query.where(WalletTransaction.created_at > since)
+    return query.order_by(WalletTransaction.user_id, WalletTransaction.created_at, WalletTransaction.id)
+
+
+def _entries(plays: list, ledger: list, balance: Optional[int]):
+    """
+    รวม plays + ledger ของผู้ใช้หนึ่งคนตามเวลา → (เวลา, แหล่ง, id, ก่อน, หลัง, การเปลี่ยนแปลงที่ควรเป็น)
+    ถ้าเวลาเท่ากันเลือกรายการที่ balance_before ต่อจากยอดล่าสุด
+    """
+    i = j = 0
+    while i < len(plays) or j < len(ledger):
+        play = plays[i] if i < len(plays) else None
+        tx = ledger[j] if j < len(ledger) else None
+        take_play = tx is None or (play is not None and (
+            play[1] < tx[1] or (play[1] == tx[1] and not (tx[3] == balance and play[3] != balance))
+        ))
+        if take_play:
+            _, at, play_id, before, after, game, outcome, bet_cents = play
+            multiplier = PLAY_MULTIPLIERS.get((game, outcome))
+            i += 1
+            yield at, GAME_NAMES.get(game, f"game{game}"), play_id, before, after, \
+                None if multiplier is None else multiplier * bet_cents
+        else:
+            _, at, tx_id, before, after, kind, amount_cents = tx
+            j += 1
+            yield at, kind, tx_id, before, after, amount_cents
+        balance = after
+
+
+def _discrepancy(user_id: int, kind: str, expected, actual, entry=None) -> dict:
+    found = {"user_id": user_id, "kind": kind, "expected_cents": expected, "actual_cents": actual}
+    if entry is not None:
+        at, source, entry_id = entry[:3]
+        found.update(source=source, id=entry_id, at=at.isoformat())
+    return found
+
+
+def reconcile_user(user_id: int, plays: list, ledger: list, credit_cents: Optional[int],
+                   state: Optional[Tuple[Optional[datetime], int]], cutoff: datetime):
+    """
+    ตรวจ chain ของผู้ใช้หนึ่งคน คืน (จำนวนรายการที่ตรวจ, ความผิดปกติ, checkpoint ใหม่ (position_at, balance) หรือ None)
+    state = checkpoint เดิม (position_at, balance_cents) หรือ None ถ้ายังไม่เคยตรวจ
+    """
+    position, balance = state if state else (None, None)
+    found, checked = [], 0
+    checkpoint = None
+    for entry in _entries(plays, ledger, balance):
+        at, _, _, before, after, change = entry
+        if position is not None and at <= position:
+            continue  # ตรวจแล้วในรอบก่อน (รอบที่หยุดกลางทาง)
+        checked += 1
+        if balance is not None and before != balance:
+            found.append(_discrepancy(user_id, "gap", balance, before, entry))
+        if change is not None and after - before != change:
+            found.append(_discrepancy(user_id, "amount", change, after - before, entry))
+        balance = after
+        if at <= cutoff:
+            checkpoint = (at, balance)
+
+    if balance is not None and credit_cents != balance:
+        found.append(_discrepancy(user_id, "balance", balance, credit_cents))
+    if checkpoint is None and state is None:
+        # ยังไม่มีรายการที่เก่ากว่า cutoff: ตั้งยอดตั้งต้นให้รอบถัดไปตรวจต่อ
+        first = next(_entries(plays, ledger, None), None)
+        opening = first[3] if first else credit_cents
+        checkpoint = (None, opening) if opening is not None else None
+    return checked, found, checkpoint
+
+
+def _save_states(conn, states: List[dict]):
+    # executemany ของ upsert เดียว (ไม่ compile VALUES หลายแถวใหม่ทุก batch)
+    table = ReconcileState.__table__
+    statement = dialect_insert(conn)(table)
+    conn.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            "position_at": statement.excluded.position_at,
+            "balance_cents": statement.excluded.balance_cents,
+            "updated_at": statement.excluded.updated_at,
+        },
+    ), states)
+
+
+def reconcile_chunk(lo: int, hi: int, since: Optional[datetime], cutoff: datetime, full: bool = False,
+                    engine=None) -> dict:
+    """ตรวจผู้ใช้ช่วง [lo, hi) แล้วบันทึก checkpoint (เรียกใน worker process ได้ - engine ค่าเริ่มต้นคือ DATABASE_URL)"""
+    engine = engine or default_engine
+    users = checked = total_found = 0
+    found: List[dict] = []
+    states: List[dict] = []
+    now = datetime.utcnow()
+
+    options = {"stream_results": True, "max_row_buffer": RECONCILE_FETCH_SIZE}
+    if engine.dialect.name == "postgresql":
+        # ทุก stream เห็น snapshot เดียวกัน (credit ตรงกับ plays / ledger ที่อ่าน)
+        options["isolation_level"] = "REPEATABLE READ"
+    with engine.connect().execution_options(**options) as conn, conn.begin():
+        if engine.dialect.name == "sqlite" and not conn.connection.dbapi_connection.in_transaction:
+            # pysqlite ไม่ BEGIN ให้ตอน SELECT - เปิด read transaction เองให้ทุก stream เห็น snapshot เดียวกัน
+            conn.exec_driver_sql("BEGIN")
+        plays = _Groups(conn.execute(_plays_query(lo, hi, since)))
+        ledger = _Groups(conn.execute(_ledger_query(lo, hi, since)))
+        credits = _Groups(conn.execute(
+            select(Credit.user_id, Credit.balance)
+            .where(Credit.user_id >= lo, Credit.user_id < hi).order_by(Credit.user_id)
+        ))
+        saved = _Groups(iter(()) if full else conn.execute(
+            select(ReconcileState.user_id, ReconcileState.position_at, ReconcileState.balance_cents)
+            .where(ReconcileState.user_id >= lo, ReconcileState.user_id < hi).order_by(ReconcileState.user_id)
+        ))
+        streams = (plays, ledger, credits, saved)
+
+        while True:
+            pending = [stream.user_id for stream in streams if stream.user_id is not None]
+            if not pending:
+                break
+            user_id = min(pending)
+            credit = credits.take(user_id)
+            state = saved.take(user_id)
+            state = (state[0][1], state[0][2]) if state else None
+            user_checked, user_found, checkpoint = reconcile_user(
+                user_id, plays.take(user_id), ledger.take(user_id),
+                rules.to_cents(credit[0][1]) if credit else None, state, cutoff,
+            )
+            users += 1
+            checked += user_checked
+            total_found += len(user_found)
+            found.extend(user_found[:max(0, RECONCILE_MAX_REPORTED - len(found))])
+            if checkpoint is not None and (full or checkpoint != state):
+                states.append({"user_id": user_id, "position_at": checkpoint[0],
+                               "balance_cents": checkpoint[1], "updated_at": now})
+
+    if states:
+        with engine.begin() as conn:
+            _save_states(conn, states)
+    return {"lo": lo, "hi": hi, "users": users, "entries": checked,
+            "discrepancies": total_found, "found": found, "states": len(states)}
+
+
+def _run_chunk(args):
+    # entry point ของ worker process (engine ของ process นั้นเอง)
+    return reconcile_chunk(*args)
+
+
+def run_window(engine=default_engine, full: bool = False) -> Optional[datetime]:
+    """เวลาเริ่มของรอบนี้ (อ่านรายการที่ใหม่กว่าเวลานี้) - None = ตั้งแต่ต้น"""
+    from .migrations import applied_versions
+
+    applied = applied_versions(engine)
+    if LEDGER_MIGRATION not in applied:
+        raise RuntimeError(f"wallet_transactions ยังไม่ถูกสร้าง - รัน migrate.py (version {LEDGER_MIGRATION}) ก่อน")
+    with engine.connect() as conn:
+        if full:
+            # เดือนที่ archive แล้วไม่อยู่ในตาราง plays - เริ่มหลังเดือนล่าสุดที่ archive
+            return conn.execute(select(func.max(PlayArchive.period_end))).scalar()
+        last = conn.execute(
+            select(func.max(ReconcileRun.cutoff)).where(ReconcileRun.finished_at.is_not(None))
+        ).scalar()
+    if last is not None:
+        return last
+    applied_at = applied[LEDGER_MIGRATION]
+    return datetime.fromisoformat(applied_at) if isinstance(applied_at, str) else applied_at
+
+
+def reconcile(engine=default_engine, workers: int = RECONCILE_WORKERS, chunk_users: int = RECONCILE_CHUNK_USERS,
+              grace_s: int = RECONCILE_GRACE_S, full: bool = False,
+              on_found: Optional[Callable[[dict], None]] = None,
+              log: Callable[[str], None] = print) -> dict:
+    """
+    ตรวจผู้ใช้ทุกคนทีละช่วง user id (workers > 1 = process pool) แล้วบันทึกรอบใน reconcile_runs
+    on_found ถูกเรียกกับความผิดปกติแต่ละรายการ (สูงสุด RECONCILE_MAX_REPORTED ต่อช่วง)
+    """
+    started = datetime.utcnow()
+    cutoff = started - timedelta(seconds=grace_s)
+    since = run_window(engine, full)
+    with engine.begin() as conn:
+        run_id = conn.execute(ReconcileRun.__table__.insert().values(
+            started_at=started, since=since, cutoff=cutoff,
+        )).inserted_primary_key[0]
+        first, last = conn.execute(select(func.min(User.id), func.max(User.id))).one()
+
+    log(f"🔎 reconcile run {run_id}: {since.isoformat() if since else 'ตั้งแต่ต้น'} → now "
+        f"(checkpoint ≤ {cutoff.isoformat(timespec='seconds')}), workers={workers}")
+    chunks = [] if first is None else [
+        (lo, min(lo + chunk_users, last + 1), since, cutoff, full)
+        for lo in range(first, last + 1, chunk_users)
+    ]
+    if engine.dialect.name == "sqlite" and workers > 1:
+        with engine.connect() as conn:
+            if conn.exec_driver_sql("PRAGMA journal_mode").scalar().lower() != "wal":
+                # rollback journal: ผู้อ่านที่ค้างอยู่ทำให้ worker อื่นบันทึก checkpoint ไม่ได้
+                log("⚠️  SQLite ไม่ได้ใช้ WAL - ตรวจด้วย worker เดียว")
+                workers = 1
+
+    totals = {"users": 0, "entries": 0, "discrepancies": 0}
+
+    def collect(result: dict):
+        for key in totals:
+            totals[key] += result[key]
+        for found in result["found"]:
+            if on_found:
+                on_found(found)
+        if result["discrepancies"]:
+            log(f"❌ users {result['lo']}-{result['hi'] - 1}: {result['discrepancies']} discrepancies")
+
+    if workers <= 1:
+        for chunk in chunks:
+            collect(reconcile_chunk(*chunk, engine=engine))
+    else:
+        # spawn: worker เปิด engine ของตัวเองจาก DATABASE_URL (connection ข้าม fork ไม่ได้)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            for future in as_completed([pool.submit(_run_chunk, chunk) for chunk in chunks]):
+                collect(future.result())
+
+    with engine.begin() as conn:
+        conn.execute(ReconcileRun.__table__.update().where(ReconcileRun.id == run_id).values(
+            finished_at=datetime.utcnow(), **totals,
+        ))
+    return {"run_id": run_id, "since": since, "cutoff": cutoff, **totals}
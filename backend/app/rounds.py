@@ -0,0 +1,392 @@
+"""
+Shared-round wheel - Game1 แบบหลายคน: ทุกคนเดิมพันในช่วงเวลาเดียวกัน แล้ววงล้อหมุนครั้งเดียวตัดสินทุกเดิมพันของรอบ
+
+- รอบกำหนดจากเวลา: รอบที่ n รับเดิมพันช่วง [n * WHEEL_ROUND_S, (n + 1) * WHEEL_ROUND_S) วินาที (epoch UTC)
+  ทุก worker รู้รอบปัจจุบันเองโดยไม่ต้องประสานกัน แถว wheel_rounds ถูกสร้างตอนมีเดิมพันแรกของรอบ
+- วางเดิมพัน (place_bet): หักเงินทันทีใน transaction เดียวกับ INSERT round_bets และบันทึก ledger "round_bet"
+  (ยอดไม่พอ / loss limit ตรวจเหมือนเล่นเดี่ยว) ผู้ใช้เดิมพันได้ครั้งเดียวต่อรอบ
+  ก่อนรับเดิมพันล็อกแถวรอบแบบ shared (PostgreSQL) / จอง write lock (SQLite) - เดิมพันที่ค้างอยู่ตอนปิดรอบ
+  จึง commit ก่อนการตัดสินเสมอ และเดิมพันที่มาหลังตัดสินแล้วถูกปฏิเสธ ไม่มีเงินค้างในรอบที่ปิดไปแล้ว
+- ตัดสิน (settle_round): worker ที่ UPDATE status จาก betting ได้เป็นผู้ตัดสิน (worker อื่นข้าม)
+  แบบ set-based ไม่วนทีละเดิมพัน:
+    1. INSERT ... SELECT ledger "round_release" ของทุกเดิมพัน (คืนเงินที่กันไว้ก่อนคิดผล)
+    2. INSERT ... SELECT แถว plays (game1) ของทุกเดิมพัน - ยอดก่อน / หลังคำนวณจาก credit ตอนตัดสิน
+    3. UPDATE credit ... FROM round_bets ครั้งเดียวสำหรับผู้ชนะทั้งหมด (+ เดิมพัน × 2)
+    4. upsert user_totals ด้วย INSERT ... SELECT เดียว
+  balance chain (reconcile.py) จึงต่อกัน: round_bet (-bet) ... round_release (+bet) → play (±bet ตามกติกา game1)
+- สถานะรอบและเวลาที่เหลือ push ให้ client ผ่าน Server-Sent Events (/api/wheel/stream):
+  "tick" ทุก WHEEL_TICK_S จาก ticker ของแต่ละ worker, "settled" ส่งผ่าน event bus (bus.py) ให้ทุก worker
+- loss limit นับเดิมพันเป็นยอดเสียตอนวาง เงินที่ได้จากรอบที่ชนะไม่ลดตัวนับ (เข้มกว่า limit จริง ไม่หลวมกว่า)
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from . import limits, rules
+from .bus import event_bus
+from .cache import invalidate_after_commit
+from .models import SessionLocal, Credit, RoundBet, WheelRound, dialect_insert
+from .services import check_amount, record_transaction, unit_of_work
+from .writer import GROUP_COMMIT_ENABLED, write_queue
+
+WHEEL_ROUND_S = int(os.getenv("WHEEL_ROUND_S", "30"))
+WHEEL_TICK_S = float(os.getenv("WHEEL_TICK_S", "1"))
+WHEEL_STREAM_QUEUE = int(os.getenv("WHEEL_STREAM_QUEUE", "100"))
+WHEEL_STREAM_KEEPALIVE_S = float(os.getenv("WHEEL_STREAM_KEEPALIVE_S", "15"))
+WHEEL_HISTORY = 10
+
+WHEEL_CHANNEL = "wheel.settled"
+GAME = "game1"
+COLORS = rules.CHOICE_CODES[GAME]
+COLOR_NAMES = {code: color for color, code in COLORS.items()}
+
+# credit.balance (จำนวนเงิน) → สตางค์ ภายใน SQL
+_BALANCE_CENTS = "CAST(ROUND(c.balance * 100) AS BIGINT)"
+
+
+def round_at(now: float) -> int:
+    return int(now // WHEEL_ROUND_S)
+
+
+def round_times(round_id: int) -> Tuple[datetime, datetime]:
+    """(เปิดรับ, ปิดรับ) ของรอบ (UTC naive เหมือนคอลัมน์เวลาอื่น)"""
+    opens_at = datetime.utcfromtimestamp(round_id * WHEEL_ROUND_S)
+    return opens_at, opens_at + timedelta(seconds=WHEEL_ROUND_S)
+
+
+# ===============================
+# Bets
+# ===============================
+def place_bet(db: Session, user_id: int, bet_amount: float, selected_color: str) -> dict:
+    """วางเดิมพันในรอบปัจจุบันและหักเงิน (ใน transaction ของผู้เรียก - ผ่าน run_write)"""
+    if selected_color not in COLORS:
+        raise HTTPException(status_code=400, detail="Invalid selected color")
+    check_amount(bet_amount, "Bet amount must be positive")
+
+    round_id = round_at(time.time())
+    opens_at, closes_at = round_times(round_id)
+    # สร้างแถวรอบ (ครั้งแรก) - บน SQLite เป็นการจอง write lock ก่อนอ่าน status ด้วย
+    db.execute(dialect_insert(db)(WheelRound.__table__).values(
+        id=round_id, status="betting", opens_at=opens_at, closes_at=closes_at,
+        bets=0, total_bet_cents=0, paid_cents=0,
+    ).on_conflict_do_nothing(index_elements=["id"]))
+    # FOR SHARE: การตัดสิน (UPDATE แถวเดียวกัน) รอเดิมพันนี้ commit ก่อน
+    status = db.query(WheelRound.status).filter(WheelRound.id == round_id).with_for_update(read=True).scalar()
+    if status != "betting":
+        raise HTTPException(status_code=409, detail="Betting is closed for this round")
+    if db.query(RoundBet.id).filter(RoundBet.round_id == round_id, RoundBet.user_id == user_id).first():
+        raise HTTPException(status_code=409, detail="Already placed a bet in this round")
+
+    credit = db.query(Credit).filter(Credit.user_id == user_id).first()
+    if not credit or float(credit.balance) < bet_amount:
+        raise HTTPException(status_code=400, detail="Insufficient balance")
+
+    # loss limit: ถือว่าเสียเดิมพันทั้งก้อนตอนวาง
+    limits.record_bet(db, user_id, bet_amount, -bet_amount)
+    balance_before = credit.balance
+    credit.balance = balance_before - Decimal(str(bet_amount))
+    credit.updated_at = func.now()
+    record_transaction(db, user_id, "round_bet", balance_before, credit.balance)
+
+    bet = RoundBet(round_id=round_id, user_id=user_id, choice=COLORS[selected_color],
+                   bet_cents=rules.to_cents(bet_amount), placed_at=datetime.utcnow())
+    db.add(bet)
+    db.flush()
+    return {
+        "round_id": round_id,
+        "bet_id": bet.id,
+        "selected_color": selected_color,
+        "bet_amount": bet_amount,
+        "balance_after": float(credit.balance),
+        "closes_at": closes_at.isoformat(),
+    }
+
+
+# ===============================
+# Settlement
+# ===============================
+def settle_round(db: Session, round_id: int, result_color: Optional[str] = None) -> Optional[dict]:
+    """
+    หมุนวงล้อและตัดสินทุกเดิมพันของรอบด้วย statement ชุดเดียว (ใน transaction ของผู้เรียก)
+    คืนสรุปของรอบ หรือ None ถ้ารอบนี้ถูกตัดสินไปแล้ว / ไม่มีแถวรอบ
+    """
+    result_color = result_color or rules.spin_wheel()
+    now = datetime.utcnow()
+    params = {
+        "round_id": round_id, "now": now, "game": rules.GAME_CODES[GAME], "result": COLORS[result_color],
+        "win": rules.OUTCOME_CODES["win"], "lose": rules.OUTCOME_CODES["lose"],
+    }
+    # ผู้ตัดสินมีคนเดียว - แถวรอบถูกล็อกจนจบ transaction เดิมพันใหม่ของรอบนี้จึงเข้ามาไม่ได้
+    claimed = db.execute(text(
+        "UPDATE wheel_rounds SET status = 'settled', result = :result, settled_at = :now "
+        "WHERE id = :round_id AND status = 'betting'"
+    ), params).rowcount
+    if not claimed:
+        return None
+
+    won = "b.choice = :result"
+    # 1. คืนเงินที่กันไว้ตอนวาง (ledger) - ยอดก่อนคือ credit ปัจจุบัน
+    db.execute(text(f"""
+        INSERT INTO wallet_transactions (user_id, kind, amount_cents, balance_before_cents, balance_after_cents, created_at)
+        SELECT b.user_id, 'round_release', b.bet_cents, {_BALANCE_CENTS}, {_BALANCE_CENTS} + b.bet_cents, :now
+        FROM round_bets b JOIN credit c ON c.user_id = b.user_id
+        WHERE b.round_id = :round_id
+    """), params)
+    # 2. แถว plays ของทุกเดิมพัน (กติกาเดียวกับ game1 เดี่ยว: ชนะ +bet, แพ้ -bet)
+    db.execute(text(f"""
+        INSERT INTO plays (user_id, game, choice, result, outcome, bet_cents,
+                           balance_before_cents, balance_after_cents, played_at)
+        SELECT b.user_id, :game, b.choice, :result, CASE WHEN {won} THEN :win ELSE :lose END, b.bet_cents,
+               {_BALANCE_CENTS} + b.bet_cents,
+               {_BALANCE_CENTS} + CASE WHEN {won} THEN 2 * b.bet_cents ELSE 0 END,
+               :now
+        FROM round_bets b JOIN credit c ON c.user_id = b.user_id
+        WHERE b.round_id = :round_id
+    """), params)
+    # 3. จ่ายผู้ชนะทั้งหมดใน UPDATE เดียว (ผู้แพ้เสียเงินไปแล้วตอนวาง)
+    db.execute(text(f"""
+        UPDATE credit SET balance = ROUND(credit.balance + b.bet_cents * 2 / 100.0, 2), updated_at = :now
+        FROM round_bets b
+        WHERE b.user_id = credit.user_id AND b.round_id = :round_id AND {won}
+    """), params)
+    # 4. ยอดรวมการเล่นต่อผู้ใช้ (admin user directory) - เหมือน directory.record_play แต่ทั้งรอบ
+    db.execute(text(f"""
+        INSERT INTO user_totals (user_id, plays, wagered_cents, net_cents, last_played_at)
+        SELECT b.user_id, 1, b.bet_cents, CASE WHEN {won} THEN b.bet_cents ELSE -b.bet_cents END, :now
+        FROM round_bets b
+        WHERE b.round_id = :round_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            plays = user_totals.plays + excluded.plays,
+            wagered_cents = user_totals.wagered_cents + excluded.wagered_cents,
+            net_cents = user_totals.net_cents + excluded.net_cents,
+            last_played_at = excluded.last_played_at
+    """), params)
+
+    bets, total_cents, winners, paid_cents = db.execute(text(f"""
+        SELECT COUNT(*), COALESCE(SUM(b.bet_cents), 0),
+               COALESCE(SUM(CASE WHEN {won} THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN {won} THEN 2 * b.bet_cents ELSE 0 END), 0)
+        FROM round_bets b
+        WHERE b.round_id = :round_id
+    """), params).one()
+    # PostgreSQL คืน SUM(bigint) เป็น Decimal - แปลงเป็น int ก่อนส่งต่อเป็น JSON
+    total_cents, winners, paid_cents = int(total_cents), int(winners), int(paid_cents)
+    db.execute(text(
+        "UPDATE wheel_rounds SET bets = :bets, total_bet_cents = :total, paid_cents = :paid WHERE id = :round_id"
+    ), {"bets": bets, "total": total_cents, "paid": paid_cents, "round_id": round_id})
+
+    # cache: ยอดเงิน (ผู้ชนะ) และประวัติ / สถิติ game1 (ทุกคน) เปลี่ยนหลัง commit
+    tags = []
+    for user_id, choice in db.execute(text("SELECT user_id, choice FROM round_bets WHERE round_id = :round_id"),
+                                      params):
+        tags.append(f"{GAME}:{user_id}")
+        if choice == params["result"]:
+            tags.append(f"credit:{user_id}")
+    invalidate_after_commit(db, *tags)
+
+    return {
+        "round_id": round_id,
+        "result_color": result_color,
+        "bets": bets,
+        "winners": winners,
+        "total_bet": total_cents / 100,
+        "paid": paid_cents / 100,
+        "settled_at": now.isoformat(),
+    }
+
+
+def overdue_rounds(db: Session, now: Optional[float] = None) -> List[int]:
+    """รอบที่ปิดรับแล้วแต่ยังไม่ถูกตัดสิน (รวมรอบที่ค้างตอน server ดับ)"""
+    closed = datetime.utcfromtimestamp(now if now is not None else time.time())
+    return [row[0] for row in db.query(WheelRound.id).filter(
+        WheelRound.status == "betting", WheelRound.closes_at <= closed,
+    ).order_by(WheelRound.id)]
+
+
+def _due_rounds(now: Optional[float]) -> List[int]:
+    with SessionLocal() as db:
+        return overdue_rounds(db, now)
+
+
+def _settle_now(round_id: int) -> Optional[dict]:
+    with unit_of_work() as db:
+        return settle_round(db, round_id)
+
+
+async def settle_due(now: Optional[float] = None) -> List[dict]:
+    """ตัดสินทุกรอบที่ถึงเวลา (ผ่าน writer thread ถ้าเปิด group commit) แล้วประกาศผลผ่าน event bus"""
+    due = await asyncio.to_thread(_due_rounds, now)
+    settled = []
+    for round_id in due:
+        if GROUP_COMMIT_ENABLED:
+            summary = await write_queue.run(lambda db, round_id=round_id: settle_round(db, round_id))
+        else:
+            summary = await asyncio.to_thread(_settle_now, round_id)
+        if summary:
+            print(f"🎡 Wheel round {round_id} settled: {summary['result_color']}, "
+                  f"{summary['winners']}/{summary['bets']} winners, paid {summary['paid']:.2f}")
+            event_bus.publish(WHEEL_CHANNEL, summary)
+            settled.append(summary)
+    return settled
+
+
+# ===============================
+# Round state (อ่าน)
+# ===============================
+def _round_summary(row: WheelRound) -> dict:
+    return {
+        "round_id": row.id,
+        "result_color": COLOR_NAMES.get(row.result),
+        "bets": row.bets,
+        "total_bet": row.total_bet_cents / 100,
+        "paid": row.paid_cents / 100,
+        "settled_at": row.settled_at.isoformat() if row.settled_at else None,
+    }
+
+
+def round_state(db: Session, now: Optional[float] = None) -> dict:
+    """รอบปัจจุบัน: เวลาที่เหลือ + จำนวนเดิมพันและยอดรวมถึงตอนนี้"""
+    now = time.time() if now is None else now
+    round_id = round_at(now)
+    opens_at, closes_at = round_times(round_id)
+    bets, total_cents = db.query(func.count(RoundBet.id), func.coalesce(func.sum(RoundBet.bet_cents), 0)) \
+        .filter(RoundBet.round_id == round_id).one()
+    total_cents = int(total_cents)
+    return {
+        "round_id": round_id,
+        "status": "betting",
+        "opens_at": opens_at.isoformat(),
+        "closes_at": closes_at.isoformat(),
+        "seconds_left": round((round_id + 1) * WHEEL_ROUND_S - now, 1),
+        "bets": bets,
+        "total_bet": total_cents / 100,
+        "server_time": datetime.utcfromtimestamp(now).isoformat(),
+    }
+
+
+def recent_rounds(db: Session, limit: int = WHEEL_HISTORY) -> List[dict]:
+    rows = db.query(WheelRound).filter(WheelRound.status == "settled") \
+        .order_by(WheelRound.id.desc()).limit(limit).all()
+    return [_round_summary(row) for row in rows]
+
+
+def user_bets(db: Session, user_id: int, limit: int = WHEEL_HISTORY) -> List[dict]:
+    """เดิมพันล่าสุดของผู้ใช้ พร้อมผล (รอบที่ยังไม่ตัดสิน won = None)"""
+    rows = db.query(RoundBet, WheelRound).join(WheelRound, WheelRound.id == RoundBet.round_id) \
+        .filter(RoundBet.user_id == user_id).order_by(RoundBet.round_id.desc()).limit(limit).all()
+    return [{
+        "round_id": bet.round_id,
+        "selected_color": COLOR_NAMES.get(bet.choice),
+        "bet_amount": bet.bet_cents / 100,
+        "result_color": COLOR_NAMES.get(wheel.result),
+        "won": None if wheel.result is None else bet.choice == wheel.result,
+        "placed_at": bet.placed_at.isoformat(),
+    } for bet, wheel in rows]
+
+
+# ===============================
+# Push (Server-Sent Events)
+# ===============================
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class RoundHub:
+    """
+    ผู้ฟัง SSE ของ worker นี้ + ticker ที่ตัดสินรอบที่ถึงเวลาและส่ง tick ทุก WHEEL_TICK_S
+    client แต่ละตัวมีคิวของตัวเอง (ยาวไม่เกิน WHEEL_STREAM_QUEUE) client ที่อ่านไม่ทันถูกตัด - EventSource ต่อใหม่เอง
+    """
+
+    def __init__(self):
+        self._clients: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def start(self):
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        # ผลของรอบจาก worker ที่ตัดสิน (รวมตัวเอง - publish เรียก subscriber ใน process ทันที)
+        event_bus.subscribe(WHEEL_CHANNEL, lambda data: self.broadcast("settled", data), loop=loop)
+        self._task = loop.create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for queue in list(self._clients):
+            self._close(queue)
+
+    def connect(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=WHEEL_STREAM_QUEUE)
+        self._clients.add(queue)
+        return queue
+
+    def disconnect(self, queue: asyncio.Queue):
+        self._clients.discard(queue)
+
+    def _close(self, queue: asyncio.Queue):
+        # ล้างคิวแล้วใส่ None ให้ stream ของ client นั้นจบ
+        self._clients.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def broadcast(self, event: str, data: dict):
+        for queue in list(self._clients):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                self.dropped += 1
+                self._close(queue)
+
+    def stats(self) -> dict:
+        return {"clients": len(self._clients), "dropped": self.dropped}
+
+    async def stream(self):
+        """SSE ของ client หนึ่งตัว: สถานะรอบปัจจุบันก่อน แล้วตาม tick / settled (ส่ง keep-alive เมื่อเงียบ)"""
+        queue = self.connect()
+        try:
+            yield sse("tick", await asyncio.to_thread(_current_state))
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=WHEEL_STREAM_KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    return
+                yield sse(*item)
+        finally:
+            self.disconnect(queue)
+
+    async def _run(self):
+        while True:
+            try:
+                await settle_due()
+                if self._clients:
+                    self.broadcast("tick", await asyncio.to_thread(_current_state))
+            except Exception as e:
+                print(f"❌ Wheel ticker error: {e}")
+            await asyncio.sleep(WHEEL_TICK_S - time.time() % WHEEL_TICK_S)
+
+
+def _current_state() -> dict:
+    with SessionLocal() as db:
+        return round_state(db)
+
+
+round_hub = RoundHub()
@@ -0,0 +1,100 @@
+"""
+Game rules - กติกาและอัตราจ่ายของทุกเกม (ใช้ร่วมกันระหว่าง API และ simulate_rtp.py)
+
+ผลแต่ละแบบ (Outcome) มีตัวคูณ 2 ตัวต่อเงินเดิมพัน:
+- balance: เงินที่ยอดคงเหลือเปลี่ยนจริง (+1 = ได้เท่าที่เดิมพัน)
+- recorded: ค่าที่บันทึกลง win_loss_amount ของแต่ละตา
+
+Game1 (วงล้อสี): ชนะได้ 1:1 ทั้งยอดเงินและที่บันทึก
+Game2 (เป่ายิ้งฉุบ): ชนะยอดเงิน +bet แต่บันทึก win_loss_amount เป็น bet * 2 (พฤติกรรมเดิมของ API),
+เสมอคืนเงินเดิมพัน
+"""
+
+import random
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, NamedTuple, Tuple
+
+
+class Outcome(NamedTuple):
+    balance: int     # ตัวคูณการเปลี่ยนแปลงของยอดเงิน
+    recorded: int    # ตัวคูณของ win_loss_amount ที่บันทึก
+
+
+# ===============================
+# Game1 - วงล้อสี
+# ===============================
+WHEEL_WEIGHTS: Dict[str, float] = {"blue": 0.5, "white": 0.5}
+WHEEL_OUTCOMES: Dict[str, Outcome] = {
+    "win": Outcome(balance=1, recorded=1),
+    "lose": Outcome(balance=-1, recorded=-1),
+}
+
+
+def spin_wheel(rng=random) -> str:
+    return rng.choices(list(WHEEL_WEIGHTS), weights=list(WHEEL_WEIGHTS.values()))[0]
+
+
+def wheel_outcome(selected_color: str, result_color: str) -> str:
+    return "win" if selected_color == result_color else "lose"
+
+
+# ===============================
+# Game2 - Rock Paper Scissors
+# ===============================
+RPS_CHOICES = ("rock", "paper", "scissors")
+RPS_BEATS: Dict[str, str] = {"rock": "scissors", "paper": "rock", "scissors": "paper"}
+# บอทเลือกแบบสุ่มเท่ากัน (frontend สุ่มให้)
+RPS_BOT_WEIGHTS: Dict[str, float] = {choice: 1 / 3 for choice in RPS_CHOICES}
+RPS_OUTCOMES: Dict[str, Outcome] = {
+    "win": Outcome(balance=1, recorded=2),
+    "lose": Outcome(balance=-1, recorded=-1),
+    "tie": Outcome(balance=0, recorded=0),
+}
+
+
+def rps_outcome(player_choice: str, bot_choice: str) -> str:
+    if player_choice == bot_choice:
+        return "tie"
+    return "win" if RPS_BEATS[player_choice] == bot_choice else "lose"
+
+
+# ===============================
+# Settlement / probabilities
+# ===============================
+GAMES = {
+    "game1": (WHEEL_OUTCOMES, WHEEL_WEIGHTS, wheel_outcome),
+    "game2": (RPS_OUTCOMES, RPS_BOT_WEIGHTS, rps_outcome),
+}
+
+
+def settle(outcomes: Dict[str, Outcome], outcome: str, bet_amount: float) -> Tuple[float, float]:
+    """คืน (การเปลี่ยนแปลงยอดเงิน, win_loss_amount ที่บันทึก) ของเดิมพันหนึ่งตา"""
+    rule = outcomes[outcome]
+    return bet_amount * rule.balance, bet_amount * rule.recorded
+
+
+def to_cents(amount) -> int:
+    """จำนวนเงิน → สตางค์ (fixed-point ที่เก็บในตาราง plays)"""
+    return int((Decimal(str(amount)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def outcome_probabilities(game: str, choice: str) -> Dict[str, float]:
+    """ความน่าจะเป็นของแต่ละผลเมื่อผู้เล่นเลือก choice (ไล่ทุกผลของวงล้อ / ทุกตัวเลือกของบอท)"""
+    outcomes, weights, decide = GAMES[game]
+    total = sum(weights.values())
+    probabilities = {name: 0.0 for name in outcomes}
+    for other, weight in weights.items():
+        probabilities[decide(choice, other)] += weight / total
+    return probabilities
+
+
+# ===============================
+# Encodings ของตาราง plays (เลขเล็ก ๆ แทนข้อความ - ห้ามเปลี่ยนค่าเดิม เพิ่มได้อย่างเดียว)
+# ===============================
+GAME_CODES: Dict[str, int] = {"game1": 1, "game2": 2}
+# ตัวเลือกของผู้เล่น / ผลฝั่งเกม (สีที่วงล้อออก, ตัวเลือกของบอท) ใช้ชุดรหัสเดียวกันต่อเกม
+CHOICE_CODES: Dict[str, Dict[str, int]] = {
+    "game1": {"blue": 1, "white": 2},
+    "game2": {"rock": 1, "paper": 2, "scissors": 3},
+}
+OUTCOME_CODES: Dict[str, int] = {"lose": 0, "win": 1, "tie": 2}
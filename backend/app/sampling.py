@@ -0,0 +1,237 @@
+"""
+On-demand sampling profiler - profile request ที่มีปัญหาบน production ได้โดยไม่ต้อง attach profiler
+
+วิธีใช้ (Admin เท่านั้น):
+  - POST /api/admin/profiler/arm {"path": "/api/game1/play", "count": 5, "memory": false}
+    -> profile 5 request ถัดไปที่เข้า path นั้น
+  - ส่ง header "X-Profile-Request: 1" (และ "X-Profile-Memory: 1" ถ้าต้องการ tracemalloc)
+    -> profile เฉพาะ request นั้น
+
+ผลลัพธ์ถูกเขียนลง PROFILE_OUTPUT_DIR:
+  - <id>.collapsed          collapsed stacks (เปิดด้วย speedscope หรือ flamegraph.pl ได้เลย)
+  - <id>.tracemalloc        snapshot ดิบของ tracemalloc (ถ้าเปิด memory)
+  - <id>.tracemalloc.txt    top allocations แบบอ่านง่าย
+
+มีการจำกัด: profile ได้ทีละ request, เว้นระยะอย่างน้อย PROFILE_MIN_INTERVAL_S
+และไม่เกิน PROFILE_MAX_PER_HOUR ครั้งต่อชั่วโมง
+"""
+
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "./profiles")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_MIN_INTERVAL_S = float(os.getenv("PROFILE_MIN_INTERVAL_S", "10"))
+PROFILE_MAX_PER_HOUR = int(os.getenv("PROFILE_MAX_PER_HOUR", "30"))
+PROFILE_MAX_ARM_COUNT = int(os.getenv("PROFILE_MAX_ARM_COUNT", "20"))
+
+PROFILE_REQUEST_HEADER = "x-profile-request"
+PROFILE_MEMORY_HEADER = "x-profile-memory"
+
+# frame บนสุดที่อยู่ในไฟล์เหล่านี้ถือว่า thread กำลังรอ (idle) ไม่นับเป็น sample
+_IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+
+
+class StackSampler:
+    """thread ที่คอยเก็บ stack ของทุก thread ทุก ๆ interval แล้วนับเป็น collapsed stacks"""
+
+    def __init__(self, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me or os.path.basename(frame.f_code.co_filename) in _IDLE_MODULES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.counts[";".join(s.replace(";", ":") for s in reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfilerControl:
+    """เก็บสถานะว่า route ไหนถูก arm ไว้ และบังคับใช้ rate limit ของการ profile"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+        self.armed: Dict[str, Dict] = {}
+        self.history: deque = deque()
+        self.last_finished_at = 0.0
+
+    def arm(self, path: str, count: int, memory: bool = False) -> Dict:
+        if count <= 0 or count > PROFILE_MAX_ARM_COUNT:
+            raise ValueError(f"count must be between 1 and {PROFILE_MAX_ARM_COUNT}")
+        with self._lock:
+            self.armed[path] = {"remaining": count, "memory": memory}
+            return dict(self.armed[path], path=path)
+
+    def disarm(self, path: str):
+        with self._lock:
+            self.armed.pop(path, None)
+
+    def status(self) -> Dict:
+        with self._lock:
+            self._expire_history()
+            return {
+                "armed": [dict(v, path=k) for k, v in self.armed.items()],
+                "runs_last_hour": len(self.history),
+                "max_per_hour": PROFILE_MAX_PER_HOUR,
+                "min_interval_s": PROFILE_MIN_INTERVAL_S,
+                "running": self._running.locked(),
+                "output_dir": os.path.abspath(PROFILE_OUTPUT_DIR),
+            }
+
+    def _expire_history(self):
+        cutoff = time.monotonic() - 3600
+        while self.history and self.history[0] < cutoff:
+            self.history.popleft()
+
+    def claim(self, path: str, forced: Optional[bool]) -> Optional[bool]:
+        """
+        ตัดสินว่า request นี้จะถูก profile หรือไม่
+        forced: None = ไม่ได้ขอผ่าน header, True/False = ขอผ่าน header (ค่าคือ memory)
+        คืนค่า memory flag ถ้าได้ profile, None ถ้าไม่ได้
+        """
+        with self._lock:
+            armed = self.armed.get(path)
+            if forced is None and armed is None:
+                return None
+            now = time.monotonic()
+            self._expire_history()
+            if len(self.history) >= PROFILE_MAX_PER_HOUR:
+                return None
+            if now - self.last_finished_at < PROFILE_MIN_INTERVAL_S:
+                return None
+            if not self._running.acquire(blocking=False):
+                return None
+            self.history.append(now)
+            if forced is not None:
+                return forced
+            armed["remaining"] -= 1
+            if armed["remaining"] <= 0:
+                del self.armed[path]
+            return armed["memory"]
+
+    def release(self):
+        with self._lock:
+            self.last_finished_at = time.monotonic()
+            self._running.release()
+
+
+profiler_control = ProfilerControl()
+
+
+def _profile_id(method: str, path: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}_{method}_{slug}"
+
+
+def _write_tracemalloc(snapshot, base: str):
+    snapshot.dump(base + ".tracemalloc")
+    with open(base + ".tracemalloc.txt", "w", encoding="utf-8") as f:
+        for stat in snapshot.statistics("lineno")[:50]:
+            f.write(f"{stat}\n")
+
+
+class SamplingProfilerMiddleware:
+    """
+    ASGI middleware ที่เปิด StackSampler (และ tracemalloc) รอบ request ที่ถูกเลือก
+
+    is_admin: ฟังก์ชันรับ Request แล้วคืน True ถ้าเป็น admin
+    """
+
+    def __init__(self, app, is_admin: Callable[[Request], bool], control: ProfilerControl = profiler_control):
+        self.app = app
+        self.is_admin = is_admin
+        self.control = control
+
+    def _forced(self, scope) -> Optional[bool]:
+        request = Request(scope)
+        if request.headers.get(PROFILE_REQUEST_HEADER) != "1" or not self.is_admin(request):
+            return None
+        return request.headers.get(PROFILE_MEMORY_HEADER) == "1"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        memory = self.control.claim(scope["path"], self._forced(scope))
+        if memory is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = _profile_id(scope["method"], scope["path"])
+        started_tracemalloc = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            started_tracemalloc = True
+        sampler = StackSampler()
+        sampler.start()
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            # join ของ sampler, snapshot และการเขียนไฟล์ใช้เวลา - ทำใน thread ไม่ให้ request อื่นใน event loop ค้าง
+            await asyncio.to_thread(self._finish, sampler, profile_id, memory, started_tracemalloc)
+
+    def _finish(self, sampler: StackSampler, profile_id: str, memory: bool, started_tracemalloc: bool):
+        """หยุด sampler / tracemalloc แล้วเขียนผล - ปล่อย slot เสมอแม้ request ถูก cancel ระหว่างรอ"""
+        try:
+            sampler.stop()
+            snapshot = tracemalloc.take_snapshot() if memory and tracemalloc.is_tracing() else None
+            if started_tracemalloc:
+                tracemalloc.stop()
+            os.makedirs(PROFILE_OUTPUT_DIR, exist_ok=True)
+            base = os.path.join(PROFILE_OUTPUT_DIR, profile_id)
+            sampler.write_collapsed(base + ".collapsed")
+            if snapshot is not None:
+                _write_tracemalloc(snapshot, base)
+            print(f"🔥 Profile written: {base}.collapsed ({sampler.samples} samples)")
+        except OSError as e:
+            print(f"❌ Error writing profile {profile_id}: {e}")
+        finally:
+            self.control.release()
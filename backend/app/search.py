@@ -0,0 +1,295 @@
+"""
+Full-text search ของ reports (admin) - ranking, snippet ที่ highlight แล้ว, filter และ keyset pagination
+
+- SQLite: FTS5 แบบ external content (reports_fts อ้าง rowid = reports.id) + trigger insert / update / delete
+  ใช้ tokenizer trigram เพราะภาษาไทยไม่เว้นวรรคระหว่างคำ (ค้นด้วย substring ได้ทุกภาษา)
+  คำที่สั้นกว่า 3 ตัวอักษร index trigram ใช้ไม่ได้ จึงกรองด้วย LIKE บนแถวที่ผ่าน MATCH แล้วแทน
+  score = -bm25 (title หนักกว่า description 10 เท่า)
+- PostgreSQL: คอลัมน์ search_vector (tsvector, GENERATED ... STORED จึง sync เองทุก insert / update) + GIN index
+  config 'simple' (ไม่มี stemming ภาษาไทย) - score = ts_rank_cd, snippet = ts_headline
+  แทน < > ด้วยช่องว่างก่อน index ไม่อย่างนั้น parser มองข้อความอย่าง <script> เป็น HTML tag แล้วทิ้งไป
+- เรียงตาม score มากไปน้อยแล้ว id - cursor = (score, id) ของแถวสุดท้าย (ไม่ใช้ OFFSET)
+  snippet คำนวณเฉพาะแถวในหน้านั้น
+- ไม่มีคำค้น: แสดงรายการตาม filter เรียง id ล่าสุดก่อน (cursor = id)
+"""
+
+import base64
+import html
+import json
+import re
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+REPORT_CATEGORIES = ("technical", "payment", "account", "betting", "suggestion", "other")
+REPORT_STATUSES = ("pending", "reviewing", "resolved", "closed")
+
+SEARCH_MAX_LIMIT = 100
+TRIGRAM_MIN_CHARS = 3
+# tsvector มีขนาดจำกัด (1MB) - index / headline เฉพาะส่วนต้นของ description ที่ยาวมาก
+PG_INDEXED_CHARS = 100_000
+TITLE_WEIGHT, DESCRIPTION_WEIGHT = 10.0, 1.0
+
+# ตัวคั่นชั่วคราวของ highlight (escape HTML แล้วค่อยแทนด้วย <mark>)
+_OPEN, _CLOSE = "\ue000", "\ue001"
+# < > ที่ส่งให้ ts_headline (ไม่ให้ parser ตีความเป็น tag แล้วตัดทิ้งจาก snippet) - แปลงกลับใน _mark
+_LT, _GT = "\ue002", "\ue003"
+
+
+# ===============================
+# Schema (migration 8 / create_db)
+# ===============================
+def create_report_search(conn, concurrently: bool = False):
+    """สร้าง index ค้นหา (รันซ้ำได้) - concurrently=True ต้องรันแบบ autocommit (PostgreSQL)"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"""
+            ALTER TABLE reports ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', translate(coalesce(title, ''), '<>', '  ')), 'A') ||
+                setweight(to_tsvector('simple', translate(left(coalesce(description, ''), {PG_INDEXED_CHARS}), '<>', '  ')), 'B')
+            ) STORED
+        """))
+        option = "CONCURRENTLY " if concurrently else ""
+        conn.execute(text(f"CREATE INDEX {option}IF NOT EXISTS idx_reports_search ON reports USING GIN (search_vector)"))
+    else:
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'reports_fts'")).first()
+        conn.execute(text("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+                title, description, content='reports', content_rowid='id', tokenize='trigram'
+            )
+        """))
+        conn.execute(text("""
+            CREATE TRIGGER IF NOT EXISTS reports_fts_insert AFTER INSERT ON reports BEGIN
+                INSERT INTO reports_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+            END
+        """))
+        conn.execute(text("""
+            CREATE TRIGGER IF NOT EXISTS reports_fts_delete AFTER DELETE ON reports BEGIN
+                INSERT INTO reports_fts (reports_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+        """))
+        # เปลี่ยน status / category ไม่ต้องแตะ index
+        conn.execute(text("""
+            CREATE TRIGGER IF NOT EXISTS reports_fts_update AFTER UPDATE OF title, description ON reports BEGIN
+                INSERT INTO reports_fts (reports_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO reports_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+            END
+        """))
+        if not exists:
+            # index reports ที่มีอยู่ก่อนแล้ว
+            conn.execute(text("INSERT INTO reports_fts (reports_fts) VALUES ('rebuild')"))
+    # รายการแบบไม่มีคำค้น: filter ตาม status / category แล้วเรียง id
+    option = "CONCURRENTLY " if concurrently and conn.dialect.name == "postgresql" else ""
+    conn.execute(text(f"CREATE INDEX {option}IF NOT EXISTS idx_reports_status_id ON reports (status, id)"))
+    conn.execute(text(f"CREATE INDEX {option}IF NOT EXISTS idx_reports_category_id ON reports (category, id)"))
+
+
+# ===============================
+# Cursors
+# ===============================
+def encode_cursor(values: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def cursor_values(cursor: str) -> dict:
+    """dict ที่ encode_cursor เข้ารหัสไว้ - cursor เสีย → ValueError"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[dict]:
+    if not cursor:
+        return None
+    values = cursor_values(cursor)
+    try:
+        return {"id": int(values["id"]), **({"score": float(values["score"])} if "score" in values else {})}
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+# ===============================
+# Search
+# ===============================
+def _choices(values: Optional[Iterable[str]], allowed: Sequence[str], name: str) -> List[str]:
+    values = [value for value in (values or ()) if value]
+    invalid = [value for value in values if value not in allowed]
+    if invalid:
+        raise ValueError(f"Invalid {name}: {', '.join(invalid)}")
+    return values
+
+
+def _mark(fragment: Optional[str]) -> Optional[str]:
+    if fragment is None:
+        return None
+    return html.escape(fragment.replace(_LT, "<").replace(_GT, ">")).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+def _terms(q: str) -> List[str]:
+    return [term.replace('"', "") for term in re.split(r"\s+", q.strip()) if term.replace('"', "")]
+
+
+def search_reports(db: Session, q: str = "", categories: Optional[Iterable[str]] = None,
+                   statuses: Optional[Iterable[str]] = None, limit: int = 20, cursor: Optional[str] = None) -> dict:
+    categories = _choices(categories, REPORT_CATEGORIES, "category")
+    statuses = _choices(statuses, REPORT_STATUSES, "status")
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    after = decode_cursor(cursor)
+    terms = _terms(q or "")
+    dialect = db.get_bind().dialect.name
+
+    params = {"limit": limit + 1}
+    filters = []
+    if categories:
+        filters.append("r.category IN :categories")
+        params["categories"] = categories
+    if statuses:
+        filters.append("r.status IN :statuses")
+        params["statuses"] = statuses
+
+    if not terms:
+        ranked = _list_page(filters, params, after)
+    elif dialect == "postgresql":
+        ranked = _pg_page(terms, filters, params, after)
+    else:
+        ranked = _sqlite_page(terms, filters, params, after)
+
+    statement = text(ranked)
+    for name in ("categories", "statuses"):
+        if name in params:
+            statement = statement.bindparams(bindparam(name, expanding=True))
+    rows = db.execute(statement, params).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    snippets = _snippets(db, dialect, terms, [row.id for row in rows]) if terms and rows else {}
+    results = []
+    for row in rows:
+        title, snippet = snippets.get(row.id, (None, None))
+        results.append({
+            "id": row.id,
+            "title": row.title,
+            "title_highlight": _mark(title) if title is not None else html.escape(row.title),
+            "snippet": _mark(snippet) if snippet is not None else html.escape((row.description or "")[:200]),
+            "category": row.category,
+            "status": row.status,
+            "user_email": row.user_email,
+            "user_name": row.user_name,
+            "created_at": row.created_at.isoformat() if hasattr(row.created_at, "isoformat") else row.created_at,
+            "score": round(row.score, 6) if terms else None,
+        })
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor({"score": last.score, "id": last.id} if terms else {"id": last.id})
+    return {"results": results, "next_cursor": next_cursor, "count": len(results)}
+
+
+_PAGE_COLUMNS = "r.id, r.title, r.description, r.category, r.status, r.created_at, u.email AS user_email, u.full_name AS user_name"
+
+
+def _where(filters: List[str]) -> str:
+    return " AND ".join(filters) if filters else "1 = 1"
+
+
+def _list_page(filters, params, after) -> str:
+    filters = list(filters)
+    if after:
+        filters.append("r.id < :after_id")
+        params["after_id"] = after["id"]
+    return f"""
+        SELECT {_PAGE_COLUMNS}, 0 AS score
+        FROM reports r JOIN users u ON u.id = r.user_id
+        WHERE {_where(filters)}
+        ORDER BY r.id DESC
+        LIMIT :limit
+    """
+
+
+def _keyset(after, params) -> str:
+    if not after or "score" not in after:
+        return "1 = 1"
+    params["after_score"], params["after_id"] = after["score"], after["id"]
+    return "(score < :after_score OR (score = :after_score AND id < :after_id))"
+
+
+def _sqlite_page(terms, filters, params, after) -> str:
+    filters = list(filters)
+    # ทุกคำต้องพบ (AND): คำยาว ≥ 3 ตัวอักษรใช้ FTS, คำสั้นกรองด้วย LIKE บนแถวที่เหลือ
+    long_terms = [term for term in terms if len(term) >= TRIGRAM_MIN_CHARS]
+    for index, term in enumerate(term for term in terms if len(term) < TRIGRAM_MIN_CHARS):
+        filters.append(f"(r.title LIKE :short{index} OR r.description LIKE :short{index})")
+        params[f"short{index}"] = f"%{term}%"
+    if long_terms:
+        params["match"] = " ".join(f'"{term}"' for term in long_terms)
+        source = f"""
+            SELECT {_PAGE_COLUMNS}, -bm25(reports_fts, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score
+            FROM reports_fts
+            JOIN reports r ON r.id = reports_fts.rowid
+            JOIN users u ON u.id = r.user_id
+            WHERE reports_fts MATCH :match AND {_where(filters)}
+        """
+    else:
+        source = f"""
+            SELECT {_PAGE_COLUMNS}, 0.0 AS score
+            FROM reports r JOIN users u ON u.id = r.user_id
+            WHERE {_where(filters)}
+        """
+    return f"""
+        SELECT * FROM ({source}) ranked
+        WHERE {_keyset(after, params)}
+        ORDER BY score DESC, id DESC
+        LIMIT :limit
+    """
+
+
+def _pg_page(terms, filters, params, after) -> str:
+    params["query"] = " ".join(terms)
+    return f"""
+        SELECT * FROM (
+            SELECT {_PAGE_COLUMNS}, ts_rank_cd(r.search_vector, query)::float8 AS score
+            FROM reports r
+            JOIN users u ON u.id = r.user_id,
+                 websearch_to_tsquery('simple', :query) query
+            WHERE r.search_vector @@ query AND {_where(filters)}
+        ) ranked
+        WHERE {_keyset(after, params)}
+        ORDER BY score DESC, id DESC
+        LIMIT :limit
+    """
+
+
+def _snippets(db: Session, dialect: str, terms: List[str], ids: List[int]) -> dict:
+    """(title ที่ highlight แล้ว, snippet ของ description) เฉพาะแถวในหน้านี้"""
+    if dialect == "postgresql":
+        options = f"StartSel={_OPEN}, StopSel={_CLOSE}, MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=\" … \""
+        statement = text(f"""
+            SELECT r.id,
+                   ts_headline('simple', translate(r.title, '<>', :angles), query, 'HighlightAll=true, StartSel={_OPEN}, StopSel={_CLOSE}'),
+                   ts_headline('simple', translate(left(r.description, {PG_INDEXED_CHARS}), '<>', :angles), query, :options)
+            FROM reports r, websearch_to_tsquery('simple', :query) query
+            WHERE r.id IN :ids
+        """).bindparams(bindparam("ids", expanding=True))
+        rows = db.execute(statement, {"query": " ".join(terms), "options": options, "angles": _LT + _GT, "ids": ids})
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    long_terms = [term for term in terms if len(term) >= TRIGRAM_MIN_CHARS]
+    if not long_terms:
+        return {}
+    statement = text(f"""
+        SELECT rowid,
+               highlight(reports_fts, 0, '{_OPEN}', '{_CLOSE}'),
+               snippet(reports_fts, 1, '{_OPEN}', '{_CLOSE}', '…', 24)
+        FROM reports_fts
+        WHERE reports_fts MATCH :match AND rowid IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    rows = db.execute(statement, {"match": " ".join(f'"{term}"' for term in long_terms), "ids": ids})
+    return {row[0]: (row[1], row[2]) for row in rows}
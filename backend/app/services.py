@@ -0,0 +1,484 @@
+"""
+Service layer - wallet / game1 / game2 / stats / reports ที่ API (main.py) และ CLI ใช้ร่วมกัน
+
+- ทุกฟังก์ชันรับ db: Session ของผู้เรียก ไม่สร้าง engine หรือถือ session ไว้เอง
+  API: ฟังก์ชันที่เขียนรันใน run_write (writer.py - commit / group commit ให้), ฟังก์ชันอ่านใช้ session ของ request
+  CLI: with unit_of_work() as db: ... - session ใหม่จาก engine ของ models.py ต่อหนึ่งงาน
+  commit เมื่อสำเร็จ rollback เมื่อ error แล้วคืน connection ให้ pool ทันที (ไม่มี pool ซ้ำหรือ connection ค้าง)
+- ข้อมูลไม่ถูกต้อง / ยอดเงินไม่พอ → HTTPException แบบเดียวกับ limits.py และ triage.py
+- สถิติ = view game1 / game2 (ตาราง plays) ส่วนที่ยังไม่ archive + game1_stats / game2_stats
+  (สรุปของเดือนที่ archive แล้ว ดู partitions.roll_up_archive) - ตอนเล่นไม่เขียนตาราง stats
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session, contains_eager
+
+from . import limits, rules, triage
+from .bus import event_bus
+from .cache import install_invalidation_hooks
+from .directory import record_play
+from .models import SessionLocal, Credit, Game1, Game2, PlayArchive, Report, User, WalletTransaction
+from .partitions import hot_floor, lifetime_stats, play_history
+from .plays import new_play
+from .search import REPORT_CATEGORIES
+
+
+@contextmanager
+def unit_of_work(session_factory=SessionLocal):
+    """
+    session หนึ่งงาน (CLI / สคริปต์): commit ถ้าสำเร็จ rollback ถ้า error แล้วปิด session เสมอ
+    commit แล้ว invalidate cache ของทุก uvicorn worker ผ่าน event bus เหมือนการเขียนผ่าน API
+    """
+    install_invalidation_hooks()
+    event_bus.start_publisher()
+    db = session_factory()
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _isoformat(value) -> Optional[str]:
+    # raw SQL บน SQLite คืน MIN/MAX ของ DateTime เป็น string, PostgreSQL คืน datetime
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value).replace(" ", "T")
+
+
+def _datetime(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def check_amount(amount: float, message: str):
+    """
+    จำนวนเงินต้อง > 0 และละเอียดไม่เกินสตางค์ (เก็บเป็นสตางค์ / NUMERIC(…, 2)) ไม่งั้น 400
+    เช่น 0.001 ปัดเป็น 0 สตางค์แล้วชน CHECK ของ plays / round_bets หรือยอดที่ตอบไม่ตรงกับยอดที่เก็บ
+    """
+    if amount <= 0:
+        raise HTTPException(status_code=400, detail=message)
+    if Decimal(str(amount)) != Decimal(rules.to_cents(amount)) / 100:
+        raise HTTPException(status_code=400, detail="Amount must not have more than 2 decimal places")
+
+
+# ===============================
+# Users / Wallet
+# ===============================
+def user_by_email(db: Session, email: str) -> User:
+    user = db.query(User).filter(func.lower(User.email) == email.lower()).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+def record_transaction(db: Session, user_id: int, kind: str, balance_before, balance_after):
+    """บันทึกการเปลี่ยนยอดที่ไม่ใช่ตาเล่นลง wallet_transactions (ให้ reconcile.py ต่อ balance chain ได้)"""
+    before_cents, after_cents = rules.to_cents(balance_before), rules.to_cents(balance_after)
+    db.add(WalletTransaction(user_id=user_id, kind=kind, amount_cents=after_cents - before_cents,
+                             balance_before_cents=before_cents, balance_after_cents=after_cents,
+                             created_at=datetime.utcnow()))
+
+
+def deposit(db: Session, user_id: int, amount: float) -> Tuple[float, float]:
+    """เพิ่มยอดเงิน (ตรวจ deposit limit ใน transaction เดียวกัน) คืน (ยอดก่อน, ยอดหลัง)"""
+    check_amount(amount, "Amount must be greater than 0")
+    credit = db.query(Credit).filter(Credit.user_id == user_id).first()
+    if not credit:
+        credit = Credit(user_id=user_id, balance=Decimal('0.00'))
+        db.add(credit)
+
+    # deposit limit ตรวจและบันทึกใน transaction เดียวกับการเพิ่มยอดเงิน
+    limits.record_deposit(db, user_id, amount)
+
+    old_balance = float(credit.balance or 0)
+    credit.balance = (credit.balance or Decimal('0.00')) + Decimal(str(amount))
+    record_transaction(db, user_id, "deposit", old_balance, credit.balance)
+    return old_balance, float(credit.balance)
+
+
+def withdraw(db: Session, user_id: int, amount: float) -> Tuple[float, float]:
+    """หักยอดเงิน คืน (ยอดก่อน, ยอดหลัง) - ยอดไม่พอ → 400"""
+    check_amount(amount, "Amount must be greater than 0")
+    credit = db.query(Credit).filter(Credit.user_id == user_id).first()
+    if not credit or credit.balance < Decimal(str(amount)):
+        print(f"❌ Insufficient balance: user {user_id} has {credit.balance if credit else 0}, wants {amount}")
+        raise HTTPException(status_code=400, detail="Insufficient balance")
+
+    old_balance = float(credit.balance)
+    credit.balance -= Decimal(str(amount))
+    record_transaction(db, user_id, "withdraw", old_balance, credit.balance)
+    return old_balance, float(credit.balance)
+
+
+def apply_game_result(db: Session, user_id: int, result: str, bet_amount: float,
+                      win_amount: float) -> Tuple[float, float]:
+    """ปรับยอดตามผลเกมที่ client ส่งมา (/api/game-result) คืน (ยอดก่อน, ยอดหลัง)"""
+    if result not in rules.RPS_OUTCOMES:
+        raise HTTPException(status_code=400, detail="Invalid game result")
+    credit = db.query(Credit).filter(Credit.user_id == user_id).first()
+    if not credit:
+        raise HTTPException(status_code=404, detail="User credit not found")
+
+    old_balance = float(credit.balance)
+    # ชนะได้ win_amount - เดิมพัน, แพ้เสียเดิมพัน, เสมอยอดเท่าเดิม
+    balance_change = {"win": win_amount - bet_amount, "lose": -bet_amount}.get(result, 0)
+    # loss limit (rolling window) - commit พร้อมยอดเงิน
+    limits.record_bet(db, user_id, bet_amount, balance_change)
+    credit.balance += Decimal(str(balance_change))
+    record_transaction(db, user_id, "game_result", old_balance, credit.balance)
+    return old_balance, float(credit.balance)
+
+
+def _settle_play(db: Session, game: str, user_id: int, choice: str, opponent: str, outcome: str,
+                 outcomes: Dict[str, rules.Outcome], bet_amount: float):
+    """หัก / เพิ่มยอดเงินและบันทึกแถวใน plays ใน transaction ของผู้เรียก คืน (play, ยอดก่อน, ยอดหลัง, ได้/เสีย)"""
+    credit = db.query(Credit).filter(Credit.user_id == user_id).first()
+    if not credit or float(credit.balance) < bet_amount:
+        raise HTTPException(status_code=400, detail="Insufficient balance")
+
+    current_balance = float(credit.balance)
+    balance_change, win_loss_amount = rules.settle(outcomes, outcome, bet_amount)
+    new_balance = current_balance + balance_change
+
+    # loss limit (rolling window) - ตรวจและบันทึกพร้อมการหักเงิน
+    limits.record_bet(db, user_id, bet_amount, balance_change)
+
+    credit.balance = Decimal(str(new_balance))
+    credit.updated_at = func.now()
+
+    # บันทึกผลการเล่น (ตาราง plays - อ่านกลับได้จาก view game1 / game2)
+    play = new_play(game, user_id, choice, opponent, outcome, bet_amount, current_balance, new_balance)
+    db.add(play)
+    record_play(db, play)  # ยอดรวมการเล่นของผู้ใช้ (user_totals)
+    db.flush()  # ให้ได้ play.id ก่อน commit
+    return play, current_balance, new_balance, win_loss_amount
+
+
+# ===============================
+# Game1 (วงล้อสี)
+# ===============================
+def play_game1(db: Session, user_id: int, bet_amount: float, selected_color: str,
+               result_color: Optional[str] = None) -> dict:
+    """
+    เล่น Game1 หนึ่งตา (รันใน run_write / unit_of_work) - result_color ที่ไม่ส่งมาหรือไม่ถูกต้อง
+    สุ่มใหม่ตามน้ำหนักของวงล้อ (rules.py)
+    """
+    if selected_color not in rules.WHEEL_WEIGHTS:
+        raise HTTPException(status_code=400, detail="Selected color must be 'blue' or 'white'")
+    check_amount(bet_amount, "Bet amount must be positive")
+    if result_color not in rules.WHEEL_WEIGHTS:
+        result_color = rules.spin_wheel()
+
+    outcome = rules.wheel_outcome(selected_color, result_color)
+    play, current_balance, new_balance, win_loss_amount = _settle_play(
+        db, "game1", user_id, selected_color, result_color, outcome, rules.WHEEL_OUTCOMES, bet_amount,
+    )
+    return {
+        "game_id": play.id,
+        "selected_color": selected_color,
+        "result_color": result_color,
+        "won": outcome == "win",
+        "bet_amount": bet_amount,
+        "win_loss_amount": float(win_loss_amount),
+        "balance_before": current_balance,
+        "balance_after": new_balance,
+        "message": "",
+    }
+
+
+def game1_history(db: Session, user_id: int, limit: int = 20, offset: int = 0) -> List[dict]:
+    """ประวัติ Game1 ใหม่ไปเก่า (ตารางร้อน + เดือนที่ archive แล้ว)"""
+    return [{
+        "id": game.id,
+        "bet_amount": float(game.bet_amount),
+        "selected_color": game.selected_color,
+        "result_color": game.result_color,
+        "won": bool(game.won),
+        "win_loss_amount": float(game.win_loss_amount),
+        "balance_before": float(game.balance_before),
+        "balance_after": float(game.balance_after),
+        "played_at": game.played_at.isoformat(),
+    } for game in play_history(db, Game1, user_id, limit, offset)]
+
+
+def game1_stats(db: Session, user_id: int) -> dict:
+    # เดือนที่ archive แล้ว (game1_stats) + แถวร้อนใน view game1 - ดู partitions.lifetime_stats
+    result = SimpleNamespace(**lifetime_stats(db, "game1", user_id))
+
+    if result.total_games_played == 0:
+        # ยังไม่เคยเล่น
+        return {
+            "total_games": 0, "total_wins": 0, "total_losses": 0,
+            "total_bet_amount": 0.0, "total_win_amount": 0.0, "total_loss_amount": 0.0,
+            "net_profit_loss": 0.0, "win_percentage": 0.0,
+            "first_played_at": None, "last_played_at": None,
+        }
+
+    total_games = result.total_games_played
+    return {
+        "total_games": total_games,
+        "total_wins": result.total_wins,
+        "total_losses": result.total_losses,
+        "total_bet_amount": float(result.total_bet_amount),
+        "total_win_amount": float(result.total_win_amount),
+        "total_loss_amount": float(result.total_loss_amount),
+        "net_profit_loss": float(result.net_profit_loss),
+        # win_percentage คำนวณจากจำนวนตา (ไม่ได้เก็บไว้ในตารางไหน)
+        "win_percentage": round(result.total_wins / total_games * 100, 2),
+        "first_played_at": _isoformat(result.first_played_at),
+        "last_played_at": _isoformat(result.last_played_at),
+    }
+
+
+def all_game1_stats(db: Session, limit: int = 100) -> List[dict]:
+    """สถิติ Game1 ของผู้ใช้ทุกคนที่เคยเล่น (admin) เรียงตามจำนวนตา - รวมเดือนที่ archive แล้ว (game1_stats)"""
+    floor = hot_floor(db, "game1")
+    params = {"limit": limit}
+    hot_filter = ""
+    if floor is not None:
+        hot_filter = "WHERE played_at >= :floor"
+        params["floor"] = floor
+    results = db.execute(text(f"""
+        SELECT
+            u.id,
+            u.full_name,
+            u.email,
+            COALESCE(g.total_games, 0) + COALESCE(s.total_games_played, 0) as total_games,
+            COALESCE(g.total_wins, 0) + COALESCE(s.total_wins, 0) as total_wins,
+            COALESCE(g.total_bet_amount, 0) + COALESCE(s.total_bet_amount, 0) as total_bet_amount,
+            COALESCE(g.net_profit_loss, 0) + COALESCE(s.net_profit_loss, 0) as net_profit_loss,
+            COALESCE(g.last_played_at, s.last_played_at) as last_played_at
+        FROM users u
+        LEFT JOIN (
+            SELECT
+                user_id,
+                COUNT(*) as total_games,
+                COUNT(CASE WHEN won = 1 THEN 1 END) as total_wins,
+                SUM(bet_amount) as total_bet_amount,
+                SUM(win_loss_amount) as net_profit_loss,
+                MAX(played_at) as last_played_at
+            FROM game1
+            {hot_filter}
+            GROUP BY user_id
+        ) g ON g.user_id = u.id
+        LEFT JOIN game1_stats s ON s.user_id = u.id
+        WHERE u.role = 'user' AND (g.user_id IS NOT NULL OR s.user_id IS NOT NULL)
+        ORDER BY total_games DESC, net_profit_loss DESC
+        LIMIT :limit
+    """), params).fetchall()
+
+    all_stats = []
+    for result in results:
+        total_games = result.total_games
+        total_wins = result.total_wins
+        all_stats.append({
+            "user_id": result.id,
+            "full_name": result.full_name,
+            "email": result.email,
+            "total_games": total_games,
+            "total_wins": total_wins,
+            "total_losses": total_games - total_wins,
+            "total_bet_amount": float(result.total_bet_amount),
+            "net_profit_loss": float(result.net_profit_loss),
+            "win_percentage": round(total_wins / total_games * 100, 2) if total_games else 0,
+            "last_played_at": _isoformat(result.last_played_at),
+        })
+    return all_stats
+
+
+# ===============================
+# Game2 (Rock Paper Scissors)
+# ===============================
+def play_game2(db: Session, user_id: int, bet_amount: float, player_choice: str, bot_choice: str,
+               result: str) -> dict:
+    """บันทึก Game2 หนึ่งตาตามผลที่ client ส่งมา (รันใน run_write / unit_of_work)"""
+    if player_choice not in rules.RPS_CHOICES:
+        raise HTTPException(status_code=400, detail="Player choice must be 'rock', 'paper', or 'scissors'")
+    if bot_choice not in rules.RPS_CHOICES:
+        raise HTTPException(status_code=400, detail="Bot choice must be 'rock', 'paper', or 'scissors'")
+    if result not in rules.RPS_OUTCOMES:
+        raise HTTPException(status_code=400, detail="Result must be 'win', 'lose', or 'tie'")
+    check_amount(bet_amount, "Bet amount must be positive")
+
+    # ชนะบันทึก 2 เท่า, เสมอไม่ได้ไม่เสีย - ดู rules.RPS_OUTCOMES
+    play, current_balance, new_balance, win_loss_amount = _settle_play(
+        db, "game2", user_id, player_choice, bot_choice, result, rules.RPS_OUTCOMES, bet_amount,
+    )
+    return {
+        "game_id": play.id,
+        "player_choice": player_choice,
+        "bot_choice": bot_choice,
+        "result": result,
+        "bet_amount": bet_amount,
+        "win_loss_amount": float(win_loss_amount),
+        "balance_before": current_balance,
+        "balance_after": new_balance,
+        "message": f"You {result}!",
+    }
+
+
+def game2_history(db: Session, user_id: int, limit: int = 20, offset: int = 0) -> List[dict]:
+    """ประวัติ Game2 ใหม่ไปเก่า (ตารางร้อน + เดือนที่ archive แล้ว)"""
+    return [{
+        "id": game.id,
+        "bet_amount": float(game.bet_amount),
+        "player_choice": game.player_choice,
+        "bot_choice": game.bot_choice,
+        "result": game.result,
+        "win_loss_amount": float(game.win_loss_amount),
+        "balance_before": float(game.balance_before),
+        "balance_after": float(game.balance_after),
+        "played_at": game.played_at.isoformat(),
+    } for game in play_history(db, Game2, user_id, limit, offset)]
+
+
+def game2_stats(db: Session, user_id: int) -> dict:
+    # เดือนที่ archive แล้ว (game2_stats) + แถวร้อนใน view game2 - ดู partitions.lifetime_stats
+    stats = SimpleNamespace(**lifetime_stats(db, "game2", user_id))
+
+    if stats.total_games_played == 0:
+        return {
+            "total_games": 0, "total_wins": 0, "total_losses": 0, "total_ties": 0,
+            "total_bet_amount": 0.0, "total_win_amount": 0.0, "total_loss_amount": 0.0,
+            "net_profit_loss": 0.0, "win_percentage": 0.0,
+            "rock_played": 0, "paper_played": 0, "scissors_played": 0,
+            "first_played_at": None, "last_played_at": None,
+        }
+
+    total_games = stats.total_games_played
+    return {
+        "total_games": total_games,
+        "total_wins": stats.total_wins,
+        "total_losses": stats.total_losses,
+        "total_ties": stats.total_ties,
+        "total_bet_amount": float(stats.total_bet_amount),
+        "total_win_amount": float(stats.total_win_amount),
+        "total_loss_amount": float(stats.total_loss_amount),
+        "net_profit_loss": float(stats.net_profit_loss),
+        "win_percentage": round(stats.total_wins / total_games * 100, 2),
+        "rock_played": stats.rock_played,
+        "paper_played": stats.paper_played,
+        "scissors_played": stats.scissors_played,
+        "first_played_at": _isoformat(stats.first_played_at),
+        "last_played_at": _isoformat(stats.last_played_at),
+    }
+
+
+# ===============================
+# Stats (dashboard)
+# ===============================
+def dashboard_stats(db: Session) -> dict:
+    # จำนวน reports จากตัวนับ category × status (triage.py)
+    return {"total_users": db.query(User).count(), "total_reports": triage.report_counts(db)["total"]}
+
+
+def play_count(db: Session, game: str) -> int:
+    """จำนวนตาทั้งหมดของเกม ("game1" / "game2") รวมเดือนที่ archive แล้ว (row_count ใน play_archives)"""
+    model = {"game1": Game1, "game2": Game2}[game]
+    floor = hot_floor(db, game)
+    hot = db.query(model)
+    if floor is not None:
+        hot = hot.filter(model.played_at >= floor)
+    archived = db.query(func.coalesce(func.sum(PlayArchive.row_count), 0))\
+                 .filter(PlayArchive.table_name == game).scalar()
+    return hot.count() + int(archived)
+
+
+def _time_ago(played_at, now: datetime) -> str:
+    time_diff = now - _datetime(played_at)
+    if time_diff.days > 0:
+        return f"{time_diff.days}d ago"
+    if time_diff.seconds > 3600:
+        return f"{time_diff.seconds // 3600}h ago"
+    if time_diff.seconds > 60:
+        return f"{time_diff.seconds // 60}m ago"
+    return "Just now"
+
+
+def recent_activities(db: Session, limit: int = 10) -> List[dict]:
+    """ตาล่าสุดของทั้งสองเกม (หน้า admin dashboard)"""
+    results = db.execute(text("""
+        SELECT
+            'game1' as game_type,
+            u.email,
+            g.win_loss_amount,
+            CASE WHEN g.won = 1 THEN 'win' ELSE 'lose' END as result,
+            g.played_at
+        FROM game1 g
+        JOIN users u ON g.user_id = u.id
+        UNION ALL
+        SELECT
+            'game2' as game_type,
+            u.email,
+            g.win_loss_amount,
+            g.result,
+            g.played_at
+        FROM game2 g
+        JOIN users u ON g.user_id = u.id
+        ORDER BY played_at DESC
+        LIMIT :limit
+    """), {"limit": limit}).fetchall()
+
+    now = datetime.utcnow()
+    return [{
+        "id": result.email,
+        "amount": f"{abs(float(result.win_loss_amount)):.2f} THB",
+        "type": result.result,  # win/lose/tie
+        "time": _time_ago(result.played_at, now),
+        "game": result.game_type,
+    } for result in results]
+
+
+# ===============================
+# Reports
+# ===============================
+def submit_report(db: Session, user_id: int, title: str, category: str, description: str) -> Report:
+    """สร้าง report ใหม่ (status pending) และนับเข้าตัวนับ category × status ใน transaction เดียวกัน"""
+    if not title or not category or not description:
+        raise HTTPException(status_code=400, detail="All fields are required")
+    if category not in REPORT_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Invalid category")
+
+    report = Report(
+        user_id=user_id,
+        title=title.strip(),
+        category=category,
+        description=description.strip(),
+        status="pending",
+    )
+    db.add(report)
+    triage.report_submitted(db, report.category)
+    db.flush()
+    return report
+
+
+def list_reports(db: Session) -> List[dict]:
+    """reports ทั้งหมดพร้อมข้อมูลผู้ส่ง ใหม่ไปเก่า (ผู้ส่งมากับ JOIN เดียวกัน ไม่ lazy-load ทีละแถว)"""
+    return [{
+        "id": report.id,
+        "title": report.title,
+        "category": report.category,
+        "description": report.description,
+        "status": report.status,
+        "user_email": report.user.email,
+        "user_name": report.user.full_name,
+        "created_at": report.created_at.isoformat(),
+        "updated_at": report.updated_at.isoformat(),
+    } for report in db.query(Report).join(Report.user).options(contains_eager(Report.user))
+                      .order_by(Report.created_at.desc()).all()]
+
+
+def report_category_counts(db: Session) -> Dict[str, int]:
+    """จำนวน reports ต่อ category (ทุก category แม้ยังไม่มี report) จากตัวนับ"""
+    counts = triage.report_counts(db)["categories"]
+    return {category: counts.get(category, 0) for category in REPORT_CATEGORIES}
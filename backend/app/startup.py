@@ -0,0 +1,129 @@
+"""
+Worker startup - ทำให้ worker พร้อมรับ request เร็วที่สุด
+
+STARTUP_MODE=fast (ค่าเริ่มต้น):
+  1. schema: อ่าน version จากตาราง schema_version (query เดียว) แทน create_all ที่ต้อง reflect ทุกตาราง
+     ถ้ายังไม่ถึง LATEST_VERSION: STARTUP_AUTO_MIGRATE=1 จะ apply migrations ให้, =0 จะไม่ยอม start
+     (production ควรรัน python migrate.py ก่อน rollout แล้วตั้ง STARTUP_AUTO_MIGRATE=0)
+  2. seed: admin / test user ใน transaction เดียวด้วยรหัสผ่านที่ hash ไว้แล้ว (models.ensure_admin)
+  3. warm: เปิด connection ให้เต็ม pool_size ของทุก engine และรัน query หลักของ handler หนึ่งรอบ
+     เพื่อให้ compiled cache ของ SQLAlchemy มี statement พร้อมก่อน request แรก
+STARTUP_MODE=create_all: แบบเดิม (create_all + seed) สำหรับ dev ที่ยังไม่ได้ใช้ migrate.py
+
+เวลาของแต่ละขั้นถูก log ตอน boot และเก็บไว้ใน app.state.startup_timings
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict
+
+from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError
+
+from . import migrations
+from .models import (
+    engine, read_engine, write_engine, SessionLocal, ReadSessionLocal, WriteSessionLocal,
+    User, Credit, Game1, Game2, create_db, ensure_admin,
+)
+
+STARTUP_MODE = os.getenv("STARTUP_MODE", "fast")
+STARTUP_AUTO_MIGRATE = os.getenv("STARTUP_AUTO_MIGRATE", "1") == "1"
+STARTUP_WARM_POOL = os.getenv("STARTUP_WARM_POOL", "1") == "1"
+
+
+class StartupTimer:
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def report(self) -> Dict[str, float]:
+        timings = dict(self.phases, total=round((time.perf_counter() - self._started) * 1000, 2))
+        details = ", ".join(f"{name} {ms:.1f}ms" for name, ms in self.phases.items())
+        print(f"⏱️  startup ({STARTUP_MODE}) ready in {timings['total']:.1f}ms - {details}")
+        return timings
+
+
+def check_schema():
+    version = migrations.stored_version(engine)
+    if version >= migrations.LATEST_VERSION:
+        return
+    if not STARTUP_AUTO_MIGRATE:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {migrations.LATEST_VERSION}. "
+            f"Run `python migrate.py` first."
+        )
+    try:
+        migrations.migrate(engine)
+    except IntegrityError:
+        # worker อื่น apply version เดียวกันไปพร้อมกัน (SQLite ไม่มี advisory lock)
+        if migrations.stored_version(engine) < migrations.LATEST_VERSION:
+            raise
+
+
+def _distinct(*items):
+    seen = []
+    for item in items:
+        if all(item is not other for other in seen):
+            seen.append(item)
+    return seen
+
+
+def warm_pool(target_engine):
+    """เปิด connection พร้อมกันให้เต็ม pool_size (แล้วคืนเข้า pool) - request แรก ๆ ไม่ต้องรอ connect"""
+    size = target_engine.pool.size() if hasattr(target_engine.pool, "size") else 1
+    if size <= 0:
+        return
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        connections = list(executor.map(lambda _: target_engine.connect(), range(size)))
+    try:
+        for conn in connections:
+            conn.execute(text("SELECT 1"))
+            conn.rollback()
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+def warm_statements(session_factory):
+    """รัน query รูปเดียวกับ handler หลัก (me / balance / play / history) เพื่อเติม compiled cache"""
+    with session_factory() as session:
+        session.query(User).filter(User.email == "").first()
+        session.query(User).filter(func.lower(User.email) == "").first()
+        session.query(Credit).filter(Credit.user_id == 0).first()
+        session.query(Game1).filter(Game1.user_id == 0).order_by(Game1.played_at.desc()).offset(0).limit(20).all()
+        session.query(Game2).filter(Game2.user_id == 0).order_by(Game2.played_at.desc()).offset(0).limit(20).all()
+        session.rollback()
+
+
+def run_startup() -> Dict[str, float]:
+    timer = StartupTimer()
+    if STARTUP_MODE == "create_all":
+        with timer.phase("create_all"):
+            create_db()
+    else:
+        with timer.phase("schema"):
+            check_schema()
+
+    with timer.phase("seed"):
+        with SessionLocal() as session:
+            ensure_admin(session)
+
+    if STARTUP_WARM_POOL:
+        with timer.phase("warm_pool"):
+            for target_engine in _distinct(engine, read_engine, write_engine):
+                warm_pool(target_engine)
+        with timer.phase("warm_statements"):
+            for session_factory in _distinct(SessionLocal, ReadSessionLocal, WriteSessionLocal):
+                warm_statements(session_factory)
+
+    return timer.report()
@@ -0,0 +1,177 @@
+"""
+Report triage (admin) - เปลี่ยน status ของ reports ทีละหลายร้อยรายการ + ตัวนับ category × status
+
+- เปลี่ยน status ด้วย UPDATE เดียวแบบ set-based: WHERE id IN (...) AND status IN (status ต้นทางที่ย้ายมาได้)
+  การตรวจ transition อยู่ใน WHERE ของ SQL (แถวที่ status เปลี่ยนไประหว่างนั้นจะไม่ถูกแก้)
+- ก่อน UPDATE อ่าน status ปัจจุบันของ id ที่ขอ (FOR UPDATE บน PostgreSQL) เพื่อรู้ status เดิมของแถวที่ถูกแก้
+  และให้ผลราย id: updated / unchanged / invalid_transition / not_found
+- report_counters (models.ReportCounter) อัพเดทด้วย upsert เดียวที่รวม delta ต่อ (category, status) แล้ว
+  ใน transaction เดียวกับ UPDATE (ผ่าน run_write) - dashboard อ่านตัวนับแทน COUNT / GROUP BY ทั้งตาราง
+- ข้อมูลที่เขียนตรงเข้า reports (generate_data.py) เรียก recount_report_counters() เพื่อนับใหม่
+"""
+
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .models import Report, ReportCounter, dialect_insert
+from .search import REPORT_CATEGORIES, REPORT_STATUSES
+
+REPORT_BULK_MAX = int(os.getenv("REPORT_BULK_MAX", "1000"))
+
+# status ปัจจุบัน → status ที่ย้ายไปได้ (resolved / closed เปิดกลับมาเป็น reviewing ได้)
+TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    "pending": ("reviewing", "resolved", "closed"),
+    "reviewing": ("pending", "resolved", "closed"),
+    "resolved": ("reviewing", "closed"),
+    "closed": ("reviewing",),
+}
+
+
+def sources_for(status: str) -> List[str]:
+    """status ต้นทางที่ย้ายมาเป็น status นี้ได้"""
+    return [source for source, targets in TRANSITIONS.items() if status in targets]
+
+
+# ===============================
+# Counters
+# ===============================
+def bump_counters(db: Session, deltas: Dict[Tuple[str, str], int]):
+    """บวก delta ต่อ (category, status) ด้วย INSERT ... ON CONFLICT DO UPDATE เดียว (ใน transaction ของผู้เรียก)"""
+    rows = [{"category": category, "status": status, "count": delta}
+            for (category, status), delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    # เรียง key เสมอ - transaction ที่แก้ตัวนับชุดเดียวกันพร้อมกันจะล็อกแถวตามลำดับเดียวกัน (ไม่ deadlock)
+    table = ReportCounter.__table__
+    statement = dialect_insert(db)(table).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["category", "status"],
+        set_={"count": table.c.count + statement.excluded.count},
+    ))
+
+
+def recount_report_counters(conn):
+    """นับใหม่ทั้งหมดจาก reports (migration / หลังโหลดข้อมูลตรงเข้าตาราง)"""
+    conn.execute(text("DELETE FROM report_counters"))
+    conn.execute(text("""
+        INSERT INTO report_counters (category, status, count)
+        SELECT category, status, COUNT(*) FROM reports GROUP BY category, status
+    """))
+
+
+def report_counts(db: Session) -> dict:
+    """{"categories": {...}, "statuses": {...}, "matrix": {category: {status: n}}, "total": n}"""
+    matrix = {category: {status: 0 for status in REPORT_STATUSES} for category in REPORT_CATEGORIES}
+    for category, status, count in db.query(ReportCounter.category, ReportCounter.status, ReportCounter.count):
+        matrix.setdefault(category, {}).setdefault(status, 0)
+        matrix[category][status] += count
+    return {
+        "categories": {category: sum(row.values()) for category, row in matrix.items()},
+        "statuses": {status: sum(row.get(status, 0) for row in matrix.values()) for status in REPORT_STATUSES},
+        "matrix": matrix,
+        "total": sum(sum(row.values()) for row in matrix.values()),
+    }
+
+
+def report_submitted(db: Session, category: str):
+    bump_counters(db, {(category, "pending"): 1})
+
+
+# ===============================
+# Bulk transitions
+# ===============================
+def _clean_ids(ids: Iterable[int]) -> List[int]:
+    unique = list(dict.fromkeys(int(report_id) for report_id in ids))
+    if not unique:
+        raise HTTPException(status_code=400, detail="No report ids given")
+    if len(unique) > REPORT_BULK_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {REPORT_BULK_MAX} reports per request")
+    return unique
+
+
+def transition_reports(db: Session, ids: Iterable[int], status: str) -> dict:
+    """
+    ย้าย reports ตาม ids ไปเป็น status (เรียกใน run_write) คืน
+    {"status", "results": [{"id", "outcome", "from"}], "updated": n, "counts": {outcome: n}}
+    """
+    if status not in TRANSITIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    ids = _clean_ids(ids)
+    sources = sources_for(status)
+
+    query = db.query(Report.id, Report.category, Report.status).filter(Report.id.in_(ids))
+    if db.get_bind().dialect.name == "postgresql":
+        # ล็อกแถวตามลำดับ id - UPDATE ด้านล่างเห็น status เดียวกับที่อ่านได้แน่นอน
+        query = query.order_by(Report.id).with_for_update()
+    before = {row.id: (row.category, row.status) for row in query}
+
+    updated = db.execute(
+        Report.__table__.update()
+        .where(Report.id.in_(ids), Report.status.in_(sources))
+        .values(status=status, updated_at=datetime.utcnow())
+        .returning(Report.id)
+    ).scalars().all()
+    updated = set(updated)
+
+    deltas: Counter = Counter()
+    results = []
+    for report_id in ids:
+        if report_id not in before:
+            results.append({"id": report_id, "outcome": "not_found", "from": None})
+            continue
+        category, previous = before[report_id]
+        if report_id in updated:
+            deltas[(category, previous)] -= 1
+            deltas[(category, status)] += 1
+            outcome = "updated"
+        elif previous == status:
+            outcome = "unchanged"
+        else:
+            outcome = "invalid_transition"
+        results.append({"id": report_id, "outcome": outcome, "from": previous})
+    bump_counters(db, deltas)
+
+    return {
+        "status": status,
+        "results": results,
+        "updated": len(updated),
+        "counts": dict(Counter(result["outcome"] for result in results)),
+    }
+
+
+def closable_ids(db: Session, categories: Optional[List[str]] = None, statuses: Optional[List[str]] = None,
+                 updated_before: Optional[datetime] = None, limit: int = REPORT_BULK_MAX) -> List[int]:
+    """id ของ reports ที่ปิดได้ตาม filter (เก่าสุดก่อน ไม่เกิน limit) - สำหรับ bulk close แบบไม่ระบุ id"""
+    closable = sources_for("closed")
+    if statuses:
+        invalid = [status for status in statuses if status not in closable]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Reports in status {', '.join(invalid)} cannot be closed")
+        closable = statuses
+    if categories:
+        invalid = [category for category in categories if category not in REPORT_CATEGORIES]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid category: {', '.join(invalid)}")
+    query = db.query(Report.id).filter(Report.status.in_(closable))
+    if categories:
+        query = query.filter(Report.category.in_(categories))
+    if updated_before is not None:
+        query = query.filter(Report.updated_at < updated_before)
+    return [report_id for report_id, in query.order_by(Report.id).limit(limit)]
+
+
+def close_reports(db: Session, ids: Optional[Iterable[int]] = None, categories: Optional[List[str]] = None,
+                  statuses: Optional[List[str]] = None, updated_before: Optional[datetime] = None) -> dict:
+    """ปิด reports ตาม ids หรือตาม filter (ครั้งละไม่เกิน REPORT_BULK_MAX - has_more = ยังมีเหลือให้เรียกซ้ำ)"""
+    if ids is not None:
+        return dict(transition_reports(db, ids, "closed"), has_more=False)
+    ids = closable_ids(db, categories, statuses, updated_before)
+    if not ids:
+        return {"status": "closed", "results": [], "updated": 0, "counts": {}, "has_more": False}
+    return dict(transition_reports(db, ids, "closed"), has_more=len(ids) == REPORT_BULK_MAX)
@@ -0,0 +1,214 @@
+"""
+Settlement write path: single writer, group commit และ per-user actors
+
+SQLite เขียนได้ทีละ transaction อยู่แล้ว ถ้าปล่อยให้หลาย thread แย่งกันเขียนจะเจอ
+"database is locked" และต้อง commit/fsync แยกกันทุกครั้ง จึงให้ทุก transaction การเงิน
+(เล่นเกม ฝาก ถอน) เข้าคิวไปรันบน writer thread ตัวเดียวที่ถือ connection เขียนไว้
+
+Group commit: writer thread ดึงงานที่รอในคิวมาเป็นกลุ่ม (รอเพิ่มได้ไม่เกิน
+SETTLEMENT_GROUP_COMMIT_MS) รันแต่ละงานใน SAVEPOINT ของตัวเอง แล้ว commit ครั้งเดียว
+ผู้เรียกจะได้ผลลัพธ์หลัง commit ของกลุ่มสำเร็จเท่านั้น - งานที่ error (เช่น ยอดเงินไม่พอ)
+rollback แค่ savepoint ของตัวเอง ไม่กระทบงานอื่นในกลุ่ม
+
+Per-user actors: งานของผู้ใช้คนเดียวกันเข้าคิว asyncio ของผู้ใช้นั้นตามลำดับ งานถัดไปจะเริ่ม
+หลังงานก่อนหน้า commit แล้วเท่านั้น จึงไม่มีสองงานของผู้ใช้เดียวกันแย่งแก้ Credit แถวเดียวกัน
+(ลำดับนี้รับประกันภายใน process เดียว - หลาย uvicorn workers ยังต้องพึ่ง transaction ของ DB)
+
+การใช้งานใน handler:
+
+    def settle(db):
+        ...อ่าน/แก้ Credit และเพิ่ม Game1...
+        return result
+
+    result = await run_write(db, settle, user_id=user.id)
+
+- เปิด group commit (SQLite production mode หรือ SETTLEMENT_GROUP_COMMIT=1 บน Postgres):
+  settle() ผ่าน actor ของผู้ใช้ แล้วรันบน writer thread (session ของ writer เอง)
+- โหมดอื่น: settle() รันทันทีบน session ของ request และ commit ทีละ request เหมือนเดิม
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from .models import DATABASE_URL, WriteSessionLocal, SQLITE_PRODUCTION
+
+SETTLEMENT_GROUP_COMMIT_MS = float(os.getenv("SETTLEMENT_GROUP_COMMIT_MS", "2"))
+SETTLEMENT_GROUP_COMMIT_MAX = int(os.getenv("SETTLEMENT_GROUP_COMMIT_MAX", "256"))
+
+# SQLite ต้องใช้ SQLITE_PRODUCTION (BEGIN เอง) ไม่งั้น pysqlite จัดการ SAVEPOINT ได้ไม่ถูกต้อง
+GROUP_COMMIT_ENABLED = SQLITE_PRODUCTION or (
+    os.getenv("SETTLEMENT_GROUP_COMMIT", "0") == "1" and not DATABASE_URL.startswith("sqlite")
+)
+
+
+class WriteQueue:
+    """คิว transaction แบบ FIFO ที่มี writer thread ตัวเดียวคอยรัน และ commit เป็นกลุ่ม"""
+
+    def __init__(self, session_factory=WriteSessionLocal,
+                 group_commit_ms: float = SETTLEMENT_GROUP_COMMIT_MS,
+                 max_batch: int = SETTLEMENT_GROUP_COMMIT_MAX):
+        self.session_factory = session_factory
+        self.group_commit_ms = group_commit_ms
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.commits = 0
+        self.transactions = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "commits": self.commits,
+            "transactions": self.transactions,
+            "avg_group_size": round(self.transactions / self.commits, 2) if self.commits else 0.0,
+        }
+
+    def submit(self, fn: Callable[[Session], object]) -> Future:
+        future: Future = Future()
+        self.start()
+        self._queue.put((fn, future))
+        return future
+
+    async def run(self, fn: Callable[[Session], object]):
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def _next_group(self):
+        """รองานแรก แล้วเก็บงานที่ตามมาภายใน group_commit_ms (ไม่เกิน max_batch) - คืน None เมื่อ stop"""
+        item = self._queue.get()
+        if item is None:
+            return None
+        group = [item]
+        deadline = time.monotonic() + self.group_commit_ms / 1000
+        while len(group) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # ส่งต่อสัญญาณ stop ให้รอบถัดไปหลังจบกลุ่มนี้
+                self._queue.put(None)
+                break
+            group.append(item)
+        return group
+
+    def _run(self):
+        while True:
+            group = self._next_group()
+            if group is None:
+                return
+            group = [(fn, future) for fn, future in group if future.set_running_or_notify_cancel()]
+            if not group:
+                continue
+
+            session = self.session_factory()
+            outcomes = []
+            try:
+                for fn, future in group:
+                    try:
+                        with session.begin_nested():
+                            result = fn(session)
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+                    else:
+                        outcomes.append((future, result, None))
+                session.commit()
+            except BaseException as e:
+                # commit ทั้งกลุ่มไม่สำเร็จ - ไม่มีงานไหนถูกบันทึก แจ้ง error ให้ทุกคนในกลุ่ม
+                session.rollback()
+                for fn, future in group:
+                    future.set_exception(e)
+                continue
+            finally:
+                session.close()
+
+            self.commits += 1
+            self.transactions += len(group)
+            for future, result, error in outcomes:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+class UserActors:
+    """คิว asyncio ต่อผู้ใช้: งานของผู้ใช้เดียวกันรันตามลำดับทีละงาน"""
+
+    def __init__(self, writer: WriteQueue):
+        self.writer = writer
+        self._mailboxes: Dict[int, asyncio.Queue] = {}
+
+    @property
+    def active(self) -> int:
+        return len(self._mailboxes)
+
+    async def run(self, user_id: int, fn: Callable[[Session], object]):
+        future = asyncio.get_running_loop().create_future()
+        mailbox = self._mailboxes.get(user_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[user_id] = asyncio.Queue()
+            asyncio.create_task(self._actor(user_id, mailbox))
+        mailbox.put_nowait((fn, future))
+        return await future
+
+    async def _actor(self, user_id: int, mailbox: asyncio.Queue):
+        # actor หยุดเองเมื่อไม่มีงานค้าง จะได้ไม่มี task ค้างไว้ต่อผู้ใช้ทุกคนที่เคยเล่น
+        try:
+            while not mailbox.empty():
+                fn, future = mailbox.get_nowait()
+                try:
+                    result = await self.writer.run(fn)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            del self._mailboxes[user_id]
+
+
+write_queue = WriteQueue()
+user_actors = UserActors(write_queue)
+
+
+async def run_write(db: Session, fn: Callable[[Session], object], user_id: Optional[int] = None):
+    """รัน transaction เขียน: ผ่าน actor ของผู้ใช้ + group commit ถ้าเปิดไว้ หรือรันทันทีบน db"""
+    if GROUP_COMMIT_ENABLED:
+        # ปิด transaction อ่านของ request ก่อนรอคิว จะได้คืน connection ให้ pool ระหว่างรอ
+        db.rollback()
+        if user_id is None:
+            return await write_queue.run(fn)
+        return await user_actors.run(user_id, fn)
+    try:
+        result = fn(db)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return result
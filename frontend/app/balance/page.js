@@ -2,6 +2,7 @@
 import { useState, useEffect } from "react";
 import AuthenticatedHeader from "../../components/AuthenticatedHeader";
 import Protected from "../../components/Protected";
+import { isDefinite, postIdempotent, useIdempotencyKey } from "../../lib/idempotency";
 import "../../styles/balance.css";
 
 export default function BalancePage() {
@@ -13,6 +14,8 @@ export default function BalancePage() {
   const [balance, setBalance] = useState("0.00");
   const [balanceLoading, setBalanceLoading] = useState(true);
   const [notification, setNotification] = useState(null);
+  const withdrawKey = useIdempotencyKey();
+  const depositKey = useIdempotencyKey();
 
   const currency = "THB";
   const fee = "0.00";
@@ -159,16 +162,15 @@ export default function BalancePage() {
     }
 
     setLoading(true);
-    
+
+    // Same key for a resubmit of this withdraw until the server gives a definite answer
+    const payload = { amount: amount };
+    const key = withdrawKey.keyFor(payload);
     try {
-      const response = await fetch("http://localhost:8000/withdraw", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        credentials: "include",
-        body: JSON.stringify({ amount: amount }),
-      });
+      const response = await postIdempotent("http://localhost:8000/withdraw", payload, key);
+      if (isDefinite(response)) {
+        withdrawKey.clear();
+      }
 
       const data = await response.json();
 
@@ -202,16 +204,15 @@ export default function BalancePage() {
     }
 
     setLoading(true);
-    
+
+    // Same key for a resubmit of this deposit until the server gives a definite answer
+    const payload = { amount: amount };
+    const key = depositKey.keyFor(payload);
     try {
-      const response = await fetch("http://localhost:8000/deposit", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        credentials: "include",
-        body: JSON.stringify({ amount: amount }),
-      });
+      const response = await postIdempotent("http://localhost:8000/deposit", payload, key);
+      if (isDefinite(response)) {
+        depositKey.clear();
+      }
 
       const data = await response.json();
 
@@ -2,6 +2,7 @@
 import { useState, useEffect, useRef } from "react";
 import Protected from "../../components/Protected";
 import AuthenticatedHeader from "../../components/AuthenticatedHeader";
+import { newIdempotencyKey, postIdempotent } from "../../lib/idempotency";
 import "./style.css";
 
 export default function Game1() {
@@ -13,6 +14,7 @@ export default function Game1() {
   const [isMounted, setIsMounted] = useState(false);
   const [showResultModal, setShowResultModal] = useState(false);
   const wheelRef = useRef(null);
+  const playKeyRef = useRef(null); // Idempotency-Key of the spin in flight
 
   useEffect(() => {
     setIsMounted(true);
@@ -54,14 +56,21 @@ export default function Game1() {
   }, []);
 
   const spinWheel = async () => {
-    if (isSpinning || betAmount > balance || betAmount <= 0 || !isMounted) return;
+    // playKeyRef is set while a spin is in flight, so a double click cannot start a second spin
+    if (playKeyRef.current || isSpinning || betAmount > balance || betAmount <= 0 || !isMounted) return;
     
+    // One key per spin, reused by every retry of this spin's play record
+    const playKey = newIdempotencyKey();
+    playKeyRef.current = playKey;
     setIsSpinning(true);
     setLastResult(null);
     setShowResultModal(false); // Hide modal when starting new spin
     
     const wheel = wheelRef.current;
-    if (!wheel) return;
+    if (!wheel) {
+      playKeyRef.current = null;
+      return;
+    }
     
     // Get current rotation (always accumulating in positive direction)
     const currentTransform = wheel.style.transform;
@@ -139,14 +148,7 @@ export default function Game1() {
               result_color: landedOnBlue ? "blue" : "white"
             };
 
-            const game1Response = await fetch("http://localhost:8000/api/game1/play", {
-              method: "POST",
-              headers: {
-                "Content-Type": "application/json",
-              },
-              credentials: "include",
-              body: JSON.stringify(game1PlayData),
-            });
+            const game1Response = await postIdempotent("http://localhost:8000/api/game1/play", game1PlayData, playKey);
 
             if (game1Response.ok) {
               console.log("🎮 Game1 play data recorded successfully");
@@ -195,6 +197,7 @@ export default function Game1() {
       
       // Clear transition after spinning is done
       wheel.style.transition = 'none';
+      playKeyRef.current = null;
       setIsSpinning(false);
       
       // Show result modal with slight delay for better UX
@@ -1,7 +1,8 @@
 "use client";
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import Protected from "../../components/Protected";
 import AuthenticatedHeader from "../../components/AuthenticatedHeader";
+import { newIdempotencyKey, postIdempotent } from "../../lib/idempotency";
 import "../../styles/game2.css";
 
 const CHOICES = {
@@ -23,6 +24,7 @@ export default function Game2() {
   const [randomizeText, setRandomizeText] = useState("");
   const [showFinalResult, setShowFinalResult] = useState(false);
   const [finalResultData, setFinalResultData] = useState(null);
+  const roundKeyRef = useRef(null); // Idempotency-Key of the round in flight
 
   // Fetch user balance
   useEffect(() => {
@@ -66,8 +68,12 @@ export default function Game2() {
   };
 
   const playGame = async () => {
-    if (!playerChoice || betAmount > balance || betAmount <= 0) return;
+    // roundKeyRef is set while a round is in flight, so a double click cannot start a second round
+    if (roundKeyRef.current || !playerChoice || betAmount > balance || betAmount <= 0) return;
     
+    // One key per round, reused by every retry of this round's play request
+    const roundKey = newIdempotencyKey();
+    roundKeyRef.current = roundKey;
     setIsPlaying(true);
     setShowResult(false);
     setBotChoice(null); // Clear previous bot choice
@@ -148,17 +154,12 @@ export default function Game2() {
         // Update balance via Game2 API
         (async () => {
           try {
-            const response = await fetch("http://localhost:8000/api/game2/play", {
-              method: "POST",
-              headers: { "Content-Type": "application/json" },
-              credentials: "include",
-              body: JSON.stringify({
-                bet_amount: betAmount,
-                player_choice: playerChoice,
-                bot_choice: botMove,
-                result: result
-              })
-            });
+            const response = await postIdempotent("http://localhost:8000/api/game2/play", {
+              bet_amount: betAmount,
+              player_choice: playerChoice,
+              bot_choice: botMove,
+              result: result
+            }, roundKey);
             
             if (response.ok) {
               const data = await response.json();
@@ -189,6 +190,7 @@ export default function Game2() {
         setGameHistory(prev => [gameRecord, ...prev.slice(0, 4)]);
         
         // Don't auto-hide popup - let user click play again
+        roundKeyRef.current = null;
         setIsPlaying(false);
         
       }, 800);
@@ -0,0 +1,63 @@
+import { useRef } from "react";
+
+// Idempotency-Key for money requests (see backend/app/idempotency.py).
+// One key per user action: retries and resubmits of the same action send the same key,
+// so the server replays the first response instead of moving money twice.
+
+const RETRY_DELAYS_MS = [500, 1500];
+
+export function newIdempotencyKey() {
+  return crypto.randomUUID();
+}
+
+// Key for a form action. The same payload keeps the same key until clear() is called
+// after a definite outcome; a changed payload is a new action and gets a new key.
+export function useIdempotencyKey() {
+  const pending = useRef(null);
+
+  const keyFor = (payload) => {
+    const fingerprint = JSON.stringify(payload);
+    if (!pending.current || pending.current.fingerprint !== fingerprint) {
+      pending.current = { key: newIdempotencyKey(), fingerprint };
+    }
+    return pending.current.key;
+  };
+
+  const clear = () => {
+    pending.current = null;
+  };
+
+  return { keyFor, clear };
+}
+
+// A response the caller can act on. 409 means the first request with this key is still
+// running, so the outcome is not known yet.
+export function isDefinite(response) {
+  return response.status !== 409;
+}
+
+// POST with the same key on every attempt. Retries network errors and 409s, then returns the
+// last response or throws the last network error; keep the key for a resubmit in that case.
+export async function postIdempotent(url, body, key) {
+  for (let attempt = 0; ; attempt++) {
+    try {
+      const response = await fetch(url, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "Idempotency-Key": key,
+        },
+        credentials: "include",
+        body: JSON.stringify(body),
+      });
+      if (isDefinite(response) || attempt >= RETRY_DELAYS_MS.length) {
+        return response;
+      }
+    } catch (error) {
+      if (attempt >= RETRY_DELAYS_MS.length) {
+        throw error;
+      }
+    }
+    await new Promise((resolve) => setTimeout(resolve, RETRY_DELAYS_MS[attempt]));
+  }
+}
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Load Test - จำลองผู้ใช้หลายคนยิง API พร้อมกันด้วย async client (httpx)
+
+สร้างจาก test_balance_sync.py / test_game1.py / test_game1_simple.py / test_dashboard_api.py
+แต่แทนที่จะยิงทีละครั้ง จะสุ่ม scenario ตามสัดส่วน (mix) และอัตราการเข้ามา (arrival rate)
+แล้วสรุป throughput และ p50/p95/p99 latency แยกตาม route เป็น JSON เพื่อเทียบระหว่าง build
+
+Scenarios:
+  register_burst   สมัครสมาชิกใหม่ต่อกันหลายคน
+  login_storm      login ซ้ำ ๆ ด้วย user ที่มีอยู่
+  game1_loop       เล่น Game1 (วงล้อสี) ต่อกันหลายตา
+  game2_loop       เล่น Game2 (Rock Paper Scissors) ต่อกันหลายตา
+  balance_poll     ดึง /balance และ /me ซ้ำ ๆ แบบหน้า balance
+  admin_dashboard  admin ดึง dashboard stats / game stats / reports
+
+วิธีใช้:
+  # เปิด server (SQLite หรือ Postgres ก็ได้) โดยปิด rate limit (backend/app/ratelimit.py):
+  # ผู้ใช้จำลองทุกคนยิงจาก IP เดียว setup สมัคร / login / ฝากเงินเกิน REGISTER / LOGIN / MONEY ทันที
+  cd backend && RATE_LIMIT_ENABLED=0 DATABASE_URL=sqlite:///./load.db uvicorn app.main:app --workers 4
+  # ยิง load 60 วินาที 50 scenario ต่อวินาที
+  python load_test.py --duration 60 --rate 50 --output results.json
+  # เทียบกับผลของ build ก่อนหน้า
+  python load_test.py --duration 60 --rate 50 --compare results_main.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+API_BASE = "http://localhost:8000"
+
+SCENARIOS = ("register_burst", "login_storm", "game1_loop", "game2_loop", "balance_poll", "admin_dashboard")
+DEFAULT_MIX = "game1_loop=4,game2_loop=3,balance_poll=3,login_storm=1,register_burst=1,admin_dashboard=1"
+
+RPS_CHOICES = ["rock", "paper", "scissors"]
+RPS_BEATS = {"rock": "scissors", "paper": "rock", "scissors": "paper"}
+
+
+class LatencyStats:
+    """เก็บ latency ของทุก request แยกตาม route"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route, seconds, status_code):
+        self.samples[route].append(seconds * 1000)
+        self.status_codes[route][str(status_code)] += 1
+        if status_code >= 400:
+            self.errors[route] += 1
+
+    def count(self, status_code):
+        """จำนวน response ที่ได้ status นี้ (ทุก route)"""
+        return sum(codes.get(str(status_code), 0) for codes in self.status_codes.values())
+
+    def record_error(self, route, seconds, error):
+        self.samples[route].append(seconds * 1000)
+        self.status_codes[route][type(error).__name__] += 1
+        self.errors[route] += 1
+
+    @staticmethod
+    def percentile(sorted_values, p):
+        if not sorted_values:
+            return 0.0
+        index = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+        return sorted_values[index]
+
+    def summary(self, elapsed):
+        routes = {}
+        all_samples = []
+        for route, values in sorted(self.samples.items()):
+            values = sorted(values)
+            all_samples.extend(values)
+            routes[route] = self._describe(values, self.errors[route], elapsed)
+            routes[route]["status_codes"] = dict(self.status_codes[route])
+        total = self._describe(sorted(all_samples), sum(self.errors.values()), elapsed)
+        return {"routes": routes, "total": total}
+
+    def _describe(self, values, errors, elapsed):
+        return {
+            "count": len(values),
+            "errors": errors,
+            "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+            "p50_ms": round(self.percentile(values, 50), 2),
+            "p95_ms": round(self.percentile(values, 95), 2),
+            "p99_ms": round(self.percentile(values, 99), 2),
+            "max_ms": round(values[-1], 2) if values else 0.0,
+        }
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.stats = LatencyStats()
+        self.rng = random.Random(args.seed)
+        self.run_id = uuid.uuid4().hex[:6]
+        self.users = []          # [(email, password)]
+        self.clients = []        # AsyncClient ที่ login แล้ว (ใช้ซ้ำใน scenario)
+        self.admin_client = None
+        self.phone_counter = self.rng.randrange(10**7)
+        self.limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    # ---------- helpers ----------
+    def new_client(self):
+        return httpx.AsyncClient(base_url=self.args.base_url, timeout=self.args.timeout, limits=self.limits)
+
+    async def call(self, client, method, route, **kwargs):
+        """ยิง request หนึ่งครั้งแล้วบันทึก latency ภายใต้ชื่อ route"""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, route, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record_error(f"{method} {route}", time.perf_counter() - started, e)
+            return None
+        self.stats.record(f"{method} {route}", time.perf_counter() - started, response.status_code)
+        return response
+
+    def next_phone(self):
+        self.phone_counter = (self.phone_counter + 1) % 10**9
+        return f"0{self.phone_counter:09d}"
+
+    async def register(self, client, email, password):
+        payload = {
+            "full_name": f"Load Tester {email.split('@')[0]}",
+            "age": 25,
+            "phone": self.next_phone(),
+            "email": email,
+            "password": password,
+            "confirm_password": password,
+        }
+        return await self.call(client, "POST", "/api/register", json=payload)
+
+    # ---------- setup ----------
+    async def setup(self):
+        print(f"🔧 Preparing {self.args.users} users (run {self.run_id})...")
+        setup_client = self.new_client()
+        try:
+            for i in range(self.args.users):
+                email = f"load_{self.run_id}_{i}@gmail.com"
+                await self.register(setup_client, email, "123456")
+                self.users.append((email, "123456"))
+
+            for email, password in self.users:
+                client = self.new_client()
+                response = await self.call(client, "POST", "/login", json={"email": email, "password": password})
+                if response is None or response.status_code != 200:
+                    await client.aclose()
+                    continue
+                await self.call(client, "POST", "/deposit", json={"amount": self.args.deposit})
+                self.clients.append(client)
+
+            self.admin_client = self.new_client()
+            response = await self.call(
+                self.admin_client, "POST", "/login",
+                json={"email": self.args.admin_email, "password": self.args.admin_password},
+            )
+            if response is None or response.status_code != 200:
+                print("⚠️ Admin login failed - admin_dashboard scenario will record 401/403")
+        finally:
+            await setup_client.aclose()
+
+        limited = self.stats.count(429)
+        if limited:
+            raise SystemExit(f"❌ Setup got {limited} x 429 - start the server with RATE_LIMIT_ENABLED=0")
+        if not self.clients:
+            raise SystemExit("❌ No user could log in - is the server running?")
+        # ไม่นับ request ตอน setup รวมในผลลัพธ์
+        self.stats = LatencyStats()
+        print(f"✅ {len(self.clients)} users ready")
+
+    async def teardown(self):
+        for client in self.clients:
+            await client.aclose()
+        if self.admin_client:
+            await self.admin_client.aclose()
+
+    # ---------- scenarios ----------
+    async def register_burst(self):
+        async with self.new_client() as client:
+            for _ in range(self.args.loop_length):
+                email = f"burst_{self.run_id}_{uuid.uuid4().hex[:10]}@gmail.com"
+                await self.register(client, email, "123456")
+
+    async def login_storm(self):
+        async with self.new_client() as client:
+            for _ in range(self.args.loop_length):
+                email, password = self.rng.choice(self.users)
+                await self.call(client, "POST", "/login", json={"email": email, "password": password})
+
+    async def game1_loop(self):
+        client = self.rng.choice(self.clients)
+        for _ in range(self.args.loop_length):
+            payload = {"bet_amount": self.args.bet, "selected_color": self.rng.choice(["blue", "white"])}
+            response = await self.call(client, "POST", "/api/game1/play", json=payload)
+            if response is not None and response.status_code == 400:
+                await self.call(client, "POST", "/deposit", json={"amount": self.args.deposit})
+        await self.call(client, "GET", "/api/game1/stats")
+        await self.call(client, "GET", "/api/game1/history")
+
+    async def game2_loop(self):
+        client = self.rng.choice(self.clients)
+        for _ in range(self.args.loop_length):
+            player = self.rng.choice(RPS_CHOICES)
+            bot = self.rng.choice(RPS_CHOICES)
+            result = "tie" if player == bot else ("win" if RPS_BEATS[player] == bot else "lose")
+            payload = {"bet_amount": self.args.bet, "player_choice": player, "bot_choice": bot, "result": result}
+            response = await self.call(client, "POST", "/api/game2/play", json=payload)
+            if response is not None and response.status_code == 400:
+                await self.call(client, "POST", "/deposit", json={"amount": self.args.deposit})
+        await self.call(client, "GET", "/api/game2/stats")
+        await self.call(client, "GET", "/api/game2/history")
+
+    async def balance_poll(self):
+        client = self.rng.choice(self.clients)
+        await self.call(client, "GET", "/me")
+        for _ in range(self.args.loop_length):
+            await self.call(client, "GET", "/balance")
+            await asyncio.sleep(self.args.poll_interval)
+
+    async def admin_dashboard(self):
+        for route in ("/api/dashboard-stats", "/api/game-stats", "/api/report-categories", "/reports"):
+            await self.call(self.admin_client, "GET", route)
+
+    # ---------- driver ----------
+    def parse_mix(self):
+        weights = {}
+        for part in self.args.mix.split(","):
+            name, _, weight = part.partition("=")
+            name = name.strip()
+            if name not in SCENARIOS:
+                raise SystemExit(f"❌ Unknown scenario: {name}")
+            weights[name] = float(weight or 1)
+        return list(weights), list(weights.values())
+
+    async def run(self):
+        names, weights = self.parse_mix()
+        await self.setup()
+
+        in_flight = asyncio.Semaphore(self.args.concurrency)
+        tasks = set()
+        scenario_counts = defaultdict(int)
+        dropped = 0
+
+        async def run_scenario(name):
+            try:
+                await getattr(self, name)()
+            except Exception as e:
+                print(f"❌ Scenario {name} failed: {e}")
+            finally:
+                in_flight.release()
+
+        print(f"🚀 Running {self.args.duration}s at {self.args.rate} scenarios/s, mix: {self.args.mix}")
+        started = time.perf_counter()
+        deadline = started + self.args.duration
+        next_arrival = started
+        while True:
+            # Poisson arrivals (open model) - เวลาระหว่าง scenario เป็น exponential
+            next_arrival += self.rng.expovariate(self.args.rate)
+            if next_arrival >= deadline:
+                break
+            await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+            if in_flight.locked():
+                dropped += 1
+                continue
+            await in_flight.acquire()
+            name = self.rng.choices(names, weights)[0]
+            scenario_counts[name] += 1
+            task = asyncio.create_task(run_scenario(name))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        await self.teardown()
+
+        result = self.stats.summary(elapsed)
+        result["config"] = {k: v for k, v in vars(self.args).items() if k not in ("output", "compare", "admin_password")}
+        result["elapsed_s"] = round(elapsed, 2)
+        result["scenarios"] = dict(scenario_counts)
+        result["dropped_arrivals"] = dropped
+        result["rate_limited"] = self.stats.count(429)
+        return result
+
+
+def print_summary(result, baseline=None):
+    print(f"\n📊 Results ({result['elapsed_s']}s, dropped arrivals: {result['dropped_arrivals']})")
+    header = f"{'route':<36}{'count':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    if baseline:
+        header += f"{'Δp95':>10}"
+    print(header)
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for route, s in rows:
+        line = (f"{route:<36}{s['count']:>8}{s['errors']:>6}{s['throughput_rps']:>9}"
+                f"{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}")
+        if baseline:
+            base = baseline["total"] if route == "TOTAL" else baseline["routes"].get(route)
+            if base and base["p95_ms"]:
+                line += f"{(s['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100:>+9.1f}%"
+        print(line)
+    if result.get("rate_limited"):
+        print(f"⚠️ {result['rate_limited']} responses were 429 - latency ไม่ใช่ของ handler จริง "
+              f"(เปิด server ด้วย RATE_LIMIT_ENABLED=0)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async load generator for the X-BET API")
+    parser.add_argument("--base-url", default=API_BASE)
+    parser.add_argument("--duration", type=float, default=30, help="seconds to generate load")
+    parser.add_argument("--rate", type=float, default=20, help="scenario arrivals per second")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,... ")
+    parser.add_argument("--users", type=int, default=20, help="pre-registered users for play/poll scenarios")
+    parser.add_argument("--concurrency", type=int, default=200, help="max scenarios in flight")
+    parser.add_argument("--loop-length", type=int, default=10, help="requests per scenario loop")
+    parser.add_argument("--bet", type=float, default=10)
+    parser.add_argument("--deposit", type=float, default=100000)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--admin-email", default="admin@xbet.com")
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(LoadTest(args).run())
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_summary(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -27,15 +27,6 @@ if %ERRORLEVEL% neq 0 (
 
 echo ✅ Packages installed successfully
 
-REM ตรวจสอบไฟล์ SQL
-if not exist "create_game1_tables.sql" (
-    echo ❌ ไม่พบไฟล์ create_game1_tables.sql
-    pause
-    exit /b 1
-)
-
-echo ✅ SQL file พบแล้ว
-
 REM ถาม environment variables
 echo.
 echo ⚙️  กรุณาตั้งค่า Database connection:
@@ -63,14 +54,15 @@ set DB_PORT=%DB_PORT%
 set DB_NAME=%DB_NAME%
 set DB_USER=%DB_USER%
 set DB_PASSWORD=%DB_PASSWORD%
+set DATABASE_URL=postgresql://%DB_USER%:%DB_PASSWORD%@%DB_HOST%:%DB_PORT%/%DB_NAME%
 
 echo.
 echo 🔗 Connecting to: %DB_USER%@%DB_HOST%:%DB_PORT%/%DB_NAME%
 
-REM รัน setup script
+REM รัน schema migrations (สร้าง/อัพเดทตารางและ index ตาม version)
 echo.
-echo 🚀 Running database setup...
-python setup_game1_database.py
+echo 🚀 Running database migrations...
+python migrate.py
 
 if %ERRORLEVEL% neq 0 (
     echo ❌ Database setup ล้มเหลว
@@ -84,7 +76,7 @@ echo.
 echo 📋 สิ่งที่ถูกสร้าง:
 echo    - ตาราง game1 (เก็บข้อมูลการเล่นแต่ละครั้ง)
 echo    - ตาราง game1_stats (เก็บสถิติของผู้ใช้)
-echo    - Functions และ Triggers สำหรับอัพเดทสถิติอัตโนมัติ
+echo    - Index สำหรับ history / stats และตาราง schema_version
 echo    - API endpoints ใน backend/app/main.py
 echo.
 echo 🎮 คุณสามารถเริ่มเล่น Game1 ได้แล้ว!
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+RTP Simulator - Monte Carlo แบบ vectorized (NumPy) ของกติกาใน backend/app/rules.py
+
+ใช้กติกาเดียวกับ API: ความน่าจะเป็นของแต่ละผลคำนวณจาก rules.outcome_probabilities()
+(ไล่ทุกผลของวงล้อ / ทุกตัวเลือกของบอท) และตัวคูณเงินจาก rules.WHEEL_OUTCOMES / rules.RPS_OUTCOMES
+
+จำลองผู้เล่นหลาย session พร้อมกัน: ทุกตาคำนวณทั้ง vector ของ session ในครั้งเดียว
+(strategy ที่ขึ้นกับตาก่อนหน้า เช่น martingale จึงยังจำลองได้ถูกต้อง)
+
+รายงาน:
+  - RTP จากยอดเงินจริง และ RTP ตาม win_loss_amount ที่บันทึก (Game2 บันทึกชนะเป็น 2 เท่า)
+  - house edge, ค่าทางทฤษฎีจาก rules เทียบกับที่จำลองได้
+  - volatility ต่อตา (ส่วนเบี่ยงเบนมาตรฐานต่อเงินเดิมพัน 1 หน่วย) และกำไร/ขาดทุนต่อ session
+  - risk of ruin: สัดส่วน session ที่เงินไม่พอเดิมพันตาถัดไปก่อนเล่นครบ
+  - การกระจายของ win_loss_amount (หน่วย = เดิมพันเริ่มต้น)
+
+วิธีใช้:
+  python simulate_rtp.py --game game1 --rounds 100000000
+  python simulate_rtp.py --game game2 --choice rock --strategy martingale --bankroll 1000 --bet 10
+  python simulate_rtp.py --game all --strategy all --rounds 10000000 --session-rounds 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from backend.app import rules  # noqa: E402
+
+STRATEGIES = ("flat", "martingale", "paroli", "fraction")
+DEFAULT_CHOICE = {"game1": "blue", "game2": "rock"}
+HISTOGRAM_UNITS = 64            # เก็บ win_loss_amount ช่วง -64..+64 เท่าของเดิมพันเริ่มต้น (เกินนั้นรวมที่ขอบ)
+
+
+class OutcomeTable:
+    """ผลของเกมในรูป array: ความน่าจะเป็นสะสม + ตัวคูณยอดเงิน / ตัวคูณที่บันทึก"""
+
+    def __init__(self, game: str, choice: str):
+        outcomes = rules.GAMES[game][0]
+        probabilities = rules.outcome_probabilities(game, choice)
+        self.names = [name for name in outcomes if probabilities[name] > 0]
+        self.p = np.array([probabilities[name] for name in self.names])
+        self.thresholds = np.cumsum(self.p)[:-1].astype(np.float32)
+        self.balance = np.array([outcomes[name].balance for name in self.names], dtype=np.float64)
+        self.recorded = np.array([outcomes[name].recorded for name in self.names], dtype=np.float64)
+
+    def draw(self, rng, n: int) -> np.ndarray:
+        # index ของผล = จำนวน threshold ที่ค่าสุ่มข้ามไป (เร็วกว่า searchsorted เมื่อมีไม่กี่ผล)
+        u = rng.random(n, dtype=np.float32)
+        index = np.zeros(n, dtype=np.intp)
+        for threshold in self.thresholds:
+            index += u >= threshold
+        return index
+
+    def theoretical_rtp(self, recorded: bool = False) -> float:
+        multipliers = self.recorded if recorded else self.balance
+        return float(1 + (self.p * multipliers).sum())
+
+    def theoretical_volatility(self) -> float:
+        mean = (self.p * self.balance).sum()
+        return float(np.sqrt((self.p * (self.balance - mean) ** 2).sum()))
+
+
+def next_bets(strategy: str, base: float, balance: np.ndarray, streak: np.ndarray,
+              fraction: float, max_bet: float) -> np.ndarray:
+    if strategy == "flat":
+        bets = np.full(balance.shape, base)
+    elif strategy == "martingale":
+        # เพิ่มเป็น 2 เท่าหลังแพ้ (streak = จำนวนตาที่แพ้ติดกัน)
+        bets = base * np.exp2(np.minimum(streak, 40))
+    elif strategy == "paroli":
+        # เพิ่มเป็น 2 เท่าหลังชนะ สูงสุด 3 ตาติดแล้วกลับไปเริ่มใหม่ (streak = จำนวนตาที่ชนะติดกัน)
+        bets = base * np.exp2(streak % 3)
+    else:
+        # เดิมพันเป็นสัดส่วนของยอดเงินคงเหลือ (ปัดเป็นสตางค์)
+        bets = np.maximum(np.round(balance * fraction, 2), base)
+    return np.minimum(bets, max_bet) if max_bet > 0 else bets
+
+
+def simulate(game: str, choice: str, strategy: str, rounds: int, session_rounds: int, bankroll: float,
+             base: float, fraction: float, max_bet: float, chunk: int, seed: int) -> dict:
+    table = OutcomeTable(game, choice)
+    rng = np.random.default_rng(seed)
+    sessions = max(1, rounds // session_rounds)
+
+    wagered = returned = recorded = square = 0.0
+    played = ruined = 0
+    finals = np.empty(sessions)
+    histogram = np.zeros(2 * HISTOGRAM_UNITS + 1, dtype=np.int64)
+
+    for start in range(0, sessions, chunk):
+        n = min(chunk, sessions - start)
+        balance = np.full(n, bankroll, dtype=np.float64)
+        streak = np.zeros(n, dtype=np.int64)
+        active = np.ones(n, dtype=bool)
+        broke = np.zeros(n, dtype=bool)
+
+        for _ in range(session_rounds):
+            bets = next_bets(strategy, base, balance, streak, fraction, max_bet)
+            can_bet = active & (bets <= balance + 1e-9)
+            broke |= active & ~can_bet
+            active = can_bet
+            if not active.any():
+                break
+            bets = np.where(active, bets, 0.0)
+
+            index = table.draw(rng, n)
+            change = bets * table.balance[index]
+            record = bets * table.recorded[index]
+            balance += change
+
+            wagered += bets.sum()
+            returned += change.sum()
+            recorded += record.sum()
+            # ส่วนเบี่ยงเบนต่อเงินเดิมพัน 1 หน่วย (ตัวคูณของผลที่ออก)
+            square += (table.balance[index] ** 2 * active).sum()
+            played += int(np.count_nonzero(active))
+            units = np.clip(np.rint(record[active] / base).astype(np.int64), -HISTOGRAM_UNITS, HISTOGRAM_UNITS)
+            histogram += np.bincount(units + HISTOGRAM_UNITS, minlength=histogram.size)
+
+            if strategy == "martingale":
+                streak = np.where(change < 0, streak + 1, np.where(change > 0, 0, streak))
+            elif strategy == "paroli":
+                streak = np.where(change > 0, streak + 1, np.where(change < 0, 0, streak))
+
+        ruined += int(np.count_nonzero(broke))
+        finals[start:start + n] = balance
+
+    mean_unit = returned / wagered if wagered else 0.0
+    net = finals - bankroll
+    return {
+        "game": game, "choice": choice, "strategy": strategy, "table": table,
+        "rounds": played, "sessions": sessions, "wagered": wagered,
+        "rtp": 1 + mean_unit,
+        "rtp_recorded": 1 + recorded / wagered if wagered else 0.0,
+        "volatility": float(np.sqrt(max(0.0, square / played - (returned / wagered) ** 2))) if played else 0.0,
+        "risk_of_ruin": ruined / sessions,
+        "session_net_mean": float(net.mean()),
+        "session_net_std": float(net.std()),
+        "session_net_pct": np.percentile(net, [5, 50, 95]),
+        "histogram": histogram,
+    }
+
+
+def report(result: dict, base: float, elapsed: float):
+    table = result["table"]
+    print(f"\n🎰 {result['game']} ({result['choice']}) - strategy: {result['strategy']}")
+    print(f"   outcomes: " + ", ".join(
+        f"{name} p={p:.4f} balance×{b:+g} recorded×{r:+g}"
+        for name, p, b, r in zip(table.names, table.p, table.balance, table.recorded)))
+    print(f"   {result['rounds']:,} rounds in {result['sessions']:,} sessions, {elapsed:.2f}s "
+          f"({result['rounds'] / max(elapsed, 1e-9) / 1e6:.1f}M rounds/s)")
+    print(f"   RTP (balance):             {result['rtp'] * 100:8.4f}%   theoretical {table.theoretical_rtp() * 100:8.4f}%"
+          f"   house edge {(1 - result['rtp']) * 100:+.4f}%")
+    print(f"   RTP (recorded win_loss):   {result['rtp_recorded'] * 100:8.4f}%   theoretical "
+          f"{table.theoretical_rtp(recorded=True) * 100:8.4f}%")
+    print(f"   volatility / unit bet:     {result['volatility']:8.4f}    theoretical {table.theoretical_volatility():8.4f}")
+    p5, p50, p95 = result["session_net_pct"]
+    print(f"   session net: mean {result['session_net_mean']:+.2f}, std {result['session_net_std']:.2f}, "
+          f"p5 {p5:+.2f}, p50 {p50:+.2f}, p95 {p95:+.2f}")
+    print(f"   risk of ruin:              {result['risk_of_ruin'] * 100:8.4f}%")
+
+    histogram = result["histogram"]
+    total = histogram.sum()
+    print(f"   win_loss_amount distribution (unit = {base:g}):")
+    for offset in np.nonzero(histogram)[0]:
+        units = offset - HISTOGRAM_UNITS
+        edge = "≤" if units == -HISTOGRAM_UNITS else "≥" if units == HISTOGRAM_UNITS else " "
+        print(f"     {edge}{units * base:+10.2f}  {histogram[offset] / total * 100:8.4f}%  ({histogram[offset]:,})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo RTP simulator for game payout rules")
+    parser.add_argument("--game", choices=[*rules.GAMES, "all"], default="all")
+    parser.add_argument("--choice", default=None, help="ตัวเลือกของผู้เล่น (ค่าเริ่มต้น: blue / rock)")
+    parser.add_argument("--strategy", choices=[*STRATEGIES, "all"], default="flat")
+    parser.add_argument("--rounds", type=int, default=10_000_000, help="จำนวนตารวมต่อ game × strategy")
+    parser.add_argument("--session-rounds", type=int, default=1000, help="จำนวนตาต่อ session")
+    parser.add_argument("--bankroll", type=float, default=1000.0, help="เงินเริ่มต้นต่อ session")
+    parser.add_argument("--bet", type=float, default=10.0, help="เดิมพันเริ่มต้น")
+    parser.add_argument("--fraction", type=float, default=0.02, help="สัดส่วนเดิมพันของ strategy fraction")
+    parser.add_argument("--max-bet", type=float, default=0.0, help="เพดานเดิมพัน (0 = ไม่จำกัด)")
+    parser.add_argument("--chunk", type=int, default=200_000, help="จำนวน session ที่จำลองพร้อมกัน")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    games = list(rules.GAMES) if args.game == "all" else [args.game]
+    strategies = list(STRATEGIES) if args.strategy == "all" else [args.strategy]
+    for game in games:
+        choice = args.choice if args.choice and args.game != "all" else DEFAULT_CHOICE[game]
+        for strategy in strategies:
+            started = time.perf_counter()
+            result = simulate(game, choice, strategy, args.rounds, args.session_rounds, args.bankroll,
+                              args.bet, args.fraction, args.max_bet, args.chunk, args.seed)
+            report(result, args.bet, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
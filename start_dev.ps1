@@ -166,10 +166,10 @@ do {
         }
         "7" {
             Write-Host "🗄️ Setting up Game1 Database..." -ForegroundColor Yellow
-            if (Test-Path "setup_game1_database.py") {
-                python setup_game1_database.py
+            if (Test-Path "migrate.py") {
+                python migrate.py
             } else {
-                Write-Host "❌ setup_game1_database.py not found" -ForegroundColor Red
+                Write-Host "❌ migrate.py not found" -ForegroundColor Red
             }
             Write-Host "Press any key to continue..." -ForegroundColor Gray
             $null = $Host.UI.RawUI.ReadKey("NoEcho,IncludeKeyDown")